@@ -0,0 +1,47 @@
+import uuid
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+from app.config import get_settings
+
+bearer = HTTPBearer(auto_error=False)
+
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer),
+) -> uuid.UUID:
+    """
+    FastAPI dependency: the user id (``sub`` claim) of a valid access token.
+
+    Per ADR-001 the token is verified statelessly — signature and expiry
+    only, no database lookup.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+        )
+    settings = get_settings()
+    try:
+        claims = jwt.decode(
+            credentials.credentials, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
+        )
+        return uuid.UUID(claims["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=401, detail="Invalid access token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+async def get_optional_user_id(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer),
+) -> uuid.UUID | None:
+    """
+    FastAPI dependency for routes open to anonymous users: None without an
+    Authorization header, else the user id of the token. A token that is sent
+    must be valid (401 otherwise), so an expired one is not silently ignored.
+    """
+    if credentials is None:
+        return None
+    return await get_current_user_id(credentials)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.v1 import puzzles
+from app.api.v1 import puzzles, users
 
 router = APIRouter()
 router.include_router(puzzles.router, prefix="/puzzles", tags=["puzzles"])
+router.include_router(users.router, prefix="/users", tags=["users"])
@@ -1,23 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+import uuid
 
-from app.db.session import get_db
-from app.schemas.puzzle import PuzzleResponse
-from app.services.puzzle_service import get_random_puzzle
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+
+from app.api.deps import get_current_user_id, get_optional_user_id
+from app.db.session import AsyncSessionLocal, read_connection
+from app.schemas.puzzle import (
+    PuzzleBatchResponse,
+    PuzzleResponse,
+    SubmitRequest,
+    SubmitResponse,
+)
+from app.services.progress_service import Submission, record_submissions
+from app.services.puzzle_service import (
+    MAX_BATCH_COUNT,
+    MAX_OPENING_LENGTH,
+    MAX_RATING,
+    MAX_THEMES,
+    MIN_RATING,
+    get_random_puzzle,
+    get_random_puzzle_fast,
+    get_random_puzzles,
+    get_random_unseen_puzzle,
+    get_random_unseen_puzzles,
+    mark_puzzle_seen,
+    puzzle_json,
+    puzzles_json,
+)
+from app.services.submission_queue import SubmissionQueueFull, get_submission_queue
 
 router = APIRouter()
 
 
-@router.get("/random", response_model=PuzzleResponse)
-async def random_puzzle(db: AsyncSession = Depends(get_db)):
-    """Return a single random chess puzzle."""
-    row = await get_random_puzzle(db)
-    if row is None:
-        raise HTTPException(status_code=503, detail="No puzzles available")
-    return {
-        "id": row["id"],
-        "fen": row["fen"],
-        "moves": row["moves"].split(),
-        "rating": row["rating"],
-        "themes": row["themes"].split() if row["themes"] else None,
+@router.get("/random", response_model=PuzzleResponse | PuzzleBatchResponse)
+async def random_puzzle(
+    min_rating: int | None = Query(None, ge=MIN_RATING, le=MAX_RATING),
+    max_rating: int | None = Query(None, ge=MIN_RATING, le=MAX_RATING),
+    themes: str | None = Query(None, description="Comma-separated; all must match"),
+    opening: str | None = Query(
+        None,
+        min_length=1,
+        max_length=MAX_OPENING_LENGTH,
+        description="Lichess opening tag, family or variation",
+    ),
+    count: int | None = Query(
+        None, ge=1, le=MAX_BATCH_COUNT, description="Return a batch of distinct puzzles"
+    ),
+    user_id: uuid.UUID | None = Depends(get_optional_user_id),
+):
+    """
+    Return a random chess puzzle, optionally filtered by rating, themes and opening.
+
+    With ``count`` the response is ``{"puzzles": [...]}`` holding up to that
+    many distinct puzzles, fetched in as few queries as the filters allow.
+
+    With a bearer token, puzzles the user has not played yet come first
+    (get_random_unseen_puzzle, or get_random_unseen_puzzles for a batch).
+    Seen puzzles fill in only when too few unseen ones turn up within the
+    unseen-selection budget. Served puzzles are marked seen.
+
+    A single unfiltered anonymous puzzle comes from get_random_puzzle_fast (in-memory
+    pool, then raw asyncpg); a read connection is only checked out when that
+    cannot serve it or filters apply. Bodies are the cached, pre-serialized
+    JSON of each puzzle, returned as-is rather than validated against the
+    response model on every request.
+    """
+    if min_rating is not None and max_rating is not None and min_rating > max_rating:
+        raise HTTPException(status_code=422, detail="min_rating must not exceed max_rating")
+    theme_list = None
+    if themes is not None:
+        theme_list = list(dict.fromkeys(t.strip() for t in themes.split(",") if t.strip()))
+        if not theme_list:
+            raise HTTPException(status_code=422, detail="themes must not be empty")
+        if len(theme_list) > MAX_THEMES:
+            raise HTTPException(
+                status_code=422, detail=f"At most {MAX_THEMES} themes may be requested"
+            )
+    banded = min_rating is not None or max_rating is not None
+    filters = {
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "themes": theme_list,
+        "opening": opening,
     }
+    unfiltered = not banded and theme_list is None and opening is None
+    if count is None and user_id is None and unfiltered:
+        body = await get_random_puzzle_fast()
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+    async with read_connection() as db:
+        if count is not None and user_id is not None:
+            rows = await get_random_unseen_puzzles(db, user_id, count, **filters)
+        elif count is not None:
+            rows = await get_random_puzzles(db, count, **filters)
+        else:
+            row = None
+            if user_id is not None:
+                row = await get_random_unseen_puzzle(db, user_id, **filters)
+            if row is None:
+                row = await get_random_puzzle(db, **filters)
+            rows = [] if row is None else [row]
+    if not rows:
+        if opening is not None:
+            raise HTTPException(status_code=404, detail="No puzzles match the requested opening")
+        if theme_list:
+            raise HTTPException(status_code=404, detail="No puzzles match the requested themes")
+        if banded:
+            raise HTTPException(status_code=404, detail="No puzzles in rating range")
+        raise HTTPException(status_code=503, detail="No puzzles available")
+    if user_id is not None:
+        for row in rows:
+            mark_puzzle_seen(user_id, row["id"])
+    body = puzzles_json(rows) if count is not None else puzzle_json(rows[0])
+    return Response(content=body, media_type="application/json")
+
+
+async def _record_now(submission: Submission) -> None:
+    """Write one submission before responding; the queue-disabled path."""
+    async with AsyncSessionLocal() as db:
+        await record_submissions(db, [submission])
+        await db.commit()
+
+
+@router.post("/{puzzle_id}/submit", status_code=202, response_model=SubmitResponse)
+async def submit_puzzle(
+    body: SubmitRequest,
+    puzzle_id: str = Path(..., min_length=1, max_length=10),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+):
+    """
+    Record the current user's result for a puzzle.
+
+    The submission is queued and written with others in one batch shortly
+    after (``queued: true``); with the queue disabled it is written before
+    the response. Only the first result per user and puzzle is kept, and a
+    submission for an unknown puzzle is ignored. 503 when the queue stays
+    full for the enqueue timeout.
+    """
+    submission = Submission(
+        user_id=user_id,
+        puzzle_id=puzzle_id,
+        result=body.result,
+        time_spent_ms=body.time_spent_ms,
+    )
+    queue = get_submission_queue()
+    if queue is None:
+        await _record_now(submission)
+    else:
+        try:
+            await queue.enqueue(submission)
+        except SubmissionQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many submissions, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+    return {"puzzle_id": puzzle_id, "result": body.result, "queued": queue is not None}
@@ -0,0 +1,87 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.api.deps import get_current_user_id
+from app.db.session import get_read_db
+from app.schemas.progress import ProgressPage, UserStatsResponse
+from app.services.progress_service import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    get_progress_page,
+    get_user_stats,
+)
+
+router = APIRouter()
+
+
+def _progress_entry(row, include_puzzle: bool) -> dict:
+    entry = {
+        "id": row["id"],
+        "puzzle_id": row["puzzle_id"],
+        "result": row["result"],
+        "time_spent_ms": row["time_spent_ms"],
+        "solved_at": row["solved_at"],
+    }
+    if include_puzzle:
+        entry["puzzle"] = {
+            "rating": row["rating"],
+            "themes": row["themes"].split() if row["themes"] else None,
+        }
+    return entry
+
+
+@router.get("/me/progress", response_model=ProgressPage)
+async def my_progress(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_puzzle: bool = Query(False, description="Add each puzzle's rating and themes"),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncConnection = Depends(get_read_db),
+):
+    """Return the current user's solve history, newest first, one keyset page at a time."""
+    try:
+        rows, next_cursor = await get_progress_page(
+            db, user_id, limit=limit, cursor=cursor, include_puzzle=include_puzzle
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return {
+        "items": [_progress_entry(row, include_puzzle) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def _accuracy(solved: int, failed: int) -> float | None:
+    attempts = solved + failed
+    return round(solved / attempts, 4) if attempts else None
+
+
+@router.get("/me/stats", response_model=UserStatsResponse)
+async def my_stats(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncConnection = Depends(get_read_db),
+):
+    """Return the current user's dashboard aggregates (one user_stats primary-key read)."""
+    row = await get_user_stats(db, user_id)
+    if row is None:
+        return {"solved": 0, "failed": 0, "current_streak": 0, "best_streak": 0, "themes": []}
+    themes = sorted(row["theme_stats"].items(), key=lambda item: (-sum(item[1]), item[0]))
+    return {
+        "solved": row["solved_count"],
+        "failed": row["failed_count"],
+        "accuracy": _accuracy(row["solved_count"], row["failed_count"]),
+        "current_streak": row["current_streak"],
+        "best_streak": row["best_streak"],
+        "average_time_ms": (
+            row["total_time_ms"] // row["timed_count"] if row["timed_count"] else None
+        ),
+        "last_solved_at": row["last_solved_at"],
+        "themes": [
+            {"theme": theme, "solved": solved, "failed": failed,
+             "accuracy": _accuracy(solved, failed)}
+            for theme, (solved, failed) in themes
+        ],
+    }
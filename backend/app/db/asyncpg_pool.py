@@ -0,0 +1,121 @@
+"""
+Raw asyncpg pool for hot read paths.
+
+SQLAlchemy's engine stays the data access layer for everything else; this
+pool serves queries where the per-request CPU of the SQLAlchemy layer
+(statement compilation lookups, result proxies, row mappings) outweighs the
+query itself. asyncpg prepares each query text once per connection and keeps
+it in the connection's statement cache.
+
+Like read_connection, the pool backs off: when it cannot be opened or a
+query on it fails, it is dropped and hot paths use SQLAlchemy for
+DATABASE_READ_RETRY_SECONDS. After that, the next caller reopens it in the
+background, on the replica again if it is back.
+"""
+
+import asyncio
+import time
+
+import asyncpg
+import structlog
+from sqlalchemy.engine import make_url
+
+logger = structlog.get_logger()
+
+_pool: asyncpg.Pool | None = None
+_settings = None
+_retry_at = 0.0
+_open_task: asyncio.Task | None = None
+
+
+def asyncpg_dsn(url: str) -> str:
+    """libpq-style DSN for a SQLAlchemy ``postgresql+asyncpg://`` URL."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def get_asyncpg_pool() -> asyncpg.Pool | None:
+    """
+    The pool, or None while it is unavailable. A missing pool is reopened in
+    a background task once the retry window has passed; the caller never
+    waits for it.
+    """
+    global _open_task
+    if (
+        _pool is None
+        and _settings is not None
+        and time.monotonic() >= _retry_at
+        and (_open_task is None or _open_task.done())
+    ):
+        _open_task = asyncio.create_task(_open(_settings))
+    return _pool
+
+
+async def _open(settings) -> asyncpg.Pool | None:
+    global _pool, _retry_at
+    urls = [url for url in (settings.database_read_url, settings.database_url) if url]
+    for url in urls:
+        try:
+            _pool = await asyncpg.create_pool(
+                asyncpg_dsn(url),
+                min_size=settings.fast_path_pool_min_size,
+                max_size=settings.fast_path_pool_max_size,
+                # A transaction-mode pooler cannot keep named statements
+                statement_cache_size=(
+                    0 if settings.db_pgbouncer else settings.db_statement_cache_size
+                ),
+                timeout=settings.database_read_connect_timeout_seconds,
+            )
+            return _pool
+        except (OSError, asyncpg.PostgresError) as error:
+            logger.warning("asyncpg_pool_unavailable", host=make_url(url).host, error=str(error))
+    _retry_at = time.monotonic() + settings.database_read_retry_seconds
+    return None
+
+
+async def start_asyncpg_pool(settings) -> asyncpg.Pool | None:
+    """
+    Open the process-wide pool (if enabled) on the read replica, or on the
+    primary when no replica is configured or it cannot be reached. Returns
+    None, leaving hot paths on SQLAlchemy until a later reopen succeeds, when
+    neither can be reached.
+    """
+    global _settings, _retry_at
+    if not settings.fast_path_enabled:
+        return None
+    _settings = settings
+    _retry_at = 0.0
+    return await _open(settings)
+
+
+def discard_asyncpg_pool(pool: asyncpg.Pool, error: Exception) -> None:
+    """
+    Drop *pool* after a failed query on it and start the retry window, so
+    that requests do not each wait out the connect timeout on a host that is
+    down. A no-op when *pool* has already been replaced.
+    """
+    global _pool, _retry_at
+    if _settings is None or pool is not _pool:
+        return
+    _retry_at = time.monotonic() + _settings.database_read_retry_seconds
+    _pool.terminate()
+    _pool = None
+    logger.warning(
+        "asyncpg_pool_discarded",
+        error=str(error),
+        retry_seconds=_settings.database_read_retry_seconds,
+    )
+
+
+async def stop_asyncpg_pool() -> None:
+    global _pool, _settings, _open_task
+    _settings = None
+    if _open_task is not None and not _open_task.done():
+        _open_task.cancel()
+        try:
+            await _open_task
+        except asyncio.CancelledError:
+            pass
+    _open_task = None
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -6,7 +6,17 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 # Import Base and all models so Alembic can detect them
 from app.models import Base  # noqa: F401 — registers all model metadata
-from app.models import Puzzle, RefreshToken, User, UserProgress  # noqa: F401
+from app.models import (  # noqa: F401
+    Puzzle,
+    PuzzleOpening,
+    PuzzleRatingCount,
+    PuzzleTheme,
+    PuzzleThemeCount,
+    RefreshToken,
+    User,
+    UserProgress,
+    UserStats,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,57 @@
+"""Rating-banded random sampling — puzzles.rand_key, puzzle_rating_counts
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+Adds a per-row random key and an index on (rating, rand_key), so a random
+puzzle of a given rating is a single index seek. puzzle_rating_counts lets the
+service weight ratings within a band; the importer refreshes it after a load.
+
+The volatile random() default rewrites the puzzles table once (~3.5M rows).
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: Union[str, None] = "001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "puzzles",
+        sa.Column(
+            "rand_key",
+            sa.Double(),
+            server_default=sa.text("random()"),
+            nullable=False,
+        ),
+    )
+    # (rating, rand_key) also serves every rating-only lookup
+    op.create_index("idx_puzzles_rating_rand_key", "puzzles", ["rating", "rand_key"])
+    op.drop_index("idx_puzzles_rating", table_name="puzzles")
+
+    op.create_table(
+        "puzzle_rating_counts",
+        sa.Column("rating", sa.Integer(), nullable=False),
+        sa.Column("puzzle_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("rating"),
+    )
+    op.execute(
+        "INSERT INTO puzzle_rating_counts (rating, puzzle_count)"
+        " SELECT rating, COUNT(*) FROM puzzles GROUP BY rating"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("puzzle_rating_counts")
+
+    op.create_index("idx_puzzles_rating", "puzzles", ["rating"])
+    op.drop_index("idx_puzzles_rating_rand_key", table_name="puzzles")
+    op.drop_column("puzzles", "rand_key")
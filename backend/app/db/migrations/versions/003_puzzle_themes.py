@@ -0,0 +1,61 @@
+"""Theme index — puzzle_themes, puzzle_theme_counts
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+puzzles.themes stays the space-separated source of truth; puzzle_themes holds
+one row per (puzzle, theme) with the puzzle's rand_key, indexed on
+(theme, rand_key) so a random puzzle with a given theme is one index seek.
+The importer keeps both tables in step with each load.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "puzzle_themes",
+        sa.Column("puzzle_id", sa.String(10), nullable=False),
+        sa.Column("theme", sa.Text(), nullable=False),
+        sa.Column("rand_key", sa.Double(), nullable=False),
+        sa.ForeignKeyConstraint(["puzzle_id"], ["puzzles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("puzzle_id", "theme"),
+    )
+    op.execute(
+        "INSERT INTO puzzle_themes (puzzle_id, theme, rand_key)"
+        " SELECT p.id, t.theme, p.rand_key"
+        " FROM puzzles p CROSS JOIN LATERAL unnest(string_to_array(p.themes, ' ')) AS t(theme)"
+        " WHERE t.theme <> ''"
+        " ON CONFLICT DO NOTHING"
+    )
+    # Built after the backfill: one sort instead of 14M index insertions
+    op.create_index(
+        "idx_puzzle_themes_theme_rand_key", "puzzle_themes", ["theme", "rand_key"]
+    )
+
+    op.create_table(
+        "puzzle_theme_counts",
+        sa.Column("theme", sa.Text(), nullable=False),
+        sa.Column("puzzle_count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("theme"),
+    )
+    op.execute(
+        "INSERT INTO puzzle_theme_counts (theme, puzzle_count)"
+        " SELECT theme, COUNT(*) FROM puzzle_themes GROUP BY theme"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("puzzle_theme_counts")
+    op.drop_index("idx_puzzle_themes_theme_rand_key", table_name="puzzle_themes")
+    op.drop_table("puzzle_themes")
@@ -0,0 +1,51 @@
+"""Opening index — puzzle_openings
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+puzzles.opening_tags stays the space-separated source of truth; puzzle_openings
+holds one row per (puzzle, opening tag) with the puzzle's rand_key, indexed on
+(opening, rand_key). Lichess tags a puzzle with both the opening family and
+its variation, so either is a single index seek. The importer keeps the table
+in step with each load.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "puzzle_openings",
+        sa.Column("puzzle_id", sa.String(10), nullable=False),
+        sa.Column("opening", sa.Text(), nullable=False),
+        sa.Column("rand_key", sa.Double(), nullable=False),
+        sa.ForeignKeyConstraint(["puzzle_id"], ["puzzles.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("puzzle_id", "opening"),
+    )
+    op.execute(
+        "INSERT INTO puzzle_openings (puzzle_id, opening, rand_key)"
+        " SELECT p.id, t.opening, p.rand_key"
+        " FROM puzzles p"
+        " CROSS JOIN LATERAL unnest(string_to_array(p.opening_tags, ' ')) AS t(opening)"
+        " WHERE t.opening <> ''"
+        " ON CONFLICT DO NOTHING"
+    )
+    # Built after the backfill, like idx_puzzle_themes_theme_rand_key
+    op.create_index(
+        "idx_puzzle_openings_opening_rand_key", "puzzle_openings", ["opening", "rand_key"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_puzzle_openings_opening_rand_key", table_name="puzzle_openings")
+    op.drop_table("puzzle_openings")
@@ -0,0 +1,27 @@
+"""Random-key fallback — idx_puzzles_rand_key
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+Indexes puzzles.rand_key on its own so the unfiltered random-puzzle fallback
+is a single index seek instead of COUNT(*) followed by OFFSET (two full scans).
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_puzzles_rand_key", "puzzles", ["rand_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_puzzles_rand_key", table_name="puzzles")
@@ -0,0 +1,102 @@
+"""Dashboard aggregates — user_stats
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+One row per user with solve/fail counts, streaks, time totals and per-theme
+results, so the dashboard is a primary-key read instead of aggregating
+user_progress on every view. progress_service.record_submissions keeps it in
+step with every user_progress insert; existing history is backfilled here.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("solved_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("failed_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("current_streak", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("best_streak", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_time_ms", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("timed_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "theme_stats",
+            postgresql.JSONB(),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("last_solved_at", sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    # Streaks: each failure starts a new run; a run's length is its solves
+    op.execute(
+        """
+        WITH ordered AS (
+            SELECT user_id, result,
+                   COUNT(*) FILTER (WHERE result = 'failed')
+                       OVER (PARTITION BY user_id ORDER BY solved_at, id) AS run
+            FROM user_progress
+        ),
+        runs AS (
+            SELECT user_id, run, COUNT(*) FILTER (WHERE result = 'solved') AS length
+            FROM ordered GROUP BY user_id, run
+        ),
+        streaks AS (
+            SELECT DISTINCT ON (user_id) user_id, length AS current_streak,
+                   MAX(length) OVER (PARTITION BY user_id) AS best_streak
+            FROM runs ORDER BY user_id, run DESC
+        ),
+        themes AS (
+            SELECT user_id, jsonb_object_agg(theme, jsonb_build_array(solved, failed)) AS stats
+            FROM (
+                SELECT up.user_id, t.theme,
+                       COUNT(*) FILTER (WHERE up.result = 'solved') AS solved,
+                       COUNT(*) FILTER (WHERE up.result = 'failed') AS failed
+                FROM user_progress up JOIN puzzle_themes t ON t.puzzle_id = up.puzzle_id
+                GROUP BY up.user_id, t.theme
+            ) AS per_theme
+            GROUP BY user_id
+        )
+        INSERT INTO user_stats (
+            user_id, solved_count, failed_count, current_streak, best_streak,
+            total_time_ms, timed_count, theme_stats, last_solved_at
+        )
+        SELECT up.user_id,
+               COUNT(*) FILTER (WHERE up.result = 'solved'),
+               COUNT(*) FILTER (WHERE up.result = 'failed'),
+               s.current_streak, s.best_streak,
+               COALESCE(SUM(up.time_spent_ms), 0),
+               COUNT(up.time_spent_ms),
+               COALESCE(t.stats, '{}'::jsonb),
+               MAX(up.solved_at)
+        FROM user_progress up
+        JOIN streaks s ON s.user_id = up.user_id
+        LEFT JOIN themes t ON t.user_id = up.user_id
+        GROUP BY up.user_id, s.current_streak, s.best_streak, t.stats
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -1,17 +1,146 @@
-from collections.abc import AsyncGenerator
+import threading
+import time
+import uuid
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import structlog
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 
 settings = get_settings()
+logger = structlog.get_logger()
+
+# Upper bounds (ms) of the checkout-wait histogram; the last bucket is open
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+@dataclass
+class PoolMetrics:
+    """Cumulative checkout-wait figures for one connection pool."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    wait_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, wait_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            bucket = next(
+                (i for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS_MS) if wait_ms <= bound),
+                len(CHECKOUT_WAIT_BUCKETS_MS),
+            )
+            self.wait_buckets[bucket] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_mean_ms": round(self.wait_total_ms / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_buckets_ms": {
+                    **{
+                        f"le_{bound}": count
+                        for bound, count in zip(CHECKOUT_WAIT_BUCKETS_MS, self.wait_buckets)
+                    },
+                    "le_inf": self.wait_buckets[-1],
+                },
+            }
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times every checkout.
+
+    The time is what a request waits for a usable connection: queueing for a
+    free slot, opening an overflow connection and the pre-ping, if enabled.
+    Checkouts that hit pool_timeout are counted separately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.record((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        self.metrics.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def _statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(settings: Settings) -> dict:
+    """
+    create_async_engine keyword arguments from the DB_* settings.
+
+    With DB_PGBOUNCER, both the asyncpg statement cache and SQLAlchemy's
+    prepared-statement cache are turned off and every prepared statement gets
+    a unique name. A transaction-mode pooler hands each transaction a
+    different server connection, so a statement prepared on one is missing
+    (or already taken) on the next.
+    """
+    if settings.db_pgbouncer:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _statement_name,
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+    return {
+        "echo": settings.db_echo,
+        "poolclass": MeteredQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": settings.db_pool_use_lifo,
+        "connect_args": connect_args,
+    }
+
 
 # Create the async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "development",
-    pool_pre_ping=True,
-)
+engine = create_async_engine(settings.database_url, **engine_options(settings))
+
+# Optional read replica for read-only routes (get_read_db)
+read_engine = None
+if settings.database_read_url:
+    _read_options = engine_options(settings)
+    # Fail over to the primary quickly instead of after asyncpg's 60 s default
+    _read_options["connect_args"]["timeout"] = settings.database_read_connect_timeout_seconds
+    read_engine = create_async_engine(settings.database_read_url, **_read_options)
 
 # Session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -25,6 +154,28 @@ AsyncSessionLocal = async_sessionmaker(
 # Alias for clarity in service layer
 async_session_factory = AsyncSessionLocal
 
+# After a failed replica checkout, read-only routes use the primary until then
+_replica_retry_at = 0.0
+
+
+def _engine_pool_status(target) -> dict:
+    pool = target.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **pool.metrics.snapshot(),
+    }
+
+
+def pool_status() -> dict:
+    """Occupancy and cumulative checkout-wait metrics of the primary and replica pools."""
+    return {
+        "primary": _engine_pool_status(engine),
+        "replica": None if read_engine is None else _engine_pool_status(read_engine),
+    }
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency: yields an async database session per request."""
@@ -37,3 +188,49 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+async def _connect_for_read() -> AsyncConnection:
+    """A connection from the replica pool if configured and reachable, else the primary's."""
+    global _replica_retry_at
+    if read_engine is not None and time.monotonic() >= _replica_retry_at:
+        try:
+            return await read_engine.connect()
+        except (OSError, exc.DBAPIError, exc.TimeoutError) as error:
+            _replica_retry_at = time.monotonic() + settings.database_read_retry_seconds
+            logger.warning(
+                "read_replica_unavailable",
+                error=str(error),
+                retry_seconds=settings.database_read_retry_seconds,
+            )
+    return await engine.connect()
+
+
+@asynccontextmanager
+async def read_connection() -> AsyncIterator[AsyncConnection]:
+    """
+    A pooled connection for reads, on the read replica when DATABASE_READ_URL
+    is set.
+
+    No ORM session is built and the connection runs in autocommit, so each
+    statement is its own implicit transaction. There is no BEGIN before the
+    first query and no COMMIT or ROLLBACK after the last. A caller that needs
+    several reads from one snapshot opens ``async with conn.begin()`` after
+    setting ``isolation_level="REPEATABLE READ"`` and
+    ``postgresql_readonly=True`` via ``execution_options``.
+
+    Falls back to the primary when the replica cannot be reached, and keeps
+    using the primary for DATABASE_READ_RETRY_SECONDS before trying it again.
+    Rows written moments ago may not be on the replica yet.
+    """
+    conn = await _connect_for_read()
+    try:
+        yield await conn.execution_options(isolation_level="AUTOCOMMIT")
+    finally:
+        await conn.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncConnection, None]:
+    """FastAPI dependency for read-only routes: a read_connection per request."""
+    async with read_connection() as conn:
+        yield conn
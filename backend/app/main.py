@@ -6,6 +6,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
+from app.db.asyncpg_pool import start_asyncpg_pool, stop_asyncpg_pool
+from app.services.puzzle_service import start_puzzle_pool, stop_puzzle_pool
+from app.services.submission_queue import start_submission_queue, stop_submission_queue
 
 logger = structlog.get_logger()
 
@@ -16,7 +19,14 @@ async def lifespan(app: FastAPI):
     if settings.sentry_dsn:
         sentry_sdk.init(dsn=settings.sentry_dsn, environment=settings.environment)
     logger.info("startup", environment=settings.environment)
+    await start_asyncpg_pool(settings)
+    await start_puzzle_pool(settings)
+    await start_submission_queue(settings)
     yield
+    # Drain before anything else shuts down: queued submissions are not yet stored
+    await stop_submission_queue()
+    await stop_puzzle_pool()
+    await stop_asyncpg_pool()
     logger.info("shutdown")
 
 
@@ -41,6 +51,15 @@ def create_app() -> FastAPI:
     async def health():
         return {"status": "ok"}
 
+    if settings.health_pool_enabled:
+
+        @app.get("/health/pool")
+        async def health_pool():
+            """Connection pool occupancy and checkout-wait metrics for this worker."""
+            from app.db.session import pool_status
+
+            return pool_status()
+
     from app.api.v1 import router as api_v1_router
 
     app.include_router(api_v1_router, prefix="/api/v1")
@@ -1,7 +1,25 @@
 from app.models.base import Base
-from app.models.puzzle import Puzzle
+from app.models.puzzle import (
+    Puzzle,
+    PuzzleOpening,
+    PuzzleRatingCount,
+    PuzzleTheme,
+    PuzzleThemeCount,
+)
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.models.user_progress import UserProgress
+from app.models.user_stats import UserStats
 
-__all__ = ["Base", "User", "Puzzle", "UserProgress", "RefreshToken"]
+__all__ = [
+    "Base",
+    "User",
+    "Puzzle",
+    "PuzzleOpening",
+    "PuzzleRatingCount",
+    "PuzzleTheme",
+    "PuzzleThemeCount",
+    "UserProgress",
+    "UserStats",
+    "RefreshToken",
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Text
+from sqlalchemy import BigInteger, Double, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -10,10 +10,65 @@ class Puzzle(Base):
     id: Mapped[str] = mapped_column(String(10), primary_key=True)  # Lichess ID e.g. "00sHx"
     fen: Mapped[str] = mapped_column(Text, nullable=False)
     moves: Mapped[str] = mapped_column(Text, nullable=False)  # space-separated UCI moves
-    rating: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    rating: Mapped[int] = mapped_column(Integer, nullable=False)
     rating_deviation: Mapped[int] = mapped_column(Integer, nullable=False)
     popularity: Mapped[int] = mapped_column(Integer, nullable=False)
     nb_plays: Mapped[int] = mapped_column(Integer, nullable=False)
     themes: Mapped[str | None] = mapped_column(Text, nullable=True)
     game_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     opening_tags: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # uniform [0, 1) key for index-seek random sampling
+    rand_key: Mapped[float] = mapped_column(
+        Double, nullable=False, server_default=text("random()")
+    )
+
+    __table_args__ = (
+        Index("idx_puzzles_rating_rand_key", "rating", "rand_key"),
+        Index("idx_puzzles_rand_key", "rand_key"),
+    )
+
+
+class PuzzleRatingCount(Base):
+    """Puzzles per rating; refreshed by scripts/import_puzzles.py after each load."""
+
+    __tablename__ = "puzzle_rating_counts"
+
+    rating: Mapped[int] = mapped_column(Integer, primary_key=True)
+    puzzle_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class PuzzleTheme(Base):
+    """One row per (puzzle, theme), split from Puzzle.themes by the importer."""
+
+    __tablename__ = "puzzle_themes"
+
+    puzzle_id: Mapped[str] = mapped_column(
+        ForeignKey("puzzles.id", ondelete="CASCADE"), primary_key=True
+    )
+    theme: Mapped[str] = mapped_column(Text, primary_key=True)
+    rand_key: Mapped[float] = mapped_column(Double, nullable=False)  # copy of Puzzle.rand_key
+
+    __table_args__ = (Index("idx_puzzle_themes_theme_rand_key", "theme", "rand_key"),)
+
+
+class PuzzleThemeCount(Base):
+    """Puzzles per theme; refreshed by scripts/import_puzzles.py after each load."""
+
+    __tablename__ = "puzzle_theme_counts"
+
+    theme: Mapped[str] = mapped_column(Text, primary_key=True)
+    puzzle_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class PuzzleOpening(Base):
+    """One row per (puzzle, opening tag), split from Puzzle.opening_tags by the importer."""
+
+    __tablename__ = "puzzle_openings"
+
+    puzzle_id: Mapped[str] = mapped_column(
+        ForeignKey("puzzles.id", ondelete="CASCADE"), primary_key=True
+    )
+    opening: Mapped[str] = mapped_column(Text, primary_key=True)
+    rand_key: Mapped[float] = mapped_column(Double, nullable=False)  # copy of Puzzle.rand_key
+
+    __table_args__ = (Index("idx_puzzle_openings_opening_rand_key", "opening", "rand_key"),)
@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PuzzleSummary(BaseModel):
+    rating: int
+    themes: Optional[list[str]] = None  # split from space-separated string; None if empty/NULL
+
+
+class ProgressEntry(BaseModel):
+    id: uuid.UUID
+    puzzle_id: str
+    result: str  # "solved" | "failed"
+    time_spent_ms: Optional[int] = None
+    solved_at: datetime
+    puzzle: Optional[PuzzleSummary] = None  # only with include_puzzle=true
+
+
+class ProgressPage(BaseModel):
+    items: list[ProgressEntry]
+    next_cursor: Optional[str] = None  # opaque; None on the last page
+
+
+class ThemeStats(BaseModel):
+    theme: str
+    solved: int
+    failed: int
+    accuracy: float  # solved / (solved + failed)
+
+
+class UserStatsResponse(BaseModel):
+    solved: int
+    failed: int
+    accuracy: Optional[float] = None  # None before the first attempt
+    current_streak: int
+    best_streak: int
+    average_time_ms: Optional[int] = None  # over attempts that reported a time
+    last_solved_at: Optional[datetime] = None
+    themes: list[ThemeStats]  # most attempted first
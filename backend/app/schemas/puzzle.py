@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PuzzleResponse(BaseModel):
@@ -11,3 +11,22 @@ class PuzzleResponse(BaseModel):
     themes: Optional[list[str]] = None  # split from space-separated string; None if empty/NULL
 
     model_config = {"from_attributes": True}
+
+
+class PuzzleBatchResponse(BaseModel):
+    puzzles: list[PuzzleResponse]  # distinct; fewer than requested if filters match too few
+
+
+# user_progress.time_spent_ms is an int4 column
+MAX_TIME_SPENT_MS = 2_147_483_647
+
+
+class SubmitRequest(BaseModel):
+    result: Literal["solved", "failed"]
+    time_spent_ms: Optional[int] = Field(None, ge=0, le=MAX_TIME_SPENT_MS)
+
+
+class SubmitResponse(BaseModel):
+    puzzle_id: str
+    result: Literal["solved", "failed"]
+    queued: bool  # True: written shortly by the submission queue; False: already written
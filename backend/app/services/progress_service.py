@@ -0,0 +1,282 @@
+import base64
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.services.puzzle_service import mark_puzzle_seen
+
+# Page size bounds for GET /users/me/progress
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Keyset pagination on (solved_at DESC, id DESC). The explicit
+# ``solved_at <= :solved_at`` bound is what lets the planner start the scan of
+# idx_user_progress_solved_at (user_id, solved_at DESC) at the cursor, so a
+# deep page reads the same number of index entries as the first one.
+_PAGE_SQL = """
+SELECT up.id, up.puzzle_id, up.result, up.time_spent_ms, up.solved_at{columns}
+FROM user_progress up{join}
+WHERE up.user_id = :user_id{after}
+ORDER BY up.solved_at DESC, up.id DESC
+LIMIT :limit
+"""
+_AFTER = "\n  AND up.solved_at <= :solved_at AND (up.solved_at < :solved_at OR up.id < :id)"
+_PUZZLE_COLUMNS = ", p.rating, p.themes"
+_PUZZLE_JOIN = "\nJOIN puzzles p ON p.id = up.puzzle_id"
+
+PAGE_SQL = {
+    (include_puzzle, after): text(
+        _PAGE_SQL.format(
+            columns=_PUZZLE_COLUMNS if include_puzzle else "",
+            join=_PUZZLE_JOIN if include_puzzle else "",
+            after=_AFTER if after else "",
+        )
+    )
+    for include_puzzle in (False, True)
+    for after in (False, True)
+}
+
+
+class InvalidCursor(ValueError):
+    """The cursor token was not produced by encode_cursor."""
+
+
+def encode_cursor(solved_at: datetime, entry_id: uuid.UUID) -> str:
+    """Opaque token for the position just after (solved_at, entry_id)."""
+    raw = json.dumps({"t": solved_at.isoformat(), "i": str(entry_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        solved_at = datetime.fromisoformat(position["t"])
+        entry_id = uuid.UUID(position["i"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if solved_at.tzinfo is None:
+        raise InvalidCursor(cursor)
+    return solved_at, entry_id
+
+
+async def get_progress_page(
+    db: AsyncConnection | AsyncSession,
+    user_id: uuid.UUID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    include_puzzle: bool = False,
+) -> tuple[list, str | None]:
+    """
+    Return one page of the user's solve history, newest first, and the cursor
+    for the next page (None on the last page).
+
+    One query per page: ``limit + 1`` rows are read to detect a next page, and
+    with include_puzzle the puzzle's rating and themes come from a join in
+    the same query. Raises InvalidCursor for a malformed cursor.
+    """
+    params = {"user_id": user_id, "limit": limit + 1}
+    if cursor is not None:
+        params["solved_at"], params["id"] = decode_cursor(cursor)
+    result = await db.execute(PAGE_SQL[include_puzzle, cursor is not None], params)
+    rows = result.mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["solved_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+# ---------------------------------------------------------------------------
+# Submissions and user_stats
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Submission:
+    """One puzzle attempt, as it will be stored in user_progress."""
+
+    user_id: uuid.UUID
+    puzzle_id: str
+    result: str  # "solved" | "failed"
+    time_spent_ms: int | None = None
+    solved_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+
+
+# Multi-row insert of a batch; (user_id, puzzle_id) pairs that already have a
+# result, or whose user or puzzle does not exist (access tokens outlive a
+# deleted account), are skipped. Returns the inserted rows with their
+# puzzle's themes for the stats update.
+INSERT_SUBMISSIONS_SQL = text(
+    """
+    WITH batch AS (
+        SELECT * FROM unnest(
+            CAST(:ids AS uuid[]), CAST(:user_ids AS uuid[]), CAST(:puzzle_ids AS text[]),
+            CAST(:results AS text[]), CAST(:times AS integer[]),
+            CAST(:solved_ats AS timestamptz[])
+        ) AS b(id, user_id, puzzle_id, result, time_spent_ms, solved_at)
+    ),
+    inserted AS (
+        INSERT INTO user_progress (id, user_id, puzzle_id, result, time_spent_ms, solved_at)
+        SELECT b.* FROM batch b
+        JOIN puzzles p ON p.id = b.puzzle_id
+        JOIN users u ON u.id = b.user_id
+        ON CONFLICT (user_id, puzzle_id) DO NOTHING
+        RETURNING id, puzzle_id
+    )
+    SELECT i.id, p.themes FROM inserted i JOIN puzzles p ON p.id = i.puzzle_id
+    """
+)
+
+# Adds one user's StatsDelta. Streaks: without a failure in the delta the
+# current streak grows by the delta's solves; otherwise it restarts at the
+# solves after the last failure. theme_stats is merged key by key.
+UPSERT_USER_STATS_SQL = text(
+    """
+    INSERT INTO user_stats (
+        user_id, solved_count, failed_count, current_streak, best_streak,
+        total_time_ms, timed_count, theme_stats, last_solved_at, updated_at
+    )
+    VALUES (
+        :user_id, :solved, :failed, :tail_streak, :best_run,
+        :total_time_ms, :timed, CAST(:themes AS jsonb), :last_solved_at, now()
+    )
+    ON CONFLICT (user_id) DO UPDATE SET
+        solved_count = user_stats.solved_count + EXCLUDED.solved_count,
+        failed_count = user_stats.failed_count + EXCLUDED.failed_count,
+        current_streak = CASE WHEN EXCLUDED.failed_count > 0
+            THEN EXCLUDED.current_streak
+            ELSE user_stats.current_streak + EXCLUDED.current_streak END,
+        best_streak = GREATEST(
+            user_stats.best_streak,
+            user_stats.current_streak + :head_streak,
+            EXCLUDED.best_streak
+        ),
+        total_time_ms = user_stats.total_time_ms + EXCLUDED.total_time_ms,
+        timed_count = user_stats.timed_count + EXCLUDED.timed_count,
+        theme_stats = (
+            SELECT COALESCE(jsonb_object_agg(k, jsonb_build_array(
+                COALESCE((user_stats.theme_stats -> k ->> 0)::int, 0)
+                    + COALESCE((EXCLUDED.theme_stats -> k ->> 0)::int, 0),
+                COALESCE((user_stats.theme_stats -> k ->> 1)::int, 0)
+                    + COALESCE((EXCLUDED.theme_stats -> k ->> 1)::int, 0)
+            )), '{}'::jsonb)
+            FROM (
+                SELECT jsonb_object_keys(user_stats.theme_stats)
+                UNION
+                SELECT jsonb_object_keys(EXCLUDED.theme_stats)
+            ) AS keys(k)
+        ),
+        last_solved_at = GREATEST(user_stats.last_solved_at, EXCLUDED.last_solved_at),
+        updated_at = now()
+    """
+)
+
+USER_STATS_SQL = text(
+    """
+    SELECT solved_count, failed_count, current_streak, best_streak,
+           total_time_ms, timed_count, theme_stats, last_solved_at
+    FROM user_stats WHERE user_id = :user_id
+    """
+)
+
+
+@dataclass
+class StatsDelta:
+    """What a run of one user's submissions adds to their user_stats row."""
+
+    solved: int = 0
+    failed: int = 0
+    head_streak: int = 0  # solves before the first failure
+    tail_streak: int = 0  # solves after the last failure
+    best_run: int = 0  # longest run of solves
+    total_time_ms: int = 0
+    timed: int = 0
+    themes: dict[str, list[int]] = field(default_factory=dict)
+    last_solved_at: datetime | None = None
+
+    def add(self, submission: Submission, themes: str | None) -> None:
+        """Fold in the user's next submission (in solve order)."""
+        solved = submission.result == "solved"
+        if solved:
+            self.solved += 1
+            self.tail_streak += 1
+            if not self.failed:
+                self.head_streak += 1
+            self.best_run = max(self.best_run, self.tail_streak)
+        else:
+            self.failed += 1
+            self.tail_streak = 0
+        if submission.time_spent_ms is not None:
+            self.total_time_ms += submission.time_spent_ms
+            self.timed += 1
+        for theme in (themes or "").split():
+            self.themes.setdefault(theme, [0, 0])[0 if solved else 1] += 1
+        if self.last_solved_at is None or submission.solved_at > self.last_solved_at:
+            self.last_solved_at = submission.solved_at
+
+    def params(self, user_id: uuid.UUID) -> dict:
+        return {
+            "user_id": user_id,
+            "solved": self.solved,
+            "failed": self.failed,
+            "head_streak": self.head_streak,
+            "tail_streak": self.tail_streak,
+            "best_run": self.best_run,
+            "total_time_ms": self.total_time_ms,
+            "timed": self.timed,
+            "themes": json.dumps(self.themes),
+            "last_solved_at": self.last_solved_at,
+        }
+
+
+async def record_submissions(db: AsyncSession, submissions: list[Submission]) -> int:
+    """
+    Insert a batch of submissions and fold them into user_stats.
+
+    Two statements whatever the batch size: one multi-row insert into
+    user_progress, then one executemany upsert of a per-user StatsDelta.
+    Only rows actually inserted count towards the stats, so a repeated
+    (user_id, puzzle_id) — one result per puzzle per user — changes nothing.
+    Inserted puzzles are also added to cached seen-puzzle filters. The caller
+    owns the transaction. Returns the number of rows inserted.
+    """
+    if not submissions:
+        return 0
+    result = await db.execute(
+        INSERT_SUBMISSIONS_SQL,
+        {
+            "ids": [s.id for s in submissions],
+            "user_ids": [s.user_id for s in submissions],
+            "puzzle_ids": [s.puzzle_id for s in submissions],
+            "results": [s.result for s in submissions],
+            "times": [s.time_spent_ms for s in submissions],
+            "solved_ats": [s.solved_at for s in submissions],
+        },
+    )
+    themes_by_id = {row_id: themes for row_id, themes in result.all()}
+
+    deltas: dict[uuid.UUID, StatsDelta] = {}
+    for submission in sorted(submissions, key=lambda s: s.solved_at):
+        if submission.id in themes_by_id:
+            delta = deltas.setdefault(submission.user_id, StatsDelta())
+            delta.add(submission, themes_by_id[submission.id])
+            mark_puzzle_seen(submission.user_id, submission.puzzle_id)
+    if deltas:
+        await db.execute(
+            UPSERT_USER_STATS_SQL,
+            [delta.params(user_id) for user_id, delta in deltas.items()],
+        )
+    return len(themes_by_id)
+
+
+async def get_user_stats(db: AsyncConnection | AsyncSession, user_id: uuid.UUID):
+    """The user's user_stats row as a mapping (a primary-key read), or None."""
+    result = await db.execute(USER_STATS_SQL, {"user_id": user_id})
+    return result.mappings().first()
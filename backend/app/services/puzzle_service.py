@@ -1,36 +1,803 @@
+import asyncio
+import bisect
+import hashlib
+import math
 import random
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 
+import asyncpg
+import orjson
+import structlog
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
+from app.config import get_settings
+from app.db.asyncpg_pool import discard_asyncpg_pool, get_asyncpg_pool
 
-async def get_random_puzzle(db: AsyncSession):
+logger = structlog.get_logger()
+
+PUZZLE_COLUMNS = "id, fen, moves, rating, themes"
+
+# Rating range accepted by the importer (PuzzleRow.rating)
+MIN_RATING = 0
+MAX_RATING = 4000
+
+# TABLESAMPLE picks whole pages, so ask for more than needed and trim
+SAMPLE_OVERSAMPLE = 2.0
+
+# Attempts at a count-weighted rating before falling back to a band scan
+RATING_PICK_ATTEMPTS = 3
+
+# Upper bound on themes per request (GET /puzzles/random?themes=)
+MAX_THEMES = 8
+
+# Longest Lichess opening tag is ~90 characters
+MAX_OPENING_LENGTH = 128
+
+# Upper bound on puzzles per request (GET /puzzles/random?count=)
+MAX_BATCH_COUNT = 50
+
+# Single-puzzle draws per missing puzzle when topping up a batch
+BATCH_TOP_UP_ATTEMPTS = 2
+
+# Unseen selection: candidates per unfiltered sampling query, and the Bloom
+# filter's smallest capacity and target false-positive rate
+UNSEEN_SAMPLE_SIZE = 32
+SEEN_FILTER_MIN_CAPACITY = 1024
+SEEN_FILTER_ERROR_RATE = 0.01
+
+# One index seek on (rating, rand_key); the second branch wraps around past
+# the largest key and only runs when the first finds nothing.
+RATING_SEEK_SQL = text(
+    f"""
+    (SELECT {PUZZLE_COLUMNS} FROM puzzles
+     WHERE rating = :rating AND rand_key >= :key ORDER BY rand_key LIMIT 1)
+    UNION ALL
+    (SELECT {PUZZLE_COLUMNS} FROM puzzles
+     WHERE rating = :rating ORDER BY rand_key LIMIT 1)
+    LIMIT 1
+    """
+)
+
+# Fallback for the unfiltered path: one seek on idx_puzzles_rand_key, wrapping
+# around past the largest key. Needs no row count; an empty table yields None.
+RANDOM_SEEK_SQL = text(
+    f"""
+    (SELECT {PUZZLE_COLUMNS} FROM puzzles
+     WHERE rand_key >= :key ORDER BY rand_key LIMIT 1)
+    UNION ALL
+    (SELECT {PUZZLE_COLUMNS} FROM puzzles ORDER BY rand_key LIMIT 1)
+    LIMIT 1
+    """
+)
+
+# Theme filters seek on (theme, rand_key) for the rarest requested theme; the
+# other themes and the rating band are checked on the joined puzzle row.
+# Wraps around like RATING_SEEK_SQL.
+THEME_SEEK_SQL = text(
+    """
+    (SELECT p.id, p.fen, p.moves, p.rating, p.themes
+     FROM puzzle_themes t JOIN puzzles p ON p.id = t.puzzle_id
+     WHERE t.theme = :theme AND t.rand_key >= :key
+       AND string_to_array(p.themes, ' ') @> CAST(:themes AS text[])
+       AND p.rating BETWEEN :min_rating AND :max_rating
+     ORDER BY t.rand_key LIMIT 1)
+    UNION ALL
+    (SELECT p.id, p.fen, p.moves, p.rating, p.themes
+     FROM puzzle_themes t JOIN puzzles p ON p.id = t.puzzle_id
+     WHERE t.theme = :theme
+       AND string_to_array(p.themes, ' ') @> CAST(:themes AS text[])
+       AND p.rating BETWEEN :min_rating AND :max_rating
+     ORDER BY t.rand_key LIMIT 1)
+    LIMIT 1
+    """
+)
+
+# Opening filters seek on (opening, rand_key); themes and the rating band are
+# checked on the joined puzzle row, whose themes may be NULL.
+OPENING_SEEK_SQL = text(
+    """
+    (SELECT p.id, p.fen, p.moves, p.rating, p.themes
+     FROM puzzle_openings o JOIN puzzles p ON p.id = o.puzzle_id
+     WHERE o.opening = :opening AND o.rand_key >= :key
+       AND string_to_array(COALESCE(p.themes, ''), ' ') @> CAST(:themes AS text[])
+       AND p.rating BETWEEN :min_rating AND :max_rating
+     ORDER BY o.rand_key LIMIT 1)
+    UNION ALL
+    (SELECT p.id, p.fen, p.moves, p.rating, p.themes
+     FROM puzzle_openings o JOIN puzzles p ON p.id = o.puzzle_id
+     WHERE o.opening = :opening
+       AND string_to_array(COALESCE(p.themes, ''), ' ') @> CAST(:themes AS text[])
+       AND p.rating BETWEEN :min_rating AND :max_rating
+     ORDER BY o.rand_key LIMIT 1)
+    LIMIT 1
+    """
+)
+
+# Used only when puzzle_rating_counts is stale or empty
+BAND_SCAN_SQL = text(
+    f"""
+    SELECT {PUZZLE_COLUMNS} FROM puzzles
+    WHERE rating BETWEEN :min_rating AND :max_rating AND rand_key >= :key
+    ORDER BY rand_key LIMIT 1
+    """
+)
+
+
+async def estimate_puzzle_count(db: AsyncConnection | AsyncSession) -> int:
+    """Planner row estimate for ``puzzles``; exact COUNT(*) if never analyzed."""
+    result = await db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'puzzles'::regclass")
+    )
+    estimate = result.scalar_one()
+    if estimate < 0:
+        result = await db.execute(text("SELECT COUNT(*) FROM puzzles"))
+        estimate = result.scalar_one()
+    return estimate
+
+
+async def sample_puzzles(db: AsyncConnection | AsyncSession, n: int) -> list[dict]:
+    """
+    Return up to ``n`` random puzzles in random order, in one round trip.
+
+    The sample percentage is sized from the planner's row estimate so that a
+    single TABLESAMPLE SYSTEM scan yields roughly ``SAMPLE_OVERSAMPLE * n``
+    rows; the surplus is discarded at random rather than with LIMIT, which
+    would favour the first sampled pages.
+    """
+    total = await estimate_puzzle_count(db)
+    if total <= 0:
+        return []
+    percent = min(100.0, n * SAMPLE_OVERSAMPLE / total * 100)
+    result = await db.execute(
+        text(
+            f"SELECT {PUZZLE_COLUMNS} FROM puzzles TABLESAMPLE SYSTEM(:percent) LIMIT :cap"
+        ),
+        {"percent": percent, "cap": n * 4},
+    )
+    rows = [dict(row) for row in result.mappings()]
+    if len(rows) > n:
+        return random.sample(rows, n)
+    random.shuffle(rows)
+    return rows
+
+
+class RatingCounts:
+    """Cumulative puzzle counts per rating, for count-weighted rating picks."""
+
+    def __init__(self, counts: list[tuple[int, int]]):
+        self.ratings: list[int] = []
+        self.cumulative: list[int] = []
+        total = 0
+        for rating, count in sorted(counts):
+            if count > 0:
+                total += count
+                self.ratings.append(rating)
+                self.cumulative.append(total)
+
+    def band_total(self, min_rating: int, max_rating: int) -> int:
+        lo = bisect.bisect_left(self.ratings, min_rating)
+        hi = bisect.bisect_right(self.ratings, max_rating)
+        if lo >= hi:
+            return 0
+        return self.cumulative[hi - 1] - (self.cumulative[lo - 1] if lo else 0)
+
+    def pick(self, min_rating: int, max_rating: int) -> int | None:
+        """Return a rating in the band, weighted by how many puzzles have it."""
+        lo = bisect.bisect_left(self.ratings, min_rating)
+        hi = bisect.bisect_right(self.ratings, max_rating)
+        if lo >= hi:
+            return None
+        base = self.cumulative[lo - 1] if lo else 0
+        target = random.randrange(base, self.cumulative[hi - 1])
+        return self.ratings[bisect.bisect_right(self.cumulative, target)]
+
+
+_rating_counts: tuple[float, RatingCounts] | None = None
+
+
+async def get_rating_counts(db: AsyncConnection | AsyncSession) -> RatingCounts:
+    """Return the cached puzzle_rating_counts, reloading it after its TTL."""
+    global _rating_counts
+    now = time.monotonic()
+    ttl = get_settings().rating_counts_ttl_seconds
+    if _rating_counts is None or now - _rating_counts[0] > ttl:
+        result = await db.execute(text("SELECT rating, puzzle_count FROM puzzle_rating_counts"))
+        _rating_counts = (now, RatingCounts([tuple(row) for row in result.all()]))
+    return _rating_counts[1]
+
+
+async def get_random_puzzle_in_band(
+    db: AsyncConnection | AsyncSession, min_rating: int, max_rating: int
+):
+    """
+    Return a random puzzle rated within [min_rating, max_rating], or None.
+
+    A rating is drawn in proportion to its puzzle count, then a random
+    rand_key is looked up on idx_puzzles_rating_rand_key — one index seek,
+    independent of band width and table size. If the counts are stale (the
+    drawn rating has no puzzles any more) or empty, a band scan ordered by
+    rand_key is used instead.
+    """
+    counts = await get_rating_counts(db)
+    for _ in range(RATING_PICK_ATTEMPTS):
+        rating = counts.pick(min_rating, max_rating)
+        if rating is None:
+            break
+        result = await db.execute(RATING_SEEK_SQL, {"rating": rating, "key": random.random()})
+        row = result.mappings().first()
+        if row is not None:
+            return row
+
+    band = {"min_rating": min_rating, "max_rating": max_rating}
+    result = await db.execute(BAND_SCAN_SQL, {**band, "key": random.random()})
+    row = result.mappings().first()
+    if row is None:
+        result = await db.execute(BAND_SCAN_SQL, {**band, "key": 0.0})
+        row = result.mappings().first()
+    return row
+
+
+_theme_counts: tuple[float, dict[str, int]] | None = None
+
+
+async def get_theme_counts(db: AsyncConnection | AsyncSession) -> dict[str, int]:
+    """Return the cached puzzle_theme_counts, reloading it after its TTL."""
+    global _theme_counts
+    now = time.monotonic()
+    ttl = get_settings().theme_counts_ttl_seconds
+    if _theme_counts is None or now - _theme_counts[0] > ttl:
+        result = await db.execute(text("SELECT theme, puzzle_count FROM puzzle_theme_counts"))
+        _theme_counts = (now, {theme: count for theme, count in result.all()})
+    return _theme_counts[1]
+
+
+async def get_random_puzzle_with_themes(
+    db: AsyncConnection | AsyncSession, themes: list[str], min_rating: int, max_rating: int
+):
+    """
+    Return a random puzzle tagged with every theme in ``themes``, or None.
+
+    The rarest requested theme (by puzzle_theme_counts) drives a seek from a
+    random rand_key on idx_puzzle_themes_theme_rand_key, so a single theme is
+    one index seek however rare it is. Further themes and the rating band are
+    filtered on the joined row; the seek walks forward in rand_key order until
+    one matches, which stays short unless the combination is much rarer than
+    its rarest theme.
+    """
+    counts = await get_theme_counts(db)
+    seek_theme = min(themes, key=lambda theme: counts.get(theme, 0))
+    result = await db.execute(
+        THEME_SEEK_SQL,
+        {
+            "theme": seek_theme,
+            "themes": [theme for theme in themes if theme != seek_theme],
+            "min_rating": min_rating,
+            "max_rating": max_rating,
+            "key": random.random(),
+        },
+    )
+    return result.mappings().first()
+
+
+async def get_random_puzzle_in_opening(
+    db: AsyncConnection | AsyncSession,
+    opening: str,
+    themes: list[str],
+    min_rating: int,
+    max_rating: int,
+):
+    """
+    Return a random puzzle tagged with ``opening`` (and every theme), or None.
+
+    ``opening`` is a Lichess opening tag, either a family
+    (``Sicilian_Defense``) or a variation
+    (``Sicilian_Defense_Najdorf_Variation``). The puzzle is found by a seek
+    from a random rand_key on idx_puzzle_openings_opening_rand_key. Themes and
+    the rating band are filtered on the joined row, as in
+    get_random_puzzle_with_themes.
+    """
+    result = await db.execute(
+        OPENING_SEEK_SQL,
+        {
+            "opening": opening,
+            "themes": themes,
+            "min_rating": min_rating,
+            "max_rating": max_rating,
+            "key": random.random(),
+        },
+    )
+    return result.mappings().first()
+
+
+class PuzzlePool:
+    """
+    In-memory pool of pre-sampled random puzzles.
+
+    Requests pop from the pool without touching the database. Whenever the
+    pool drops below ``low_water`` a single background task refills it to
+    ``size`` in ``refill_batch``-sized sampling queries. Entries older than
+    ``max_age`` seconds are dropped instead of served, so re-imported or
+    deleted puzzles age out. Each refill query runs on a connection from
+    ``connect`` (read_connection: the read replica if configured).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], AbstractAsyncContextManager[AsyncConnection]],
+        size: int,
+        refill_batch: int,
+        low_water: int,
+        max_age: float,
+    ):
+        self.connect = connect
+        self.size = size
+        self.refill_batch = refill_batch
+        self.low_water = low_water
+        self.max_age = max_age
+        self._entries: deque[tuple[float, dict]] = deque()
+        self._refill_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def take(self) -> dict | None:
+        """Pop a fresh puzzle, or return None if the pool is empty."""
+        rows = self.take_many(1)
+        return rows[0] if rows else None
+
+    def take_many(self, n: int) -> list[dict]:
+        """Pop up to ``n`` fresh puzzles; fewer if the pool runs out."""
+        rows = []
+        cutoff = time.monotonic() - self.max_age
+        while self._entries and len(rows) < n:
+            fetched_at, candidate = self._entries.popleft()
+            if fetched_at >= cutoff:
+                rows.append(candidate)
+        if len(self._entries) < self.low_water:
+            self.schedule_refill()
+        return rows
+
+    def schedule_refill(self) -> asyncio.Task:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+        return self._refill_task
+
+    async def _refill(self) -> None:
+        try:
+            while len(self._entries) < self.size:
+                wanted = min(self.refill_batch, self.size - len(self._entries))
+                async with self.connect() as db:
+                    rows = await sample_puzzles(db, wanted)
+                if not rows:
+                    break
+                fetched_at = time.monotonic()
+                self._entries.extend((fetched_at, row) for row in rows)
+                for row in rows:
+                    puzzle_json(row)  # serialize here rather than on the request path
+            logger.debug("puzzle_pool_refilled", size=len(self._entries))
+        except Exception:
+            logger.warning("puzzle_pool_refill_failed", size=len(self._entries), exc_info=True)
+
+    async def close(self) -> None:
+        if self._refill_task is not None and not self._refill_task.done():
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        self._entries.clear()
+
+
+_pool: PuzzlePool | None = None
+
+
+def get_puzzle_pool() -> PuzzlePool | None:
+    return _pool
+
+
+async def start_puzzle_pool(settings) -> PuzzlePool | None:
+    """Create the process-wide pool (if enabled) and start filling it."""
+    global _pool
+    if not settings.puzzle_pool_enabled or settings.puzzle_pool_size <= 0:
+        return None
+    from app.db.session import read_connection
+
+    _pool = PuzzlePool(
+        read_connection,
+        size=settings.puzzle_pool_size,
+        refill_batch=settings.puzzle_pool_refill_batch,
+        low_water=settings.puzzle_pool_low_water,
+        max_age=settings.puzzle_pool_max_age_seconds,
+    )
+    _pool.schedule_refill()
+    return _pool
+
+
+async def stop_puzzle_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def get_random_puzzle(
+    db: AsyncConnection | AsyncSession,
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    themes: list[str] | None = None,
+    opening: str | None = None,
+):
     """
     Return a random puzzle row as a mapping, or None if the table is empty.
 
+    With min_rating and/or max_rating the puzzle comes from that rating band
+    (see get_random_puzzle_in_band) and None means the band is empty. With
+    themes it carries all of them (see get_random_puzzle_with_themes) and None
+    means no puzzle matches. With opening the puzzle comes from that opening
+    (see get_random_puzzle_in_opening), combined with any other filter.
+
     Strategy (per ADR-003 — Accepted, benchmarked 2026-03-02):
+    0. In-memory pool (when started): served without a DB round trip; the
+       session is never used, so no connection is checked out.
     1. Primary: TABLESAMPLE SYSTEM(0.01) — 0.167ms on 3.5M rows (vs 2630ms for ORDER BY RANDOM()).
        Samples ~350 rows at the page level, returns one. O(1) relative to table size.
-    2. Fallback: random OFFSET — only triggers if TABLESAMPLE returns nothing (rare on large tables).
-       Benchmarked at 357ms; acceptable as an emergency fallback only.
+    2. Fallback: seek from a random rand_key on idx_puzzles_rand_key — only
+       triggers if TABLESAMPLE returns nothing (small or freshly imported
+       tables). One O(log n) index seek; replaces the COUNT(*) + OFFSET
+       fallback, which cost ~357ms on 3.5M rows.
     """
+    if opening is not None:
+        return await get_random_puzzle_in_opening(
+            db,
+            opening,
+            themes or [],
+            MIN_RATING if min_rating is None else min_rating,
+            MAX_RATING if max_rating is None else max_rating,
+        )
+
+    if themes:
+        return await get_random_puzzle_with_themes(
+            db,
+            themes,
+            MIN_RATING if min_rating is None else min_rating,
+            MAX_RATING if max_rating is None else max_rating,
+        )
+
+    if min_rating is not None or max_rating is not None:
+        return await get_random_puzzle_in_band(
+            db,
+            MIN_RATING if min_rating is None else min_rating,
+            MAX_RATING if max_rating is None else max_rating,
+        )
+
+    pool = get_puzzle_pool()
+    if pool is not None:
+        row = pool.take()
+        if row is not None:
+            return row
+
     result = await db.execute(
         text("SELECT id, fen, moves, rating, themes FROM puzzles TABLESAMPLE SYSTEM(0.01) LIMIT 1")
     )
     row = result.mappings().first()
 
     if row is None:
-        count_result = await db.execute(text("SELECT COUNT(*) FROM puzzles"))
-        count = count_result.scalar_one()
-        if count == 0:
-            return None
-        offset = random.randint(0, count - 1)
-        result = await db.execute(
-            text(
-                "SELECT id, fen, moves, rating, themes FROM puzzles LIMIT 1 OFFSET :offset"
-            ),
-            {"offset": offset},
-        )
+        result = await db.execute(RANDOM_SEEK_SQL, {"key": random.random()})
         row = result.mappings().first()
 
     return row
+
+
+# Fast path: the same two queries for asyncpg. Postgres splits moves and
+# themes, so a record converts straight into the PuzzleResponse shape.
+_RESPONSE_COLUMNS = (
+    "id, fen, string_to_array(moves, ' ') AS moves, rating,"
+    " string_to_array(NULLIF(themes, ''), ' ') AS themes"
+)
+RAW_TABLESAMPLE_SQL = (
+    f"SELECT {_RESPONSE_COLUMNS} FROM puzzles TABLESAMPLE SYSTEM(0.01) LIMIT 1"
+)
+RAW_SEEK_SQL = f"""
+    (SELECT {_RESPONSE_COLUMNS} FROM puzzles
+     WHERE rand_key >= $1 ORDER BY rand_key LIMIT 1)
+    UNION ALL
+    (SELECT {_RESPONSE_COLUMNS} FROM puzzles ORDER BY rand_key LIMIT 1)
+    LIMIT 1
+"""
+
+
+def puzzle_response(row) -> dict:
+    """PuzzleResponse fields from a puzzles row (space-separated moves and themes)."""
+    return {
+        "id": row["id"],
+        "fen": row["fen"],
+        "moves": row["moves"].split(),
+        "rating": row["rating"],
+        "themes": row["themes"].split() if row["themes"] else None,
+    }
+
+
+# Serialized PuzzleResponse bodies by puzzle id (LRU, with a TTL so that
+# re-imported puzzles are picked up)
+_puzzle_json: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+
+def _cached_json(puzzle_id: str, build) -> bytes:
+    settings = get_settings()
+    now = time.monotonic()
+    cached = _puzzle_json.get(puzzle_id)
+    if cached is not None and now - cached[0] <= settings.puzzle_json_ttl_seconds:
+        _puzzle_json.move_to_end(puzzle_id)
+        return cached[1]
+    body = orjson.dumps(build())
+    _puzzle_json[puzzle_id] = (now, body)
+    _puzzle_json.move_to_end(puzzle_id)
+    while len(_puzzle_json) > settings.puzzle_json_cache_size:
+        _puzzle_json.popitem(last=False)
+    return body
+
+
+def puzzle_json(row) -> bytes:
+    """
+    The puzzle's PuzzleResponse as JSON bytes, serialized once per puzzle.
+
+    Puzzles do not change between imports, so the body is cached by id and a
+    repeat serve costs one dict lookup: no splitting, model validation or
+    JSON encoding.
+    """
+    return _cached_json(row["id"], lambda: puzzle_response(row))
+
+
+def puzzles_json(rows) -> bytes:
+    """A PuzzleBatchResponse body assembled from the cached puzzle bodies."""
+    return b'{"puzzles":[' + b",".join(puzzle_json(row) for row in rows) + b"]}"
+
+
+async def fetch_random_puzzle_raw(pool: asyncpg.Pool) -> dict | None:
+    """get_random_puzzle's TABLESAMPLE-then-seek, on one asyncpg connection."""
+    async with pool.acquire() as conn:
+        record = await conn.fetchrow(RAW_TABLESAMPLE_SQL)
+        if record is None:
+            record = await conn.fetchrow(RAW_SEEK_SQL, random.random())
+    return None if record is None else dict(record)
+
+
+async def get_random_puzzle_fast() -> bytes | None:
+    """
+    An unfiltered random puzzle as PuzzleResponse JSON bytes, without
+    SQLAlchemy: from the in-memory pool, else through the asyncpg pool.
+
+    None when neither can serve one (not started, database error, empty
+    table); the caller then falls back to get_random_puzzle. A database
+    error drops the asyncpg pool for DATABASE_READ_RETRY_SECONDS.
+    """
+    pool = get_puzzle_pool()
+    if pool is not None:
+        row = pool.take()
+        if row is not None:
+            return puzzle_json(row)
+
+    raw_pool = get_asyncpg_pool()
+    if raw_pool is None:
+        return None
+    try:
+        puzzle = await fetch_random_puzzle_raw(raw_pool)
+    except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as error:
+        logger.warning("fast_path_failed", error=str(error))
+        discard_asyncpg_pool(raw_pool, error)
+        return None
+    if puzzle is None:
+        return None
+    return _cached_json(puzzle["id"], lambda: puzzle)
+
+
+async def get_random_puzzles(
+    db: AsyncConnection | AsyncSession,
+    count: int,
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    themes: list[str] | None = None,
+    opening: str | None = None,
+) -> list:
+    """
+    Return up to ``count`` distinct random puzzle rows, fewest round trips first.
+
+    Unfiltered batches come from the pool and then from one sample_puzzles
+    query for the remainder. Filtered batches, and unfiltered ones the sample
+    left short (small tables), are topped up with single draws from
+    get_random_puzzle; a short list means the filters match too few puzzles.
+    """
+    rows: dict[str, object] = {}
+    if min_rating is None and max_rating is None and not themes and opening is None:
+        pool = get_puzzle_pool()
+        if pool is not None:
+            for row in pool.take_many(count):
+                rows.setdefault(row["id"], row)
+        if len(rows) < count:
+            for row in await sample_puzzles(db, count - len(rows)):
+                rows.setdefault(row["id"], row)
+
+    attempts = (count - len(rows)) * BATCH_TOP_UP_ATTEMPTS
+    while len(rows) < count and attempts > 0:
+        attempts -= 1
+        row = await get_random_puzzle(
+            db, min_rating=min_rating, max_rating=max_rating, themes=themes, opening=opening
+        )
+        if row is None:
+            break
+        rows.setdefault(row["id"], row)
+    return list(rows.values())[:count]
+
+
+class SeenFilter:
+    """
+    Bloom filter of the puzzle ids one user has already been served.
+
+    Membership never has false negatives; a false positive (about
+    SEEN_FILTER_ERROR_RATE while ``count <= capacity``) only skips a puzzle
+    the user has not seen yet. 1,000 ids fit in ~1.2 KB.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = SEEN_FILTER_ERROR_RATE):
+        self.capacity = max(capacity, SEEN_FILTER_MIN_CAPACITY)
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, puzzle_id: str):
+        digest = hashlib.blake2b(puzzle_id.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, puzzle_id: str) -> None:
+        for bit in self._positions(puzzle_id):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, puzzle_id: str) -> bool:
+        return all(self.bits[bit >> 3] & (1 << (bit & 7)) for bit in self._positions(puzzle_id))
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+_seen_filters: OrderedDict[uuid.UUID, tuple[float, SeenFilter]] = OrderedDict()
+
+
+async def get_seen_filter(db: AsyncConnection | AsyncSession, user_id: uuid.UUID) -> SeenFilter:
+    """
+    Return the user's cached SeenFilter, building it from user_progress if needed.
+
+    Built by an index-only scan of the (user_id, puzzle_id) unique constraint,
+    sized at twice the user's history; rebuilt after its TTL or once it holds
+    more ids than it was sized for. The cache keeps the most recently used
+    ``seen_filter_cache_size`` users.
+    """
+    settings = get_settings()
+    now = time.monotonic()
+    cached = _seen_filters.get(user_id)
+    if cached is not None:
+        built_at, seen = cached
+        if now - built_at <= settings.seen_filter_ttl_seconds and not seen.saturated:
+            _seen_filters.move_to_end(user_id)
+            return seen
+
+    result = await db.execute(
+        text("SELECT puzzle_id FROM user_progress WHERE user_id = :user_id"),
+        {"user_id": user_id},
+    )
+    puzzle_ids = result.scalars().all()
+    seen = SeenFilter(2 * len(puzzle_ids))
+    for puzzle_id in puzzle_ids:
+        seen.add(puzzle_id)
+    _seen_filters[user_id] = (now, seen)
+    _seen_filters.move_to_end(user_id)
+    while len(_seen_filters) > settings.seen_filter_cache_size:
+        _seen_filters.popitem(last=False)
+    return seen
+
+
+def mark_puzzle_seen(user_id: uuid.UUID, puzzle_id: str) -> None:
+    """Record a served or solved puzzle in the user's cached filter, if any."""
+    cached = _seen_filters.get(user_id)
+    if cached is not None:
+        cached[1].add(puzzle_id)
+
+
+async def get_random_unseen_puzzle(
+    db: AsyncConnection | AsyncSession,
+    user_id: uuid.UUID,
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    themes: list[str] | None = None,
+    opening: str | None = None,
+):
+    """
+    Return a random puzzle the user has no user_progress row for, or None.
+
+    Candidates are checked against the user's SeenFilter instead of an
+    anti-join on user_progress, so the cost does not grow with the user's
+    history. Each attempt is one query: an unfiltered TABLESAMPLE of
+    UNSEEN_SAMPLE_SIZE rows, or one filtered index seek. At most
+    ``unseen_max_attempts`` attempts run, and no new one starts once
+    ``unseen_budget_ms`` has elapsed, which bounds p99 latency at a few
+    sub-millisecond queries plus (on a cache miss) the filter build. None
+    means nothing unseen turned up within that bound.
+    """
+    settings = get_settings()
+    deadline = time.monotonic() + settings.unseen_budget_ms / 1000
+    seen = await get_seen_filter(db, user_id)
+    unfiltered = min_rating is None and max_rating is None and not themes and opening is None
+
+    attempts = 0
+    while attempts < settings.unseen_max_attempts:
+        attempts += 1
+        if unfiltered:
+            candidates = await sample_puzzles(db, UNSEEN_SAMPLE_SIZE)
+        else:
+            row = await get_random_puzzle(
+                db, min_rating=min_rating, max_rating=max_rating, themes=themes, opening=opening
+            )
+            candidates = [] if row is None else [row]
+        if not candidates and not unfiltered:
+            return None  # the filters match nothing at all
+        for row in candidates:
+            if row["id"] not in seen:
+                return row
+        if time.monotonic() > deadline:
+            break
+
+    logger.info("unseen_puzzle_not_found", user_id=str(user_id), attempts=attempts)
+    return None
+
+
+async def get_random_unseen_puzzles(
+    db: AsyncConnection | AsyncSession,
+    user_id: uuid.UUID,
+    count: int,
+    min_rating: int | None = None,
+    max_rating: int | None = None,
+    themes: list[str] | None = None,
+    opening: str | None = None,
+) -> list:
+    """
+    Return up to ``count`` distinct random puzzles, the user's unseen ones first.
+
+    Each attempt draws the missing number with get_random_puzzles and keeps
+    the candidates not in the user's SeenFilter. Attempts are bounded like
+    get_random_unseen_puzzle's (``unseen_max_attempts``, ``unseen_budget_ms``)
+    and stop early once a draw comes back short, since the filters then match
+    too few puzzles for another draw to help. A batch still short after that
+    is topped up with drawn puzzles the user has seen.
+    """
+    settings = get_settings()
+    deadline = time.monotonic() + settings.unseen_budget_ms / 1000
+    seen = await get_seen_filter(db, user_id)
+    filters = {
+        "min_rating": min_rating,
+        "max_rating": max_rating,
+        "themes": themes,
+        "opening": opening,
+    }
+
+    unseen: dict[str, object] = {}
+    drawn_seen: dict[str, object] = {}
+    for _ in range(settings.unseen_max_attempts):
+        wanted = count - len(unseen)
+        rows = await get_random_puzzles(db, wanted, **filters)
+        for row in rows:
+            (drawn_seen if row["id"] in seen else unseen).setdefault(row["id"], row)
+        if len(unseen) >= count or len(rows) < wanted or time.monotonic() > deadline:
+            break
+
+    picked = list(unseen.values())[:count]
+    picked += list(drawn_seen.values())[: count - len(picked)]
+    return picked
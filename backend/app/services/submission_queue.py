@@ -0,0 +1,199 @@
+import asyncio
+import time
+
+import structlog
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.services.progress_service import Submission, record_submissions
+
+logger = structlog.get_logger()
+
+# Attempts per batch before it is dropped (and logged) as unwritable
+FLUSH_ATTEMPTS = 3
+FLUSH_RETRY_DELAY = 0.5
+
+
+class SubmissionQueueFull(Exception):
+    """The queue stayed full for the whole enqueue timeout."""
+
+
+def _rejected_by_server(error: Exception) -> bool:
+    """
+    True when a reachable database refused the statement (bad data in the
+    batch), as opposed to the database being unavailable.
+    """
+    return (
+        isinstance(error, exc.DBAPIError)
+        and not isinstance(error, exc.InterfaceError)
+        and not error.connection_invalidated
+    )
+
+
+class SubmissionQueue:
+    """
+    In-process write-behind queue for puzzle submissions.
+
+    Requests enqueue and return without touching the database. A single
+    flusher task writes batches of up to ``batch_size`` submissions with
+    record_submissions in one transaction, at most ``max_delay`` seconds after
+    the first submission of the batch arrived. The queue holds at most
+    ``max_size`` submissions; when it is full, enqueue waits up to
+    ``enqueue_timeout`` seconds and then raises SubmissionQueueFull.
+
+    A batch the database rejects is split in halves until the rejected rows
+    are isolated, so a bad submission loses only itself. A batch that fails
+    because the database is unavailable is retried whole, then dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_size: int,
+        batch_size: int,
+        max_delay: float,
+        enqueue_timeout: float,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue[Submission] = asyncio.Queue(max_size)
+        self._batch: list[Submission] = []  # collected, not yet handed to a flush
+        self._flusher: asyncio.Task | None = None
+        self._inflight: asyncio.Future | None = None
+        self._closing = False
+
+    def __len__(self) -> int:
+        return self._queue.qsize() + len(self._batch)
+
+    def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def enqueue(self, submission: Submission) -> None:
+        if self._closing:
+            raise SubmissionQueueFull("submission queue is draining")
+        try:
+            async with asyncio.timeout(self.enqueue_timeout):
+                await self._queue.put(submission)
+        except TimeoutError:
+            logger.warning("submission_queue_full", size=self._queue.qsize())
+            raise SubmissionQueueFull("submission queue is full") from None
+
+    async def _collect(self) -> None:
+        """Fill self._batch: wait for one submission, then up to max_delay for more."""
+        self._batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.max_delay
+        while len(self._batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                async with asyncio.timeout(remaining):
+                    self._batch.append(await self._queue.get())
+            except TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect()
+            batch, self._batch = self._batch, []
+            # Shielded: cancelling the flusher never interrupts a write
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _write(self, batch: list[Submission]) -> None:
+        async with self.session_factory() as db:
+            inserted = await record_submissions(db, batch)
+            await db.commit()
+        logger.debug("submissions_flushed", batch=len(batch), inserted=inserted)
+
+    async def _flush(self, batch: list[Submission]) -> None:
+        for attempt in range(1, FLUSH_ATTEMPTS + 1):
+            try:
+                await self._write(batch)
+                return
+            except Exception as error:
+                if _rejected_by_server(error):
+                    # Retrying the same rows cannot help
+                    await self._split(batch, error)
+                    return
+                if attempt == FLUSH_ATTEMPTS:
+                    logger.error(
+                        "submissions_dropped", batch=len(batch), attempts=attempt, exc_info=True
+                    )
+                    return
+                logger.warning("submission_flush_failed", batch=len(batch), attempt=attempt)
+                await asyncio.sleep(FLUSH_RETRY_DELAY * attempt)
+
+    async def _split(self, batch: list[Submission], error: Exception) -> None:
+        """Write the halves of a rejected batch separately, down to single rows."""
+        if len(batch) == 1:
+            logger.error(
+                "submission_rejected",
+                user_id=str(batch[0].user_id),
+                puzzle_id=batch[0].puzzle_id,
+                error=str(error),
+            )
+            return
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            try:
+                await self._write(half)
+            except Exception as half_error:
+                if _rejected_by_server(half_error):
+                    await self._split(half, half_error)
+                else:
+                    await self._flush(half)
+
+    async def drain(self) -> None:
+        """Stop accepting submissions and write everything still queued."""
+        self._closing = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._inflight is not None:
+            await self._inflight
+        while not self._queue.empty():
+            self._batch.append(self._queue.get_nowait())
+        for start in range(0, len(self._batch), self.batch_size):
+            await self._flush(self._batch[start:start + self.batch_size])
+        self._batch = []
+        logger.info("submission_queue_drained")
+
+
+_queue: SubmissionQueue | None = None
+
+
+def get_submission_queue() -> SubmissionQueue | None:
+    return _queue
+
+
+async def start_submission_queue(settings) -> SubmissionQueue | None:
+    """Create the process-wide queue (if enabled) and start its flusher."""
+    global _queue
+    if not settings.submission_queue_enabled:
+        return None
+    from app.db.session import async_session_factory
+
+    _queue = SubmissionQueue(
+        async_session_factory,
+        max_size=settings.submission_queue_max_size,
+        batch_size=settings.submission_batch_size,
+        max_delay=settings.submission_flush_interval_ms / 1000,
+        enqueue_timeout=settings.submission_enqueue_timeout_seconds,
+    )
+    _queue.start()
+    return _queue
+
+
+async def stop_submission_queue() -> None:
+    global _queue
+    if _queue is not None:
+        await _queue.drain()
+        _queue = None
@@ -0,0 +1,159 @@
+"""CPU benchmark for the unfiltered ``GET /puzzles/random`` data path.
+
+Times one random-puzzle fetch through each data access path, from query to a
+validated ``PuzzleResponse``, and prints one JSON report. For each path the
+report holds the process CPU time per request and the wall-clock latency.
+The database time is the same for both paths, so the CPU figures show what
+the layers above the query cost.
+
+Usage::
+
+    python -m scripts.bench_fast_path
+    python -m scripts.bench_fast_path --iterations 5000 --output fast_path.json
+
+Paths:
+
+- ``sqlalchemy``: the previous path — ``text()`` on an autocommit
+  ``AsyncConnection``, ``result.mappings()``, then ``puzzle_response``
+- ``asyncpg``: ``fetch_random_puzzle_raw`` on an asyncpg pool, whose records
+  already have the response shape
+
+Both run the TABLESAMPLE query (and the key seek when it comes back empty)
+and validate the result with ``PuzzleResponse``. The in-memory puzzle pool
+is not involved. All queries are read only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+import asyncpg
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.config import get_settings
+from app.db.asyncpg_pool import asyncpg_dsn
+from app.schemas.puzzle import PuzzleResponse
+from app.services.puzzle_service import (
+    RANDOM_SEEK_SQL,
+    fetch_random_puzzle_raw,
+    puzzle_response,
+)
+from scripts.bench_random import TABLESAMPLE_SQL, summarise
+
+PATHS = ["sqlalchemy", "asyncpg"]
+
+
+async def _sqlalchemy_request(conn: AsyncConnection) -> PuzzleResponse | None:
+    row = (await conn.execute(TABLESAMPLE_SQL)).mappings().first()
+    if row is None:
+        row = (await conn.execute(RANDOM_SEEK_SQL, {"key": random.random()})).mappings().first()
+    return None if row is None else PuzzleResponse.model_validate(puzzle_response(row))
+
+
+async def _asyncpg_request(pool: asyncpg.Pool) -> PuzzleResponse | None:
+    puzzle = await fetch_random_puzzle_raw(pool)
+    return None if puzzle is None else PuzzleResponse.model_validate(puzzle)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+async def measure(request, iterations: int, warmup: int) -> dict:
+    """CPU and wall time of *request* (a zero-argument coroutine function)."""
+    for _ in range(warmup):
+        await request()
+    cpu_samples, wall_samples = [], []
+    for _ in range(iterations):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await request()
+        cpu_samples.append((time.process_time() - cpu_start) * 1000)
+        wall_samples.append((time.perf_counter() - wall_start) * 1000)
+    return {"cpu": summarise(cpu_samples), "wall": summarise(wall_samples)}
+
+
+def compare(results: dict) -> dict:
+    """Mean CPU per request of the asyncpg path relative to the SQLAlchemy path."""
+    if not {"sqlalchemy", "asyncpg"} <= set(results):
+        return {}
+    before = results["sqlalchemy"]["cpu"]["mean_ms"]
+    after = results["asyncpg"]["cpu"]["mean_ms"]
+    return {
+        "cpu_saved_per_request_ms": round(before - after, 3),
+        "cpu_ratio": round(after / before, 3) if before else None,
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url, pool_size=1)
+    pool = await asyncpg.create_pool(asyncpg_dsn(args.database_url), min_size=1, max_size=1)
+    results = {}
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            requests = {
+                "sqlalchemy": lambda: _sqlalchemy_request(conn),
+                "asyncpg": lambda: _asyncpg_request(pool),
+            }
+            for path in args.path:
+                results[path] = await measure(requests[path], args.iterations, args.warmup)
+    finally:
+        await pool.close()
+        await engine.dispose()
+    return {
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "paths": results,
+        "comparison": compare(results),
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-request CPU of the random puzzle data paths.",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=get_settings().database_url,
+        metavar="DSN",
+        help="SQLAlchemy async URL (default: DATABASE_URL from settings)",
+    )
+    parser.add_argument(
+        "--path",
+        nargs="+",
+        choices=PATHS,
+        default=PATHS,
+        help=f"Paths to time (default: {' '.join(PATHS)})",
+    )
+    parser.add_argument("--iterations", type=int, default=2000, metavar="N",
+                        help="Timed requests per path (default: 2000)")
+    parser.add_argument("--warmup", type=int, default=100, metavar="N",
+                        help="Untimed requests per path first (default: 100)")
+    parser.add_argument("--output", metavar="PATH", help="Write the JSON report here")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.iterations < 1 or args.warmup < 0:
+        parser.error("--iterations must be at least 1 and --warmup at least 0")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Latency benchmark for random puzzle selection.
+
+Times the queries behind ``GET /puzzles/random`` against a populated database
+and prints one JSON report of per-strategy latency percentiles, so the
+fallback paths can be compared with the primary TABLESAMPLE query.
+
+Usage::
+
+    python -m scripts.bench_random
+    python -m scripts.bench_random --iterations 500 --strategy seek offset
+    python -m scripts.bench_random --database-url postgresql+asyncpg://... --output bench.json
+
+Strategies:
+
+- ``tablesample``: the primary query, ``TABLESAMPLE SYSTEM(0.01) LIMIT 1``
+- ``seek``: the fallback, one seek on ``idx_puzzles_rand_key`` from a random key
+- ``seek_wraparound``: the fallback's worst case — a key past every row, so
+  both branches of the ``UNION ALL`` run
+- ``offset``: the former fallback, ``COUNT(*)`` then a random ``OFFSET``
+- ``offset_worst``: ``COUNT(*)`` then ``OFFSET count - 1``
+
+Each strategy runs ``--warmup`` untimed queries first. All queries are read
+only; any database with the current schema can be used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import get_settings
+from app.services.puzzle_service import PUZZLE_COLUMNS, RANDOM_SEEK_SQL
+
+# ---------------------------------------------------------------------------
+# Strategies
+# ---------------------------------------------------------------------------
+
+TABLESAMPLE_SQL = text(
+    f"SELECT {PUZZLE_COLUMNS} FROM puzzles TABLESAMPLE SYSTEM(0.01) LIMIT 1"
+)
+COUNT_SQL = text("SELECT COUNT(*) FROM puzzles")
+OFFSET_SQL = text(f"SELECT {PUZZLE_COLUMNS} FROM puzzles LIMIT 1 OFFSET :offset")
+
+
+async def _tablesample(db: AsyncSession) -> None:
+    await db.execute(TABLESAMPLE_SQL)
+
+
+async def _seek(db: AsyncSession) -> None:
+    await db.execute(RANDOM_SEEK_SQL, {"key": random.random()})
+
+
+async def _seek_wraparound(db: AsyncSession) -> None:
+    # rand_key is in [0, 1): nothing is >= 1.0, so the second branch runs too
+    await db.execute(RANDOM_SEEK_SQL, {"key": 1.0})
+
+
+async def _offset(db: AsyncSession, worst: bool = False) -> None:
+    count = (await db.execute(COUNT_SQL)).scalar_one()
+    if count:
+        offset = count - 1 if worst else random.randint(0, count - 1)
+        await db.execute(OFFSET_SQL, {"offset": offset})
+
+
+async def _offset_worst(db: AsyncSession) -> None:
+    await _offset(db, worst=True)
+
+
+STRATEGIES = {
+    "tablesample": _tablesample,
+    "seek": _seek,
+    "seek_wraparound": _seek_wraparound,
+    "offset": _offset,
+    "offset_worst": _offset_worst,
+}
+
+# The OFFSET strategies scan the table on every call
+DEFAULT_STRATEGIES = ["tablesample", "seek", "seek_wraparound", "offset_worst"]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def summarise(samples_ms: list[float]) -> dict:
+    """Nearest-rank percentiles and extremes of *samples_ms*."""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+
+    def rank(q: float) -> float:
+        return round(ordered[max(math.ceil(q * len(ordered)) - 1, 0)], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def measure(db: AsyncSession, strategy: str, iterations: int, warmup: int) -> dict:
+    run = STRATEGIES[strategy]
+    for _ in range(warmup):
+        await run(db)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run(db)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarise(samples)
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url)
+    try:
+        async with AsyncSession(engine) as db:
+            estimate = (
+                await db.execute(
+                    text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'puzzles'::regclass")
+                )
+            ).scalar_one()
+            results = {
+                strategy: await measure(db, strategy, args.iterations, args.warmup)
+                for strategy in args.strategy
+            }
+    finally:
+        await engine.dispose()
+    return {
+        "puzzles_estimate": estimate,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "strategies": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark random puzzle selection queries.",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=get_settings().database_url,
+        metavar="DSN",
+        help="SQLAlchemy async URL (default: DATABASE_URL from settings)",
+    )
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=list(STRATEGIES),
+        default=DEFAULT_STRATEGIES,
+        help=f"Strategies to time (default: {' '.join(DEFAULT_STRATEGIES)})",
+    )
+    parser.add_argument("--iterations", type=int, default=200, metavar="N",
+                        help="Timed queries per strategy (default: 200)")
+    parser.add_argument("--warmup", type=int, default=10, metavar="N",
+                        help="Untimed queries per strategy first (default: 10)")
+    parser.add_argument("--output", metavar="PATH", help="Write the JSON report here")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.iterations < 1 or args.warmup < 0:
+        parser.error("--iterations must be at least 1 and --warmup at least 0")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
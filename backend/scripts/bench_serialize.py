@@ -0,0 +1,207 @@
+"""Requests/sec microbenchmark for ``GET /api/v1/puzzles/random`` response building.
+
+Serves synthetic puzzles from an in-memory stand-in for the puzzle pool, so
+no database is involved. Requests go
+straight into the ASGI app with a minimal ``receive``/``send`` pair, so no
+HTTP client or socket cost is counted. Two variants are timed:
+
+- ``model``: the previous handler — build a dict, split moves and themes,
+  validate against ``PuzzleResponse`` and JSON-encode it on every request
+- ``cached``: the puzzle's cached orjson bytes (``puzzle_json``) returned in
+  a raw ``Response``, as ``random_puzzle`` does now
+
+Both handlers take no query parameters, so request parsing costs the same
+and the gap is response building alone.
+
+Usage::
+
+    python -m scripts.bench_serialize
+    python -m scripts.bench_serialize --requests 20000 --puzzles 500 --output serialize.json
+
+Prints one JSON report with requests/sec and mean microseconds per request
+for each variant. ``--warmup`` requests run untimed first, so the ``cached``
+variant is measured with a warm cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Optional
+
+from fastapi import FastAPI, Response
+
+from app.schemas.puzzle import PuzzleResponse
+from app.services import puzzle_service
+from app.services.puzzle_service import puzzle_json, puzzle_response
+
+VARIANTS = ["model", "cached"]
+
+URL = "/api/v1/puzzles/random"
+
+_SQUARES = [f + r for f in "abcdefgh" for r in "12345678"]
+_THEMES = ["fork", "pin", "mateIn2", "endgame", "middlegame", "short", "crushing", "advantage"]
+
+
+def synthetic_puzzles(n: int, seed: int = 0) -> list[dict]:
+    """Puzzle rows shaped like the puzzles table, with Lichess-like sizes."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"{i:05x}",
+            "fen": "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+            "moves": " ".join(
+                rng.choice(_SQUARES) + rng.choice(_SQUARES) for _ in range(rng.randint(2, 8))
+            ),
+            "rating": rng.randint(600, 2800),
+            "themes": " ".join(rng.sample(_THEMES, rng.randint(0, 4))) or None,
+        }
+        for i in range(n)
+    ]
+
+
+class _StandInPool:
+    """Serves random rows forever, like a puzzle pool that never runs dry."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    def take(self) -> dict:
+        return random.choice(self.rows)
+
+
+def model_app(pool: _StandInPool) -> FastAPI:
+    """The handler as it was: dict building plus response-model validation."""
+    app = FastAPI()
+
+    @app.get(URL, response_model=PuzzleResponse)
+    async def random_puzzle():
+        return puzzle_response(pool.take())
+
+    return app
+
+
+def cached_app(pool: _StandInPool) -> FastAPI:
+    """The handler as it is now: cached bytes, no response model."""
+    app = FastAPI()
+
+    @app.get(URL)
+    async def random_puzzle():
+        return Response(content=puzzle_json(pool.take()), media_type="application/json")
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+_SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": URL,
+    "raw_path": URL.encode(),
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 1),
+    "server": ("bench", 80),
+}
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def request(app: FastAPI) -> bytes:
+    """One GET through the ASGI app; the response body."""
+    status, body = None, b""
+
+    async def send(message: dict) -> None:
+        nonlocal status, body
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body += message.get("body", b"")
+
+    await app(dict(_SCOPE), _receive, send)
+    if status != 200:
+        raise RuntimeError(f"GET {URL} returned {status}")
+    return body
+
+
+async def measure(app: FastAPI, requests: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await request(app)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request(app)
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "requests_per_sec": round(requests / elapsed, 1),
+        "mean_us": round(elapsed / requests * 1e6, 1),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    pool = _StandInPool(synthetic_puzzles(args.puzzles))
+    apps = {"model": model_app, "cached": cached_app}
+    results = {}
+    for variant in args.variant:
+        puzzle_service._puzzle_json.clear()
+        results[variant] = await measure(apps[variant](pool), args.requests, args.warmup)
+    report = {"puzzles": args.puzzles, "warmup": args.warmup, "variants": results}
+    if {"model", "cached"} <= set(results):
+        report["speedup"] = round(
+            results["cached"]["requests_per_sec"] / results["model"]["requests_per_sec"], 2
+        )
+    return report
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark requests/sec of random-puzzle response building.",
+    )
+    parser.add_argument(
+        "--variant",
+        nargs="+",
+        choices=VARIANTS,
+        default=VARIANTS,
+        help=f"Variants to time (default: {' '.join(VARIANTS)})",
+    )
+    parser.add_argument("--requests", type=int, default=10000, metavar="N",
+                        help="Timed requests per variant (default: 10000)")
+    parser.add_argument("--warmup", type=int, default=2000, metavar="N",
+                        help="Untimed requests per variant first (default: 2000)")
+    parser.add_argument("--puzzles", type=int, default=1000, metavar="N",
+                        help="Distinct synthetic puzzles served (default: 1000)")
+    parser.add_argument("--output", metavar="PATH", help="Write the JSON report here")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.requests < 1 or args.warmup < 0 or args.puzzles < 1:
+        parser.error("--requests and --puzzles must be at least 1, --warmup at least 0")
+
+    report = json.dumps(asyncio.run(run_benchmark(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
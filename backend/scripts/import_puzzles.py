@@ -9,7 +9,17 @@ Usage::
     python -m scripts.import_puzzles --file /path/to/lichess_db_puzzle.csv.zst
     python -m scripts.import_puzzles --file /path/to/file.zst --limit 10000
     python -m scripts.import_puzzles --url https://database.lichess.org/lichess_db_puzzle.csv.zst
+    python -m scripts.import_puzzles --stream \
+        --url https://database.lichess.org/lichess_db_puzzle.csv.zst
     python -m scripts.import_puzzles --file /path/to/file.zst --dry-run
+    python -m scripts.import_puzzles --file /path/to/file.zst --mode copy
+    python -m scripts.import_puzzles --file /path/to/file.zst --workers 4
+    python -m scripts.import_puzzles --file /path/to/file.zst --strict
+    python -m scripts.import_puzzles --file /path/to/file.zst --resume
+    python -m scripts.import_puzzles --file /path/to/file.zst --sync --delete-missing
+    python -m scripts.import_puzzles --file /path/to/file.zst --mode copy --bulk
+    python -m scripts.import_puzzles --file /path/to/file.zst --metrics-file metrics.json
+    python -m scripts.import_puzzles --file /path/to/file.zst --log-format json
 
 The script is intentionally synchronous — it is a one-shot CLI tool, not a
 FastAPI handler.  Do NOT import from ``app/`` here.
@@ -18,13 +28,24 @@ FastAPI handler.  Do NOT import from ``app/`` here.
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
+import hashlib
 import io
+import json
+import multiprocessing
 import os
+import queue
+import shutil
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from typing import Generator, IO, Iterable, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Generator, IO, Iterable, Iterator, Optional
+from urllib.parse import urlparse
 
 import structlog
 import zstandard
@@ -38,29 +59,255 @@ import psycopg2.extras
 
 MALFORMED_TOLERANCE = 0.001  # 0.1 % — abort threshold for bad rows
 PROGRESS_INTERVAL = 100_000  # print progress every N rows read
-ESTIMATED_TOTAL = 3_500_000  # rough total for progress %
+CHUNK_SIZE = 4 << 20  # decompressed bytes handed to each --workers task
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_MANIFEST = os.path.join(DATA_DIR, "lichess_db_puzzle.manifest.zst")
+DELETE_CHUNK = 10_000  # ids per DELETE statement for --delete-missing
+DOWNLOAD_CHUNK = 1 << 20  # 1 MB read size for HTTP streams
+MIN_SEGMENT_SIZE = 8 << 20  # don't split downloads into segments smaller than this
+STREAM_BUFFER_CHUNKS = 64  # --stream read-ahead, in DOWNLOAD_CHUNK units
+BULK_EMPTY_THRESHOLD = 10_000  # --bulk defers indexes below this many existing rows
+BULK_MAINTENANCE_WORK_MEM = "1GB"  # default memory for post-load index builds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+IMPORT_MODES = ("insert", "copy")
+
+PUZZLE_COLUMNS = (
+    "id, fen, moves, rating, rating_deviation, popularity, nb_plays,"
+    " themes, game_url, opening_tags"
+)
 
-INSERT_SQL = """
+INSERT_SQL = f"""
 INSERT INTO puzzles
-    (id, fen, moves, rating, rating_deviation, popularity, nb_plays,
-     themes, game_url, opening_tags)
+    ({PUZZLE_COLUMNS})
 VALUES %s
 ON CONFLICT (id) DO NOTHING
 """
 
+# --mode copy: rows are streamed with COPY into an UNLOGGED staging table
+# (no WAL for the bulk of the data), then merged into ``puzzles`` in a single
+# set-based statement at the end of the run.
+STAGING_TABLE = "puzzles_import_staging"
+
+CREATE_STAGING_SQL = f"""
+CREATE UNLOGGED TABLE IF NOT EXISTS {STAGING_TABLE}
+    (LIKE puzzles INCLUDING DEFAULTS)
+"""
+
+TRUNCATE_STAGING_SQL = f"TRUNCATE {STAGING_TABLE}"
+
+COUNT_STAGING_SQL = f"SELECT COUNT(*) FROM {STAGING_TABLE}"
+
+COPY_SQL = f"COPY {STAGING_TABLE} ({PUZZLE_COLUMNS}) FROM STDIN"
+
+MERGE_SQL = f"""
+INSERT INTO puzzles
+    ({PUZZLE_COLUMNS})
+SELECT {PUZZLE_COLUMNS}
+FROM {STAGING_TABLE}
+ON CONFLICT (id) DO NOTHING
+"""
+
+# Checkpoints: one row per source file, rewritten in the same transaction as
+# every batch commit so --resume can skip straight past committed rows.
+CREATE_CHECKPOINT_SQL = """
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    source             TEXT PRIMARY KEY,
+    mode               TEXT NOT NULL,
+    rows_read          BIGINT NOT NULL,
+    rows_valid         BIGINT NOT NULL,
+    rows_skipped       BIGINT NOT NULL,
+    rows_inserted      BIGINT NOT NULL,
+    rows_already_exist BIGINT NOT NULL,
+    rows_staged        BIGINT NOT NULL DEFAULT 0,
+    updated_at         TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+SAVE_CHECKPOINT_SQL = """
+INSERT INTO import_checkpoints
+    (source, mode, rows_read, rows_valid, rows_skipped, rows_inserted,
+     rows_already_exist, rows_staged, updated_at)
+VALUES
+    (%(source)s, %(mode)s, %(rows_read)s, %(rows_valid)s, %(rows_skipped)s,
+     %(rows_inserted)s, %(rows_already_exist)s, %(rows_staged)s, now())
+ON CONFLICT (source) DO UPDATE SET
+    mode = EXCLUDED.mode,
+    rows_read = EXCLUDED.rows_read,
+    rows_valid = EXCLUDED.rows_valid,
+    rows_skipped = EXCLUDED.rows_skipped,
+    rows_inserted = EXCLUDED.rows_inserted,
+    rows_already_exist = EXCLUDED.rows_already_exist,
+    rows_staged = EXCLUDED.rows_staged,
+    updated_at = EXCLUDED.updated_at
+"""
+
+LOAD_CHECKPOINT_SQL = """
+SELECT mode, rows_read, rows_valid, rows_skipped, rows_inserted,
+       rows_already_exist, rows_staged
+FROM import_checkpoints
+WHERE source = %s
+"""
+
+CLEAR_CHECKPOINT_SQL = "DELETE FROM import_checkpoints WHERE source = %s"
+
+# --bulk: secondary (non-constraint) indexes on puzzles and its tag tables are
+# dropped before a load into an empty table and rebuilt afterwards.  Their
+# definitions are kept in import_deferred_indexes, committed together with the
+# DROP, so an interrupted run can never lose an index.
+CREATE_DEFERRED_INDEXES_SQL = """
+CREATE TABLE IF NOT EXISTS import_deferred_indexes (
+    name       TEXT PRIMARY KEY,
+    definition TEXT NOT NULL
+)
+"""
+
+LOAD_DEFERRED_INDEXES_SQL = "SELECT name, definition FROM import_deferred_indexes ORDER BY name"
+
+SAVE_DEFERRED_INDEX_SQL = """
+INSERT INTO import_deferred_indexes (name, definition)
+VALUES (%s, %s)
+ON CONFLICT (name) DO NOTHING
+"""
+
+CLEAR_DEFERRED_INDEXES_SQL = "DELETE FROM import_deferred_indexes"
+
+SECONDARY_INDEXES_SQL = """
+SELECT i.relname, pg_get_indexdef(x.indexrelid)
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+WHERE x.indrelid IN (
+    'puzzles'::regclass, 'puzzle_themes'::regclass, 'puzzle_openings'::regclass
+)
+  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+ORDER BY i.relname
+"""
+
+# Bounded probe: never scans more than BULK_EMPTY_THRESHOLD rows
+NEAR_EMPTY_SQL = "SELECT COUNT(*) FROM (SELECT 1 FROM puzzles LIMIT %s) AS probe"
+
+# Tag indexes: one (puzzle, tag) row per word of puzzles.themes (puzzle_themes)
+# and puzzles.opening_tags (puzzle_openings), carrying the puzzle's rand_key so
+# the API can seek a random puzzle per theme or opening.  Lichess lists an
+# opening's family tag next to its variation tag, so both are indexed.
+_SPLIT_TAGS = """
+INSERT INTO {table} (puzzle_id, {tag}, rand_key)
+SELECT p.id, t.tag, p.rand_key
+FROM {source}
+CROSS JOIN LATERAL unnest(string_to_array(p.{column}, ' ')) AS t(tag)
+WHERE {where} AND t.tag <> ''
+ON CONFLICT DO NOTHING
+"""
+
+_MERGE_SOURCE = f"{STAGING_TABLE} s JOIN puzzles p ON p.id = s.id"
+
+INSERT_THEMES_SQL = _SPLIT_TAGS.format(
+    table="puzzle_themes", tag="theme", column="themes",
+    source="puzzles p", where="p.id = ANY(%s)",
+)
+
+MERGE_THEMES_SQL = _SPLIT_TAGS.format(
+    table="puzzle_themes", tag="theme", column="themes",
+    source=_MERGE_SOURCE, where="TRUE",
+)
+
+DELETE_THEMES_SQL = "DELETE FROM puzzle_themes WHERE puzzle_id = ANY(%s)"
+
+INSERT_OPENINGS_SQL = _SPLIT_TAGS.format(
+    table="puzzle_openings", tag="opening", column="opening_tags",
+    source="puzzles p", where="p.id = ANY(%s)",
+)
+
+MERGE_OPENINGS_SQL = _SPLIT_TAGS.format(
+    table="puzzle_openings", tag="opening", column="opening_tags",
+    source=_MERGE_SOURCE, where="TRUE",
+)
+
+DELETE_OPENINGS_SQL = "DELETE FROM puzzle_openings WHERE puzzle_id = ANY(%s)"
+
+REFRESH_THEME_COUNTS_SQL = """
+DELETE FROM puzzle_theme_counts;
+INSERT INTO puzzle_theme_counts (theme, puzzle_count)
+SELECT theme, COUNT(*) FROM puzzle_themes GROUP BY theme
+"""
+
+# Per-rating counts used by the API to weight rating-band picks
+REFRESH_RATING_COUNTS_SQL = """
+DELETE FROM puzzle_rating_counts;
+INSERT INTO puzzle_rating_counts (rating, puzzle_count)
+SELECT rating, COUNT(*) FROM puzzles GROUP BY rating
+"""
+
+# --sync: upsert new/changed rows only.  The WHERE clause turns identical rows
+# into no-ops (no dead tuple, no WAL), and ``xmax = 0`` tells a fresh insert
+# apart from an update in the RETURNING list.
+UPSERT_SQL = f"""
+INSERT INTO puzzles
+    ({PUZZLE_COLUMNS})
+VALUES %s
+ON CONFLICT (id) DO UPDATE SET
+    fen = EXCLUDED.fen,
+    moves = EXCLUDED.moves,
+    rating = EXCLUDED.rating,
+    rating_deviation = EXCLUDED.rating_deviation,
+    popularity = EXCLUDED.popularity,
+    nb_plays = EXCLUDED.nb_plays,
+    themes = EXCLUDED.themes,
+    game_url = EXCLUDED.game_url,
+    opening_tags = EXCLUDED.opening_tags
+WHERE (puzzles.fen, puzzles.moves, puzzles.rating, puzzles.rating_deviation,
+       puzzles.popularity, puzzles.nb_plays, puzzles.themes, puzzles.game_url,
+       puzzles.opening_tags)
+    IS DISTINCT FROM
+      (EXCLUDED.fen, EXCLUDED.moves, EXCLUDED.rating, EXCLUDED.rating_deviation,
+       EXCLUDED.popularity, EXCLUDED.nb_plays, EXCLUDED.themes, EXCLUDED.game_url,
+       EXCLUDED.opening_tags)
+RETURNING id, (xmax = 0) AS inserted
+"""
+
+# Puzzles that users have already played are kept: user_progress references
+# them and their history should survive an upstream removal.
+DELETE_MISSING_SQL = """
+DELETE FROM puzzles p
+WHERE p.id = ANY(%s)
+  AND NOT EXISTS (SELECT 1 FROM user_progress up WHERE up.puzzle_id = p.id)
+"""
+
 # ---------------------------------------------------------------------------
 # Logging
 # ---------------------------------------------------------------------------
 
-structlog.configure(
-    processors=[
-        structlog.stdlib.add_log_level,
-        structlog.dev.ConsoleRenderer(),
-    ],
-    wrapper_class=structlog.BoundLogger,
-    context_class=dict,
-    logger_factory=structlog.PrintLoggerFactory(),
-)
+LOG_FORMATS = ("auto", "console", "json")
+
+_json_logs = False
+
+
+def configure_logging(log_format: str = "auto") -> None:
+    """Render log events as JSON lines or as console key/value output.
+
+    ``auto`` picks JSON when stdout is not a TTY (cron, CI, log shippers).
+    In JSON mode progress and the final summary are events as well, so
+    every stdout line parses.
+    """
+    global _json_logs
+    _json_logs = log_format == "json" or (log_format == "auto" and not sys.stdout.isatty())
+    if _json_logs:
+        processors = [
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.JSONRenderer(),
+        ]
+    else:
+        processors = [structlog.stdlib.add_log_level, structlog.dev.ConsoleRenderer()]
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.BoundLogger,
+        context_class=dict,
+        logger_factory=structlog.PrintLoggerFactory(),
+    )
+
+
+configure_logging("console")
 
 log = structlog.get_logger()
 
@@ -93,6 +340,10 @@ class ImportStats:
     rows_skipped: int = 0
     rows_inserted: int = 0
     rows_already_exist: int = 0
+    # --sync only
+    rows_updated: int = 0
+    rows_unchanged: int = 0
+    rows_removed: int = 0
 
     @property
     def malformed_rate(self) -> float:
@@ -115,16 +366,16 @@ def parse_csv_row(row: dict) -> Optional[PuzzleRow]:
     malformed / out-of-range.  Empty strings for nullable fields are
     normalised to ``None``.
     """
-    puzzle_id = row.get("PuzzleId", "").strip()
-    fen = row.get("FEN", "").strip()
-    moves = row.get("Moves", "").strip()
+    puzzle_id = (row.get("PuzzleId") or "").strip()
+    fen = (row.get("FEN") or "").strip()
+    moves = (row.get("Moves") or "").strip()
 
     # Fast-path rejections before Pydantic overhead
     if not puzzle_id or not fen or not moves:
         return None
 
     def _opt(key: str) -> Optional[str]:
-        val = row.get(key, "").strip()
+        val = (row.get(key) or "").strip()
         return val if val else None
 
     try:
@@ -152,6 +403,22 @@ def parse_csv_row(row: dict) -> Optional[PuzzleRow]:
         return None
 
 
+def puzzle_to_tuple(puzzle: PuzzleRow) -> tuple:
+    """Return *puzzle* as a row-tuple in ``INSERT_SQL`` column order."""
+    return (
+        puzzle.puzzle_id,
+        puzzle.fen,
+        puzzle.moves,
+        puzzle.rating,
+        puzzle.rating_deviation,
+        puzzle.popularity,
+        puzzle.nb_plays,
+        puzzle.themes,
+        puzzle.game_url,
+        puzzle.opening_tags,
+    )
+
+
 def validate_puzzle_row(row: PuzzleRow) -> bool:
     """Secondary validation gate after initial parse.
 
@@ -161,6 +428,96 @@ def validate_puzzle_row(row: PuzzleRow) -> bool:
     return True
 
 
+# ---------------------------------------------------------------------------
+# Fast (Pydantic-free) validation
+# ---------------------------------------------------------------------------
+
+CSV_COLUMNS = (
+    "PuzzleId", "FEN", "Moves", "Rating", "RatingDeviation",
+    "Popularity", "NbPlays", "Themes", "GameUrl", "OpeningTags",
+)
+
+RowParser = Callable[[list[str]], Optional[tuple]]
+
+
+def _reject_all(fields: list[str]) -> Optional[tuple]:
+    return None
+
+
+def compile_row_validator(header: list[str]) -> RowParser:
+    """Build a validator for ``csv.reader`` rows laid out as *header*.
+
+    Column positions are resolved once, and the returned function checks the
+    same constraints as :class:`PuzzleRow` (id 1–10 chars, non-empty fen and
+    moves, integer columns, rating 0–4000) and returns a row-tuple in
+    ``INSERT_SQL`` column order — or ``None`` for a malformed row — without
+    building a model per row.
+    """
+    names = list(header)
+    if any(name not in names for name in CSV_COLUMNS[:7]):
+        return _reject_all  # a required column is missing: nothing can be valid
+
+    # Optional columns absent from the header read from a padding slot
+    missing = len(names)
+    (i_id, i_fen, i_moves, i_rating, i_rd, i_pop, i_plays, i_themes, i_url, i_tags) = (
+        names.index(name) if name in names else missing for name in CSV_COLUMNS
+    )
+    width = max(i_id, i_fen, i_moves, i_rating, i_rd, i_pop, i_plays,
+                i_themes, i_url, i_tags) + 1
+
+    def validate(fields: list[str]) -> Optional[tuple]:
+        if len(fields) < width:
+            fields = fields + [""] * (width - len(fields))
+
+        puzzle_id = fields[i_id].strip()
+        fen = fields[i_fen].strip()
+        moves = fields[i_moves].strip()
+        if not puzzle_id or not fen or not moves or len(puzzle_id) > 10:
+            return None
+
+        try:
+            rating = int(fields[i_rating])
+            rating_deviation = int(fields[i_rd])
+            popularity = int(fields[i_pop])
+            nb_plays = int(fields[i_plays])
+        except ValueError:
+            return None
+        if not 0 <= rating <= 4000:
+            return None
+
+        return (
+            puzzle_id,
+            fen,
+            moves,
+            rating,
+            rating_deviation,
+            popularity,
+            nb_plays,
+            fields[i_themes].strip() or None,
+            fields[i_url].strip() or None,
+            fields[i_tags].strip() or None,
+        )
+
+    return validate
+
+
+def make_row_parser(header: list[str], strict: bool = False) -> RowParser:
+    """Return the ``csv.reader`` row parser for *header*.
+
+    The default is the fast validator from :func:`compile_row_validator`;
+    ``strict=True`` routes every row through :func:`parse_csv_row` and the
+    Pydantic :class:`PuzzleRow` model instead.
+    """
+    if not strict:
+        return compile_row_validator(header)
+
+    def parse_strict(fields: list[str]) -> Optional[tuple]:
+        puzzle = parse_csv_row(dict(zip(header, fields)))
+        return None if puzzle is None else puzzle_to_tuple(puzzle)
+
+    return parse_strict
+
+
 # ---------------------------------------------------------------------------
 # Batch builder
 # ---------------------------------------------------------------------------
@@ -177,18 +534,7 @@ def build_batches(
     """
     batch: list[tuple] = []
     for puzzle in puzzles:
-        batch.append((
-            puzzle.puzzle_id,
-            puzzle.fen,
-            puzzle.moves,
-            puzzle.rating,
-            puzzle.rating_deviation,
-            puzzle.popularity,
-            puzzle.nb_plays,
-            puzzle.themes,
-            puzzle.game_url,
-            puzzle.opening_tags,
-        ))
+        batch.append(puzzle_to_tuple(puzzle))
         if len(batch) >= batch_size:
             yield batch
             batch = []
@@ -196,6 +542,148 @@ def build_batches(
         yield batch
 
 
+# ---------------------------------------------------------------------------
+# COPY helpers
+# ---------------------------------------------------------------------------
+
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+})
+
+
+def format_copy_row(row: tuple) -> str:
+    """Render a row-tuple as one line of PostgreSQL ``COPY`` text format.
+
+    Columns are tab-separated, ``None`` becomes ``\\N`` and backslashes, tabs
+    and newlines inside values are escaped.
+    """
+    return "\t".join(
+        "\\N" if value is None else str(value).translate(_COPY_ESCAPES)
+        for value in row
+    ) + "\n"
+
+
+def copy_batch(cursor, batch: list[tuple]) -> None:
+    """Stream *batch* into the staging table with ``COPY ... FROM STDIN``."""
+    buf = io.StringIO("".join(format_copy_row(row) for row in batch))
+    cursor.copy_expert(COPY_SQL, buf)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoints
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Checkpoint:
+    """Progress recorded with the last committed batch of a source file."""
+
+    mode: str
+    stats: ImportStats
+    rows_staged: int = 0
+
+
+def load_checkpoint(cursor, source: str) -> Optional[Checkpoint]:
+    """Return the stored checkpoint for *source*, or ``None`` if there is none."""
+    cursor.execute(LOAD_CHECKPOINT_SQL, (source,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    mode, rows_read, rows_valid, rows_skipped, rows_inserted, rows_already_exist, staged = row
+    return Checkpoint(
+        mode=mode,
+        stats=ImportStats(
+            rows_read=rows_read,
+            rows_valid=rows_valid,
+            rows_skipped=rows_skipped,
+            rows_inserted=rows_inserted,
+            rows_already_exist=rows_already_exist,
+        ),
+        rows_staged=staged,
+    )
+
+
+def save_checkpoint(cursor, source: str, checkpoint: Checkpoint) -> None:
+    """Upsert *checkpoint* for *source*; the caller owns the transaction."""
+    cursor.execute(
+        SAVE_CHECKPOINT_SQL,
+        {
+            "source": source,
+            "mode": checkpoint.mode,
+            "rows_staged": checkpoint.rows_staged,
+            **asdict(checkpoint.stats),
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+# Sync manifest
+# ---------------------------------------------------------------------------
+#
+# The manifest is a zstd-compressed sequence of ``<len><puzzle id><8-byte
+# digest>`` records, one per valid row of the last successful --sync run.
+
+DIGEST_SIZE = 8
+
+
+def row_digest(row: tuple) -> bytes:
+    """Return a compact content hash of a row-tuple (all columns, incl. id)."""
+    payload = "\x1f".join("" if value is None else str(value) for value in row)
+    return hashlib.blake2b(payload.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def load_manifest(path: str) -> dict[str, bytes]:
+    """Read a manifest into ``{puzzle_id: digest}``; missing file → empty dict."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb") as fh:
+        data = zstandard.ZstdDecompressor().stream_reader(fh).read()
+    entries: dict[str, bytes] = {}
+    pos = 0
+    while pos < len(data):
+        id_len = data[pos]
+        start = pos + 1
+        end = start + id_len
+        entries[data[start:end].decode()] = data[end:end + DIGEST_SIZE]
+        pos = end + DIGEST_SIZE
+    return entries
+
+
+class ManifestWriter:
+    """Stream manifest records to a temp file that replaces *path* on commit."""
+
+    FLUSH_BYTES = 1 << 20
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._writer = zstandard.ZstdCompressor().stream_writer(open(self._tmp_path, "wb"))
+        self._buf = bytearray()
+
+    def add(self, puzzle_id: str, digest: bytes) -> None:
+        encoded = puzzle_id.encode()
+        self._buf.append(len(encoded))
+        self._buf += encoded
+        self._buf += digest
+        if len(self._buf) >= self.FLUSH_BYTES:
+            self._writer.write(self._buf)
+            self._buf.clear()
+
+    def commit(self) -> None:
+        self._writer.write(self._buf)
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def discard(self) -> None:
+        if not self._writer.closed:
+            self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
 # ---------------------------------------------------------------------------
 # Streaming decompression
 # ---------------------------------------------------------------------------
@@ -229,6 +717,154 @@ def stream_parse_zst(
                 break
 
 
+# ---------------------------------------------------------------------------
+# Row sources (serial and multi-process)
+# ---------------------------------------------------------------------------
+#
+# Both sources yield ``(row_tuple, raw_row)`` pairs in file order.  ``row_tuple``
+# is ``None`` for malformed rows; ``raw_row`` is only meaningful in that case
+# (it is logged at debug level).
+
+RowResult = tuple[Optional[tuple], Optional[dict]]
+
+
+def _parse_records(
+    records: Iterable[list[str]],
+    header: list[str],
+    strict: bool,
+    skip: int = 0,
+) -> Generator[RowResult, None, None]:
+    parse = make_row_parser(header, strict)
+    for fields in records:
+        if not fields:
+            continue  # blank line — DictReader never counted these either
+        if skip:
+            skip -= 1  # already committed by a previous run (--resume)
+            continue
+        row = parse(fields)
+        if row is None:
+            yield None, dict(zip(header, fields))
+        else:
+            yield row, None
+
+
+def iter_serial_results(
+    reader: IO[bytes],
+    strict: bool = False,
+    skip: int = 0,
+) -> Generator[RowResult, None, None]:
+    """Parse and validate rows from a decompressed stream on the current core.
+
+    The first *skip* data rows are read past without being validated.
+    """
+    text_stream = io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    records = csv.reader(text_stream)
+    header = next(records, None)
+    if header is None:
+        return
+    yield from _parse_records(records, header, strict, skip)
+
+
+def iter_line_chunks(
+    reader: IO[bytes],
+    chunk_size: int = CHUNK_SIZE,
+) -> Generator[bytes, None, None]:
+    """Cut a decompressed byte stream into chunks that end on a line boundary.
+
+    Lichess rows never contain quoted newlines, so every chunk holds whole
+    CSV records.
+    """
+    pending = b""
+    while True:
+        data = reader.read(chunk_size)
+        if not data:
+            break
+        data = pending + data
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            pending = data
+            continue
+        yield data[:cut]
+        pending = data[cut:]
+    if pending:
+        yield pending
+
+
+def skip_lines(
+    chunks: Iterable[bytes],
+    skip: int,
+) -> Generator[bytes, None, None]:
+    """Drop the first *skip* records from a stream of line-aligned chunks.
+
+    Blank lines are not records and do not count towards *skip*, matching
+    ``_parse_records`` and the ``rows_read`` a checkpoint stores.
+    """
+    for chunk in chunks:
+        if skip:
+            lines = chunk.splitlines(keepends=True)
+            dropped = 0
+            while skip and dropped < len(lines):
+                if lines[dropped].strip(b"\r\n"):
+                    skip -= 1
+                dropped += 1
+            chunk = b"".join(lines[dropped:])
+            if not chunk:
+                continue
+        yield chunk
+
+
+def parse_chunk(
+    fieldnames: list[str],
+    chunk: bytes,
+    strict: bool = False,
+) -> list[RowResult]:
+    """Worker entry point: parse and validate one line-aligned CSV chunk.
+
+    Valid rows are returned as ready-to-insert tuples so only plain Python
+    values cross the process boundary.
+    """
+    text_stream = io.StringIO(chunk.decode("utf-8"), newline="")
+    return list(_parse_records(csv.reader(text_stream), fieldnames, strict))
+
+
+def iter_parallel_results(
+    reader: IO[bytes],
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+    strict: bool = False,
+    skip: int = 0,
+) -> Generator[RowResult, None, None]:
+    """Parse and validate rows on a pool of *workers* processes.
+
+    The calling process reads and chunks the decompressed stream; chunks are
+    parsed by the pool and results are yielded strictly in file order.  At
+    most ``2 * workers`` chunks are in flight, so a slow database writer
+    applies back-pressure to decompression instead of buffering the file.
+    The first *skip* data rows (blank lines aside) are dropped before
+    reaching the pool.
+    """
+    chunks = iter_line_chunks(reader, chunk_size)
+    first = next(chunks, b"")
+    header, _, rest = first.partition(b"\n")
+    if not header.strip():
+        return
+    fieldnames = next(csv.reader([header.decode("utf-8")]))
+
+    def tasks() -> Generator[bytes, None, None]:
+        if rest:
+            yield rest
+        yield from chunks
+
+    pending: deque = deque()
+    with multiprocessing.Pool(workers) as pool:
+        for chunk in skip_lines(tasks(), skip):
+            pending.append(pool.apply_async(parse_chunk, (fieldnames, chunk, strict)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
 # ---------------------------------------------------------------------------
 # Summary formatting
 # ---------------------------------------------------------------------------
@@ -238,8 +874,13 @@ def format_summary(
     duration: float,
     db_count: int,
     filename: str,
+    sync: bool = False,
 ) -> str:
-    """Render the final import summary in tree format."""
+    """Render the final import summary in tree format.
+
+    With ``sync=True`` the insert counters are replaced by the delta counts
+    (added / updated / unchanged / removed) of a ``--sync`` run.
+    """
     skipped_pct = stats.malformed_rate * 100
     lines = [
         "Import complete",
@@ -247,8 +888,20 @@ def format_summary(
         f"├── Rows read: {stats.rows_read:,}",
         f"├── Rows valid: {stats.rows_valid:,}",
         f"├── Rows skipped (malformed): {stats.rows_skipped:,} ({skipped_pct:.3f}%)",
-        f"├── Rows inserted: {stats.rows_inserted:,}",
-        f"├── Rows already existed: {stats.rows_already_exist:,}",
+    ]
+    if sync:
+        lines += [
+            f"├── Puzzles added: {stats.rows_inserted:,}",
+            f"├── Puzzles updated: {stats.rows_updated:,}",
+            f"├── Puzzles unchanged: {stats.rows_unchanged:,}",
+            f"├── Puzzles removed upstream: {stats.rows_removed:,}",
+        ]
+    else:
+        lines += [
+            f"├── Rows inserted: {stats.rows_inserted:,}",
+            f"├── Rows already existed: {stats.rows_already_exist:,}",
+        ]
+    lines += [
         f"├── Duration: {duration:.1f}s",
         f"└── Puzzles in DB: {db_count:,}",
     ]
@@ -283,9 +936,32 @@ def build_arg_parser() -> argparse.ArgumentParser:
         default=None,
         help=(
             "Where to save the downloaded file (default: data/lichess_db_puzzle.csv.zst"
-            " next to this script). Skips download if the file already exists."
+            " next to this script). The download is skipped when the remote file is"
+            " unchanged and resumed if a previous one was interrupted."
         ),
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help=(
+            "With --url, import straight from the HTTP response instead of"
+            " downloading the whole file first. Add --save-to to keep a copy."
+        ),
+    )
+    parser.add_argument(
+        "--download-connections",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Download the file in N parallel ranged segments (default: 1).",
+    )
+    parser.add_argument(
+        "--sha256",
+        metavar="HEX",
+        default=None,
+        help="Expected SHA-256 of the downloaded file; a mismatch aborts the import.",
+    )
     parser.add_argument(
         "--database-url",
         metavar="URL",
@@ -306,12 +982,111 @@ def build_arg_parser() -> argparse.ArgumentParser:
         metavar="N",
         help="Number of rows per INSERT batch (default: 1000).",
     )
+    parser.add_argument(
+        "--mode",
+        choices=IMPORT_MODES,
+        default="insert",
+        help=(
+            "Load strategy: 'insert' sends execute_values INSERT batches; 'copy'"
+            " streams rows with COPY into an unlogged staging table and merges"
+            " them into puzzles in one statement (default: insert)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help=(
+            "Parse and validate rows on N worker processes; decompression and"
+            " database writes stay in the main process (default: 1)."
+        ),
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        default=False,
+        help=(
+            "Validate every row through the Pydantic PuzzleRow model instead of"
+            " the fast positional validator (slower; same accept/reject rules)."
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help=(
+            "Continue an interrupted import of the same file from its last"
+            " committed batch instead of starting from the first row."
+        ),
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        default=False,
+        help=(
+            "Delta import: hash every row, compare with the manifest from the"
+            " previous --sync run and upsert only new or changed puzzles."
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="PATH",
+        default=DEFAULT_MANIFEST,
+        help="Hash manifest used by --sync (default: data/lichess_db_puzzle.manifest.zst).",
+    )
+    parser.add_argument(
+        "--delete-missing",
+        action="store_true",
+        default=False,
+        help=(
+            "With --sync, delete puzzles that were in the previous manifest but"
+            " are no longer in the dump (puzzles with user progress are kept)."
+        ),
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        default=False,
+        help=(
+            "Bulk-load tuning: when puzzles is (nearly) empty, drop secondary"
+            " indexes during the load and rebuild them afterwards, then run"
+            " ANALYZE puzzles."
+        ),
+    )
+    parser.add_argument(
+        "--maintenance-work-mem",
+        metavar="SIZE",
+        default=BULK_MAINTENANCE_WORK_MEM,
+        help=(
+            "maintenance_work_mem used for the --bulk index rebuild"
+            f" (default: {BULK_MAINTENANCE_WORK_MEM})."
+        ),
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         default=False,
         help="Parse and validate rows without inserting into the database.",
     )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        default=None,
+        help=(
+            "Write per-stage timings, throughput and the batch commit latency"
+            " histogram to PATH as JSON when the import ends."
+        ),
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=LOG_FORMATS,
+        default="auto",
+        help=(
+            "Log events as console key/value pairs or as JSON lines (default: auto,"
+            " JSON when stdout is not a terminal)."
+        ),
+    )
     return parser
 
 
@@ -319,29 +1094,560 @@ def build_arg_parser() -> argparse.ArgumentParser:
 # Download helper
 # ---------------------------------------------------------------------------
 
-def download_file(url: str, dest_path: str) -> None:
-    """Stream-download *url* to *dest_path* using requests."""
-    import requests
+class DownloadError(RuntimeError):
+    """Raised when a download cannot be completed or fails verification."""
 
-    log.info("Downloading puzzle database", url=url, dest=dest_path)
-    with requests.get(url, stream=True, timeout=300) as resp:
+
+class _DownloadProgress:
+    """Thread-safe ``Downloaded X MB / Y MB`` progress line."""
+
+    def __init__(self, total: int, done: int = 0) -> None:
+        self.total = total
+        self.done = done
+        self._lock = threading.Lock()
+
+    def advance(self, nbytes: int) -> None:
+        with self._lock:
+            self.done += nbytes
+            if self.total:
+                pct = self.done / self.total * 100
+                print(
+                    f"\rDownloaded {self.done / 1_048_576:.1f} MB"
+                    f" / {self.total / 1_048_576:.1f} MB ({pct:.1f}%)",
+                    end="",
+                    flush=True,
+                )
+
+
+def _read_download_meta(dest_path: str) -> dict:
+    try:
+        with open(f"{dest_path}.meta.json") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_download_meta(dest_path: str, meta: dict) -> None:
+    with open(f"{dest_path}.meta.json", "w") as fh:
+        json.dump(meta, fh, indent=2)
+
+
+def file_sha256(path: str) -> str:
+    """Return the hex SHA-256 of the file at *path*."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(DOWNLOAD_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fetch_range(
+    session,
+    url: str,
+    path: str,
+    start: int,
+    end: int,
+    validator: Optional[str],
+    progress: _DownloadProgress,
+    allow_restart: bool = False,
+) -> None:
+    """Download bytes ``start..end`` of *url* into *path*, resuming what is there.
+
+    ``If-Range`` makes the server answer ``206`` only while the remote file
+    still matches *validator*.  A full ``200`` answer means it changed: with
+    *allow_restart* the body replaces the partial file, otherwise
+    :class:`DownloadError` is raised.
+    """
+    have = os.path.getsize(path) if os.path.exists(path) else 0
+    if have >= end - start + 1:
+        return
+    headers = {"Range": f"bytes={start + have}-{end}"}
+    if validator:
+        headers["If-Range"] = validator
+
+    with session.get(url, headers=headers, stream=True, timeout=300) as resp:
         resp.raise_for_status()
-        total = int(resp.headers.get("content-length", 0))
-        downloaded = 0
-        with open(dest_path, "wb") as fh:
-            for chunk in resp.iter_content(chunk_size=1 << 20):  # 1 MB chunks
+        if resp.status_code == 206:
+            file_mode = "ab"
+        elif allow_restart:
+            progress.advance(-have)
+            file_mode = "wb"
+        else:
+            raise DownloadError(f"{url} changed while downloading; restart the download")
+        with open(path, file_mode) as fh:
+            for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK):
                 fh.write(chunk)
-                downloaded += len(chunk)
-                if total:
-                    pct = downloaded / total * 100
-                    print(
-                        f"\rDownloaded {downloaded / 1_048_576:.1f} MB"
-                        f" / {total / 1_048_576:.1f} MB ({pct:.1f}%)",
-                        end="",
-                        flush=True,
-                    )
+                progress.advance(len(chunk))
+
+
+def download_file(
+    url: str,
+    dest_path: str,
+    connections: int = 1,
+    sha256: Optional[str] = None,
+) -> bool:
+    """Download *url* to *dest_path*, skipping the transfer if it is unchanged.
+
+    * A ``HEAD`` request carrying ``If-None-Match`` / ``If-Modified-Since``
+      from the previous download's ``<dest>.meta.json`` decides whether the
+      local copy is still current.
+    * Data is written to ``<dest>.part`` (or ``<dest>.part.N`` segments when
+      *connections* > 1 and the server accepts ranges) and an interrupted
+      transfer resumes with ``Range`` + ``If-Range`` on the next call.
+    * The finished file is checked against ``Content-Length`` and, if given,
+      the expected *sha256* before it atomically replaces *dest_path*.
+
+    Returns ``True`` if a new file was downloaded, ``False`` if the local file
+    was already up to date.
+
+    Raises:
+        DownloadError: On a checksum/size mismatch or if the remote file
+            changes in the middle of a segmented download.
+    """
+    import requests
+
+    meta = _read_download_meta(dest_path)
+    have_local = os.path.exists(dest_path)
+    conditional: dict[str, str] = {}
+    if have_local and meta.get("url") == url:
+        if meta.get("etag"):
+            conditional["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            conditional["If-Modified-Since"] = meta["last_modified"]
+
+    with requests.Session() as session:
+        head = session.head(url, headers=conditional, allow_redirects=True, timeout=60)
+        if head.status_code == 304:
+            log.info("Remote file unchanged, skipping download", path=dest_path)
+            return False
+        head.raise_for_status()
+
+        total = int(head.headers.get("content-length", 0))
+        etag = head.headers.get("etag")
+        last_modified = head.headers.get("last-modified")
+        ranges = head.headers.get("accept-ranges", "").lower() == "bytes" and total > 0
+
+        if have_local and (
+            (etag and etag == meta.get("etag"))
+            or (not meta and total and os.path.getsize(dest_path) == total)
+        ):
+            log.info("Local file matches remote, skipping download", path=dest_path)
+            return False
+
+        # If-Range needs a strong validator; fall back to Last-Modified
+        validator = etag if etag and not etag.startswith("W/") else last_modified
+        part_path = f"{dest_path}.part"
+        segments = max(1, min(connections, total // MIN_SEGMENT_SIZE)) if ranges else 1
+        seg_paths = [f"{part_path}.{i}" for i in range(segments)] if segments > 1 else []
+
+        # Partial data is only reused if it belongs to this exact remote version
+        # and segment layout; otherwise it is discarded before starting over.
+        state = {"url": url, "validator": validator, "segments": segments}
+        state_path = f"{part_path}.json"
+        try:
+            with open(state_path) as fh:
+                resumable = ranges and validator is not None and json.load(fh) == state
+        except (OSError, ValueError):
+            resumable = False
+        if not resumable:
+            for stale in [part_path, *seg_paths]:
+                if os.path.exists(stale):
+                    os.remove(stale)
+        with open(state_path, "w") as fh:
+            json.dump(state, fh)
+
+        log.info(
+            "Downloading puzzle database",
+            url=url,
+            dest=dest_path,
+            size=total or None,
+            connections=segments,
+        )
+
+        if not ranges:
+            progress = _DownloadProgress(total)
+            with session.get(url, stream=True, timeout=300) as resp:
+                resp.raise_for_status()
+                with open(part_path, "wb") as fh:
+                    for chunk in resp.iter_content(chunk_size=DOWNLOAD_CHUNK):
+                        fh.write(chunk)
+                        progress.advance(len(chunk))
+        elif segments == 1:
+            done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if done:
+                log.info("Resuming partial download", path=part_path, offset=done)
+            progress = _DownloadProgress(total, done)
+            _fetch_range(
+                session, url, part_path, 0, total - 1, validator, progress, allow_restart=True
+            )
+        else:
+            bounds = [
+                (i * total // segments, (i + 1) * total // segments - 1)
+                for i in range(segments)
+            ]
+            done = sum(os.path.getsize(p) for p in seg_paths if os.path.exists(p))
+            progress = _DownloadProgress(total, done)
+            try:
+                # requests.Session is not thread-safe: segments use the module API
+                with ThreadPoolExecutor(max_workers=segments) as pool:
+                    futures = [
+                        pool.submit(
+                            _fetch_range, requests, url, seg_path, start, end,
+                            validator, progress,
+                        )
+                        for seg_path, (start, end) in zip(seg_paths, bounds)
+                    ]
+                    for future in futures:
+                        future.result()
+            except DownloadError:
+                for seg_path in seg_paths:
+                    if os.path.exists(seg_path):
+                        os.remove(seg_path)
+                raise
+            with open(part_path, "wb") as out:
+                for seg_path in seg_paths:
+                    with open(seg_path, "rb") as seg:
+                        shutil.copyfileobj(seg, out, DOWNLOAD_CHUNK)
+            for seg_path in seg_paths:
+                os.remove(seg_path)
     print()  # newline after progress
 
+    size = os.path.getsize(part_path)
+    if total and size != total:
+        raise DownloadError(f"Downloaded {size} bytes, expected {total}")
+    checksum = file_sha256(part_path)
+    if sha256 and checksum != sha256.lower():
+        os.remove(part_path)
+        raise DownloadError(f"SHA-256 mismatch: got {checksum}, expected {sha256}")
+
+    os.replace(part_path, dest_path)
+    os.remove(state_path)
+    _write_download_meta(dest_path, {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "size": size,
+        "sha256": checksum,
+    })
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Streaming download (--stream)
+# ---------------------------------------------------------------------------
+
+class PrefetchReader(io.RawIOBase):
+    """Binary reader fed by a background thread.
+
+    The thread pulls byte chunks from *chunks* (an HTTP response body) into a
+    bounded queue and optionally copies them to *tee*, so the network
+    transfer overlaps with decompression, parsing and inserts in the caller.
+    ``completed`` becomes ``True`` once the whole source has been read;
+    ``size`` is the total body size when the server announced it.
+    """
+
+    _EOF = object()
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        max_chunks: int = STREAM_BUFFER_CHUNKS,
+        tee: Optional[IO[bytes]] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.completed = False
+        self.size = size
+        self._tee = tee
+        self._queue: queue.Queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._pump, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _pump(self, chunks: Iterable[bytes]) -> None:
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if self._tee is not None:
+                    self._tee.write(chunk)
+                if not self._put(chunk):
+                    return  # reader closed early
+            self.completed = True
+            self._put(self._EOF)
+        except Exception as exc:
+            self._put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is self._EOF:
+                self._eof = True
+                return 0
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            self._pending = memoryview(item)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        super().close()
+
+
+def _hashing(chunks: Iterable[bytes], digest) -> Iterator[bytes]:
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+@contextmanager
+def stream_url(
+    url: str,
+    tee_path: Optional[str] = None,
+    buffer_chunks: int = STREAM_BUFFER_CHUNKS,
+) -> Iterator[PrefetchReader]:
+    """Open *url* as a read-ahead binary stream for :func:`run_import`.
+
+    With *tee_path*, the body is also written to ``<tee_path>.part``; the copy
+    replaces *tee_path* (with a ``.meta.json`` so later :func:`download_file`
+    calls can skip it) only if the whole body was received.  At most
+    *buffer_chunks* chunks are read ahead of the importer.
+    """
+    import requests
+
+    with requests.get(url, stream=True, timeout=300) as resp:
+        resp.raise_for_status()
+        log.info("Streaming puzzle database", url=url, tee=tee_path)
+        digest = hashlib.sha256()
+        part_path = f"{tee_path}.part" if tee_path else None
+        tee = open(part_path, "wb") if part_path else None
+        length = resp.headers.get("content-length")
+        reader = PrefetchReader(
+            _hashing(resp.iter_content(chunk_size=DOWNLOAD_CHUNK), digest),
+            max_chunks=buffer_chunks,
+            tee=tee,
+            size=int(length) if length and "content-encoding" not in resp.headers else None,
+        )
+        try:
+            yield reader
+        finally:
+            reader.close()
+            if tee is not None:
+                tee.close()
+                if reader.completed:
+                    os.replace(part_path, tee_path)
+                    _write_download_meta(tee_path, {
+                        "url": url,
+                        "etag": resp.headers.get("etag"),
+                        "last_modified": resp.headers.get("last-modified"),
+                        "size": os.path.getsize(tee_path),
+                        "sha256": digest.hexdigest(),
+                    })
+                else:
+                    os.remove(part_path)
+
+
+# ---------------------------------------------------------------------------
+# Import metrics
+# ---------------------------------------------------------------------------
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; bucket bounds are in milliseconds."""
+
+    def __init__(self, bounds_ms: tuple[int, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket holding the *q* quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(min(bound, self.max_ms))
+        return self.max_ms
+
+    def snapshot(self) -> dict:
+        buckets = {f"le_{bound}ms": n for bound, n in zip(self.bounds_ms, self.counts)}
+        buckets[f"gt_{self.bounds_ms[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": buckets,
+        }
+
+
+class MeteredReader(io.RawIOBase):
+    """Pass-through binary reader that counts the bytes and time of each read."""
+
+    def __init__(self, raw: IO[bytes]) -> None:
+        super().__init__()
+        self._raw = raw
+        self.bytes_read = 0
+        self.seconds = 0.0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self._raw.read(size)
+        self.seconds += time.perf_counter() - start
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def source_size(fileobj: IO[bytes]) -> Optional[int]:
+    """Return the total size of *fileobj* in bytes, or ``None`` if unknown."""
+    size = getattr(fileobj, "size", None)
+    if isinstance(size, int):
+        return size
+    try:
+        return os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        if fileobj.seekable():
+            position = fileobj.tell()
+            end = fileobj.seek(0, io.SEEK_END)
+            fileobj.seek(position)
+            return end
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    return None
+
+
+@dataclass
+class ImportMetrics:
+    """Per-stage timers, throughput and batch latencies of one import run.
+
+    Stage times are exclusive: ``read`` is time spent waiting on the
+    compressed source, ``decompress`` zstd, ``parse`` CSV parsing plus
+    validation (or waiting on ``--workers``), ``write`` statement execution,
+    ``commit`` checkpointing and ``COMMIT``, and ``finalise`` the copy-mode
+    merge, deletions, index rebuilds and ``ANALYZE``.
+    """
+
+    total_bytes: Optional[int] = None
+    rows_read: int = 0  # by this run (a --resume run skips committed rows)
+    read: float = 0.0
+    decompress: float = 0.0
+    parse: float = 0.0
+    write: float = 0.0
+    commit: float = 0.0
+    finalise: float = 0.0
+    compressed_bytes: int = 0
+    decompressed_bytes: int = 0
+
+    def __post_init__(self) -> None:
+        self.batch_latency = LatencyHistogram()
+
+    def stages(self) -> dict[str, float]:
+        return {
+            "read": round(self.read, 3),
+            "decompress": round(self.decompress, 3),
+            "parse": round(self.parse, 3),
+            "write": round(self.write, 3),
+            "commit": round(self.commit, 3),
+            "finalise": round(self.finalise, 3),
+        }
+
+    def eta(self, elapsed: float) -> Optional[float]:
+        """Seconds left, extrapolated from compressed bytes consumed so far."""
+        if not self.total_bytes or not self.compressed_bytes or not elapsed:
+            return None
+        remaining = max(self.total_bytes - self.compressed_bytes, 0)
+        return remaining / (self.compressed_bytes / elapsed)
+
+    def progress(self, rows_read: int, elapsed: float) -> dict:
+        """Progress fields for a JSON ``Import progress`` event."""
+        eta = self.eta(elapsed)
+        return {
+            "rows_read": rows_read,
+            "rows_per_sec": round(rows_read / elapsed, 1) if elapsed else 0.0,
+            "percent": (
+                round(min(self.compressed_bytes / self.total_bytes * 100, 100.0), 1)
+                if eta is not None else None
+            ),
+            "eta_seconds": round(eta) if eta is not None else None,
+            "elapsed": round(elapsed, 1),
+        }
+
+    def progress_line(self, rows_read: int, elapsed: float) -> str:
+        rate = rows_read / elapsed if elapsed else 0.0
+        line = f"Processed {rows_read:,} rows — {rate:,.0f} rows/s"
+        eta = self.eta(elapsed)
+        if eta is not None:
+            pct = min(self.compressed_bytes / self.total_bytes * 100, 100.0)
+            line += f", {pct:.1f}% of input, ETA {eta:.0f}s"
+        return f"{line} — {elapsed:.0f}s elapsed"
+
+    def to_dict(self, stats: ImportStats, duration: float, **context) -> dict:
+        return {
+            **context,
+            "duration": round(duration, 3),
+            "rows_read": self.rows_read,
+            "rows_per_sec": round(self.rows_read / duration, 1) if duration else None,
+            "compressed_bytes": self.compressed_bytes,
+            "total_bytes": self.total_bytes,
+            "decompressed_bytes": self.decompressed_bytes,
+            "stages": self.stages(),
+            "batch_latency": self.batch_latency.snapshot(),
+            "stats": asdict(stats),
+        }
+
+
+def write_metrics(path: str, metrics: dict) -> None:
+    """Write *metrics* to *path* as JSON (atomically)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(metrics, fh, indent=2)
+        fh.write("\n")
+    os.replace(tmp_path, path)
+
 
 # ---------------------------------------------------------------------------
 # Core import routine
@@ -354,6 +1660,16 @@ def run_import(
     limit: Optional[int],
     batch_size: int,
     dry_run: bool,
+    mode: str = "insert",
+    workers: int = 1,
+    strict: bool = False,
+    resume: bool = False,
+    sync: bool = False,
+    manifest_path: str = DEFAULT_MANIFEST,
+    delete_missing: bool = False,
+    bulk: bool = False,
+    maintenance_work_mem: str = BULK_MAINTENANCE_WORK_MEM,
+    metrics_file: Optional[str] = None,
 ) -> ImportStats:
     """Perform the full streaming import.
 
@@ -362,60 +1678,205 @@ def run_import(
         filename:     Human-readable filename for progress/summary output.
         database_url: psycopg2 DSN / connection string.
         limit:        Maximum valid rows to import (``None`` means no limit).
-        batch_size:   Rows per INSERT batch.
+        batch_size:   Rows per INSERT batch (or per COPY chunk in copy mode).
         dry_run:      When ``True``, parse only — do not touch the database.
+        mode:         ``"insert"`` (``execute_values`` batches) or ``"copy"``
+                      (``COPY`` into an unlogged staging table, merged once at
+                      the end).
+        workers:      Number of parse/validate processes; ``1`` keeps the
+                      whole pipeline on the current core.
+        strict:       Validate each row through the Pydantic :class:`PuzzleRow`
+                      model instead of the compiled fast validator.
+        resume:       Continue from the checkpoint stored for *filename* by an
+                      interrupted run instead of starting from the first row.
+        sync:         Upsert only rows that are new or changed compared with the
+                      manifest at *manifest_path*, then rewrite the manifest.
+        manifest_path: Hash manifest of the previous ``sync`` run.
+        delete_missing: In ``sync`` mode, delete puzzles that are in the old
+                      manifest but no longer in the file (puzzles referenced by
+                      ``user_progress`` are kept).
+        bulk:         If ``puzzles`` is (near) empty, drop the secondary indexes
+                      of ``puzzles`` and its tag tables for the load and
+                      rebuild them afterwards; always finish with ``ANALYZE``.
+        maintenance_work_mem: ``maintenance_work_mem`` for the index rebuild.
+        metrics_file: Write the run's :class:`ImportMetrics` (stage timings,
+                      throughput, batch latency histogram) here as JSON when
+                      the run ends, whether it completed or not.
 
     Returns:
         :class:`ImportStats` with final counters.
 
     Raises:
         SystemExit: When the malformed-row rate exceeds :data:`MALFORMED_TOLERANCE`.
+        ValueError: When resuming a checkpoint written by a different ``mode``.
     """
     stats = ImportStats()
     start_time = time.monotonic()
+    metrics = ImportMetrics(total_bytes=source_size(fileobj))
+    source = MeteredReader(fileobj)
+    decompressed: Optional[MeteredReader] = None
+    loop_start: Optional[float] = None
+    loop_end: Optional[float] = None
+    status = "failed"
 
     conn = None
     cursor = None
+    rows_staged = 0
+    resume_from = 0
 
     if not dry_run:
         conn = psycopg2.connect(database_url)
         conn.autocommit = False
         cursor = conn.cursor()
-
+        cursor.execute(CREATE_CHECKPOINT_SQL)
+
+        checkpoint = load_checkpoint(cursor, filename) if resume else None
+        if checkpoint is not None:
+            if checkpoint.mode != mode:
+                conn.close()
+                raise ValueError(
+                    f"Checkpoint for {filename} was written by --mode {checkpoint.mode};"
+                    f" resume with the same mode"
+                )
+            stats = checkpoint.stats
+            rows_staged = checkpoint.rows_staged
+            resume_from = stats.rows_read
+            log.info("Resuming from checkpoint", file=filename, rows_read=resume_from)
+        else:
+            if resume:
+                log.warning("No checkpoint found, starting from the beginning", file=filename)
+            cursor.execute(CLEAR_CHECKPOINT_SQL, (filename,))
+
+        if mode == "copy":
+            cursor.execute(CREATE_STAGING_SQL)
+            if checkpoint is not None:
+                # The staging table is unlogged, so crash recovery empties it;
+                # the checkpoint is logged and survives.  Skipping rows that are
+                # no longer staged would lose them silently.
+                cursor.execute(COUNT_STAGING_SQL)
+                staged = cursor.fetchone()[0]
+                if staged != checkpoint.rows_staged:
+                    log.warning(
+                        "Staging table does not match the checkpoint,"
+                        " starting from the beginning",
+                        file=filename,
+                        rows_staged=staged,
+                        checkpoint_rows_staged=checkpoint.rows_staged,
+                    )
+                    checkpoint = None
+                    stats = ImportStats()
+                    rows_staged = resume_from = 0
+                    cursor.execute(CLEAR_CHECKPOINT_SQL, (filename,))
+            if checkpoint is None:
+                cursor.execute(TRUNCATE_STAGING_SQL)
+
+        cursor.execute(CREATE_DEFERRED_INDEXES_SQL)
+        cursor.execute(LOAD_DEFERRED_INDEXES_SQL)
+        pending_indexes = cursor.fetchall()
+        if bulk:
+            cursor.execute(NEAR_EMPTY_SQL, (BULK_EMPTY_THRESHOLD,))
+            existing = cursor.fetchone()[0]
+            if pending_indexes or existing < BULK_EMPTY_THRESHOLD:
+                deferred = defer_secondary_indexes(cursor)
+                log.info(
+                    "Deferred secondary indexes for bulk load",
+                    existing_rows=existing,
+                    indexes=[name for name, _ in pending_indexes] + deferred,
+                )
+        elif pending_indexes:
+            # A previous --bulk run stopped early: never load without indexes
+            rebuilt = rebuild_deferred_indexes(cursor, maintenance_work_mem)
+            log.info("Rebuilt indexes left deferred by an earlier bulk run", indexes=rebuilt)
+        conn.commit()
+
+    previous: dict[str, bytes] = {}
+    manifest: Optional[ManifestWriter] = None
+    if sync:
+        previous = load_manifest(manifest_path)
+        log.info("Loaded sync manifest", path=manifest_path, entries=len(previous))
+        if not dry_run:
+            manifest = ManifestWriter(manifest_path)
+
+    reached_limit = False
     dctx = zstandard.ZstdDecompressor()
 
     try:
-        with dctx.stream_reader(fileobj) as reader:
-            text_stream = io.TextIOWrapper(reader, encoding="utf-8", newline="")
-            reader_csv = csv.DictReader(text_stream)
+        with dctx.stream_reader(source) as reader:
+            decompressed = MeteredReader(reader)
+            if workers > 1:
+                results = iter_parallel_results(
+                    decompressed, workers, CHUNK_SIZE, strict, skip=resume_from
+                )
+            else:
+                results = iter_serial_results(decompressed, strict, skip=resume_from)
 
             batch: list[tuple] = []
 
             def flush_batch() -> None:
+                nonlocal rows_staged
                 if dry_run or not batch:
                     return
-                psycopg2.extras.execute_values(cursor, INSERT_SQL, batch, page_size=batch_size)
-                # Count how many rows were actually inserted vs already existed
-                inserted = cursor.rowcount if cursor.rowcount >= 0 else len(batch)
-                stats.rows_inserted += inserted
-                stats.rows_already_exist += len(batch) - inserted
+                flush_start = time.perf_counter()
+                if sync:
+                    # A repeated id in one statement would make DO UPDATE fail
+                    rows = list({row[0]: row for row in batch}.values())
+                    returned = psycopg2.extras.execute_values(
+                        cursor, UPSERT_SQL, rows, page_size=batch_size, fetch=True
+                    )
+                    added = sum(1 for _, inserted in returned if inserted)
+                    stats.rows_inserted += added
+                    stats.rows_updated += len(returned) - added
+                    stats.rows_unchanged += len(rows) - len(returned)
+                    # Re-split tags only for rows the upsert wrote: with an empty
+                    # or stale manifest most rows can be identical in the table
+                    ids = [puzzle_id for puzzle_id, _ in returned]
+                    if ids:
+                        cursor.execute(DELETE_THEMES_SQL, (ids,))
+                        cursor.execute(INSERT_THEMES_SQL, (ids,))
+                        cursor.execute(DELETE_OPENINGS_SQL, (ids,))
+                        cursor.execute(INSERT_OPENINGS_SQL, (ids,))
+                elif mode == "copy":
+                    # Inserted vs existing is only known after the final merge
+                    copy_batch(cursor, batch)
+                    rows_staged += len(batch)
+                else:
+                    psycopg2.extras.execute_values(
+                        cursor, INSERT_SQL, batch, page_size=batch_size
+                    )
+                    # Count how many rows were actually inserted vs already existed
+                    inserted = cursor.rowcount if cursor.rowcount >= 0 else len(batch)
+                    stats.rows_inserted += inserted
+                    stats.rows_already_exist += len(batch) - inserted
+                    ids = [row[0] for row in batch]
+                    cursor.execute(INSERT_THEMES_SQL, (ids,))
+                    cursor.execute(INSERT_OPENINGS_SQL, (ids,))
+                written = time.perf_counter()
+                save_checkpoint(cursor, filename, Checkpoint(mode, stats, rows_staged))
                 conn.commit()
+                committed = time.perf_counter()
+                metrics.write += written - flush_start
+                metrics.commit += committed - written
+                metrics.batch_latency.observe(committed - flush_start)
                 batch.clear()
 
-            for raw_row in reader_csv:
+            loop_start = time.perf_counter()
+            for row, raw_row in results:
                 stats.rows_read += 1
 
                 # Progress reporting
                 if stats.rows_read % PROGRESS_INTERVAL == 0:
-                    pct = stats.rows_read / ESTIMATED_TOTAL * 100
-                    elapsed = time.monotonic() - start_time
-                    print(
-                        f"Processed {stats.rows_read:,} / ~{ESTIMATED_TOTAL:,} rows"
-                        f" ({pct:.1f}%) — {elapsed:.0f}s elapsed"
-                    )
-
-                puzzle = parse_csv_row(raw_row)
-                if puzzle is None:
+                    metrics.compressed_bytes = source.bytes_read
+                    progress_args = (stats.rows_read - resume_from, time.monotonic() - start_time)
+                    if _json_logs:
+                        log.info("Import progress", **metrics.progress(*progress_args))
+                    else:
+                        print(metrics.progress_line(*progress_args))
+                    if metrics.batch_latency.count:
+                        latency = metrics.batch_latency.snapshot()
+                        del latency["buckets"]
+                        log.info("Batch commit latency", rows_read=stats.rows_read, **latency)
+
+                if row is None:
                     stats.rows_skipped += 1
                     log.debug("Skipped malformed row", row=dict(raw_row))
 
@@ -443,31 +1904,99 @@ def run_import(
 
                 stats.rows_valid += 1
 
-                batch.append((
-                    puzzle.puzzle_id,
-                    puzzle.fen,
-                    puzzle.moves,
-                    puzzle.rating,
-                    puzzle.rating_deviation,
-                    puzzle.popularity,
-                    puzzle.nb_plays,
-                    puzzle.themes,
-                    puzzle.game_url,
-                    puzzle.opening_tags,
-                ))
-
-                if len(batch) >= batch_size:
-                    flush_batch()
+                needs_write = True
+                if sync:
+                    digest = row_digest(row)
+                    known = previous.pop(row[0], None)
+                    if manifest is not None:
+                        manifest.add(row[0], digest)
+                    if known == digest:
+                        stats.rows_unchanged += 1
+                        needs_write = False
+                    elif dry_run:
+                        if known is None:
+                            stats.rows_inserted += 1
+                        else:
+                            stats.rows_updated += 1
+
+                if needs_write:
+                    batch.append(row)
+
+                    if len(batch) >= batch_size:
+                        flush_batch()
 
                 # Respect --limit on valid rows
                 if limit is not None and stats.rows_valid >= limit:
                     log.info("Reached row limit", limit=limit)
+                    reached_limit = True
                     break
 
             # Flush remaining partial batch
             flush_batch()
+            results.close()
+            loop_end = time.perf_counter()
+
+        if mode == "copy" and not dry_run:
+            merge_start = time.monotonic()
+            cursor.execute(MERGE_SQL)
+            inserted = cursor.rowcount if cursor.rowcount >= 0 else rows_staged
+            stats.rows_inserted += inserted
+            stats.rows_already_exist += rows_staged - inserted
+            cursor.execute(MERGE_THEMES_SQL)
+            cursor.execute(MERGE_OPENINGS_SQL)
+            cursor.execute(TRUNCATE_STAGING_SQL)
+            log.info(
+                "Merged staging table into puzzles",
+                rows_staged=rows_staged,
+                rows_inserted=inserted,
+                duration=f"{time.monotonic() - merge_start:.1f}s",
+            )
+
+        if sync and not reached_limit:
+            # Whatever is left of the old manifest was not in this dump
+            removed = list(previous)
+            if delete_missing and not dry_run:
+                stats.rows_removed = delete_puzzles(cursor, removed)
+                log.info(
+                    "Deleted puzzles removed upstream",
+                    removed=len(removed),
+                    deleted=stats.rows_removed,
+                    kept_with_progress=len(removed) - stats.rows_removed,
+                )
+            else:
+                stats.rows_removed = len(removed)
+
+        if not dry_run:
+            cursor.execute(REFRESH_THEME_COUNTS_SQL)
+            cursor.execute(REFRESH_RATING_COUNTS_SQL)
+            # The run completed: the next import of this file starts fresh
+            cursor.execute(CLEAR_CHECKPOINT_SQL, (filename,))
+            conn.commit()
+            # After --limit the new manifest covers only part of the dump: keep
+            # the previous one (the finally block discards the partial file)
+            if manifest is not None and not reached_limit:
+                manifest.commit()
+                manifest = None
+
+        if bulk and not dry_run:
+            rebuilt = rebuild_deferred_indexes(cursor, maintenance_work_mem)
+            analyze_start = time.monotonic()
+            cursor.execute("ANALYZE puzzle_themes")
+            cursor.execute("ANALYZE puzzle_openings")
+            cursor.execute("ANALYZE puzzles")
+            conn.commit()
+            log.info(
+                "Bulk load finalised",
+                indexes_rebuilt=rebuilt,
+                analyze=f"{time.monotonic() - analyze_start:.1f}s",
+            )
+
+        if loop_end is not None:
+            metrics.finalise = time.perf_counter() - loop_end
+        status = "completed"
 
     except KeyboardInterrupt:
+        status = "interrupted"
         if conn:
             conn.rollback()
         elapsed = time.monotonic() - start_time
@@ -479,16 +2008,97 @@ def run_import(
             f"  Rows inserted: {stats.rows_inserted:,}\n"
             f"  Elapsed: {elapsed:.1f}s"
         )
+        if not dry_run:
+            print("Committed batches are checkpointed; rerun with --resume to continue.")
+            if bulk:
+                print(
+                    "Secondary indexes stay deferred until a --bulk run completes"
+                    " (or any non-bulk run starts)."
+                )
         raise
     finally:
+        if manifest is not None:
+            manifest.discard()
         if cursor:
             cursor.close()
         if conn:
             conn.close()
 
+        # Exclusive stage times: each reader's time includes the one it wraps
+        metrics.rows_read = stats.rows_read - resume_from
+        metrics.compressed_bytes = source.bytes_read
+        metrics.read = source.seconds
+        if decompressed is not None:
+            metrics.decompressed_bytes = decompressed.bytes_read
+            metrics.decompress = max(decompressed.seconds - source.seconds, 0.0)
+        if loop_start is not None:
+            loop_seconds = (loop_end or time.perf_counter()) - loop_start
+            metrics.parse = max(
+                loop_seconds - metrics.read - metrics.decompress
+                - metrics.write - metrics.commit,
+                0.0,
+            )
+        duration = time.monotonic() - start_time
+        if status == "completed":
+            log.info(
+                "Import stage timings",
+                rows_per_sec=f"{metrics.rows_read / duration:,.0f}" if duration else None,
+                **metrics.stages(),
+            )
+            if metrics.batch_latency.count:
+                log.info("Batch commit latency", **metrics.batch_latency.snapshot())
+        if metrics_file:
+            write_metrics(metrics_file, metrics.to_dict(
+                stats,
+                duration,
+                file=filename,
+                status=status,
+                mode=mode,
+                workers=workers,
+                batch_size=batch_size,
+                dry_run=dry_run,
+            ))
+
     return stats
 
 
+def defer_secondary_indexes(cursor) -> list[str]:
+    """Record and drop the secondary indexes of ``puzzles`` and its tag tables.
+
+    Returns their names.  Primary keys stay: ``ON CONFLICT`` and the foreign
+    keys of ``user_progress`` and the tag tables depend on them.
+    """
+    cursor.execute(SECONDARY_INDEXES_SQL)
+    indexes = cursor.fetchall()
+    for name, definition in indexes:
+        cursor.execute(SAVE_DEFERRED_INDEX_SQL, (name, definition))
+        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+    return [name for name, _ in indexes]
+
+
+def rebuild_deferred_indexes(cursor, maintenance_work_mem: str) -> list[str]:
+    """Recreate every index recorded by :func:`defer_secondary_indexes`."""
+    cursor.execute(LOAD_DEFERRED_INDEXES_SQL)
+    indexes = cursor.fetchall()
+    if indexes:
+        cursor.execute("SET LOCAL maintenance_work_mem = %s", (maintenance_work_mem,))
+    for name, definition in indexes:
+        start = time.monotonic()
+        cursor.execute(definition)
+        log.info("Rebuilt index", index=name, duration=f"{time.monotonic() - start:.1f}s")
+    cursor.execute(CLEAR_DEFERRED_INDEXES_SQL)
+    return [name for name, _ in indexes]
+
+
+def delete_puzzles(cursor, puzzle_ids: list[str]) -> int:
+    """Delete *puzzle_ids* (in chunks) and return how many rows were removed."""
+    deleted = 0
+    for start in range(0, len(puzzle_ids), DELETE_CHUNK):
+        cursor.execute(DELETE_MISSING_SQL, (puzzle_ids[start:start + DELETE_CHUNK],))
+        deleted += max(cursor.rowcount, 0)
+    return deleted
+
+
 # ---------------------------------------------------------------------------
 # DB row count
 # ---------------------------------------------------------------------------
@@ -511,6 +2121,20 @@ def get_puzzle_count(database_url: str) -> int:
 def main() -> None:
     parser = build_arg_parser()
     args = parser.parse_args()
+    configure_logging(args.log_format)
+
+    if args.sync and args.mode == "copy":
+        parser.error("--sync upserts changed rows and cannot be combined with --mode copy")
+    if args.sync and args.resume:
+        parser.error("--sync runs cannot be resumed; rerun the sync instead")
+    if args.delete_missing and not args.sync:
+        parser.error("--delete-missing requires --sync")
+    if args.delete_missing and args.limit is not None:
+        parser.error("--delete-missing needs a full pass over the dump; drop --limit")
+    if args.stream and not args.url:
+        parser.error("--stream requires --url")
+    if args.stream and args.sha256:
+        parser.error("--sha256 cannot be verified before a --stream import; download first")
 
     # Resolve database URL
     database_url = args.database_url or os.environ.get("DATABASE_URL")
@@ -524,37 +2148,56 @@ def main() -> None:
 
     # Resolve source file
     zst_path: Optional[str] = args.file
-    if args.url:
-        default_save = os.path.join(os.path.dirname(__file__), "data", "lichess_db_puzzle.csv.zst")
+    if args.url and args.stream:
+        tee_path = os.path.abspath(args.save_to) if args.save_to else None
+        if tee_path:
+            os.makedirs(os.path.dirname(tee_path), exist_ok=True)
+        source = stream_url(args.url, tee_path=tee_path)
+        filename = os.path.basename(urlparse(args.url).path) or args.url
+    elif args.url:
+        default_save = os.path.join(DATA_DIR, "lichess_db_puzzle.csv.zst")
         save_to = os.path.abspath(args.save_to or default_save)
         os.makedirs(os.path.dirname(save_to), exist_ok=True)
-        if os.path.exists(save_to):
-            log.info("Local file found, skipping download", path=save_to)
-        else:
-            try:
-                download_file(args.url, save_to)
-            except Exception as exc:
+        try:
+            download_file(
+                args.url,
+                save_to,
+                connections=args.download_connections,
+                sha256=args.sha256,
+            )
+        except Exception as exc:
+            if not os.path.exists(save_to) or isinstance(exc, DownloadError):
                 log.error("Download failed", url=args.url, error=str(exc))
                 sys.exit(1)
+            log.warning("Download failed, using existing local file", path=save_to, error=str(exc))
         zst_path = save_to
 
-    if not zst_path:
-        print("ERROR: Provide --file or --url.", file=sys.stderr)
-        sys.exit(1)
+    if not args.stream:
+        if not zst_path:
+            print("ERROR: Provide --file or --url.", file=sys.stderr)
+            sys.exit(1)
+        source = open(zst_path, "rb")
+        filename = os.path.basename(zst_path)
 
-    filename = os.path.basename(zst_path)
     log.info(
         "Starting import",
         file=filename,
         limit=args.limit,
         batch_size=args.batch_size,
         dry_run=args.dry_run,
+        mode=args.mode,
+        workers=args.workers,
+        strict=args.strict,
+        resume=args.resume,
+        sync=args.sync,
+        stream=args.stream,
+        bulk=args.bulk,
     )
 
     start_time = time.monotonic()
 
     try:
-        with open(zst_path, "rb") as fh:
+        with source as fh:
             stats = run_import(
                 fileobj=fh,
                 filename=filename,
@@ -562,6 +2205,16 @@ def main() -> None:
                 limit=args.limit,
                 batch_size=args.batch_size,
                 dry_run=args.dry_run,
+                mode=args.mode,
+                workers=args.workers,
+                strict=args.strict,
+                resume=args.resume,
+                sync=args.sync,
+                manifest_path=args.manifest,
+                delete_missing=args.delete_missing,
+                bulk=args.bulk,
+                maintenance_work_mem=args.maintenance_work_mem,
+                metrics_file=args.metrics_file,
             )
     except KeyboardInterrupt:
         sys.exit(1)
@@ -579,8 +2232,16 @@ def main() -> None:
         except Exception as exc:
             log.warning("Could not fetch puzzle count", error=str(exc))
 
-    summary = format_summary(stats, duration, db_count, filename)
-    print(summary)
+    if _json_logs:
+        log.info(
+            "Import finished",
+            file=filename,
+            duration=round(duration, 1),
+            db_count=db_count,
+            **asdict(stats),
+        )
+    else:
+        print(format_summary(stats, duration, db_count, filename, sync=args.sync))
 
     # Verify count when --limit was used
     if args.limit is not None and not args.dry_run:
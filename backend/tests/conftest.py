@@ -0,0 +1,38 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.db.session import get_read_db
+from app.main import app
+from app.services import puzzle_service
+
+
+@pytest.fixture(autouse=True)
+def _read_db_stand_in(monkeypatch):
+    """
+    Read-only routes check out a pooled connection (get_read_db, or
+    read_connection in the handler); API tests mock the service layer, so
+    they get a stand-in connection instead.
+    """
+
+    @asynccontextmanager
+    async def _read_connection():
+        yield AsyncMock()
+
+    async def _read_db():
+        async with _read_connection() as conn:
+            yield conn
+
+    monkeypatch.setattr("app.api.v1.puzzles.read_connection", _read_connection)
+    app.dependency_overrides[get_read_db] = _read_db
+    yield
+    app.dependency_overrides.pop(get_read_db, None)
+
+
+@pytest.fixture(autouse=True)
+def _empty_puzzle_json_cache():
+    """Test rows reuse puzzle ids with different contents."""
+    puzzle_service._puzzle_json.clear()
+    yield
+    puzzle_service._puzzle_json.clear()
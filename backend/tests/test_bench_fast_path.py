@@ -0,0 +1,88 @@
+"""
+Tests for scripts/bench_fast_path.py — the random-puzzle data path benchmark.
+
+Covers:
+- Both request paths produce the same PuzzleResponse (no database)
+- Measurement and the CPU comparison
+- CLI argument parsing
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import puzzle_service
+from scripts import bench_fast_path
+
+_ROW = {
+    "id": "00sHx",
+    "fen": "8/8/8/8/8/8/8/8 w - - 0 1",
+    "moves": "e2e4 e7e5",
+    "rating": 1500,
+    "themes": "fork",
+}
+
+
+def _result(row):
+    result = MagicMock()
+    result.mappings.return_value.first.return_value = row
+    return result
+
+
+class TestRequests:
+    async def test_paths_build_the_same_response(self):
+        conn = AsyncMock()
+        conn.execute.return_value = _result(_ROW)
+        pool = MagicMock()
+        record = puzzle_service.puzzle_response(_ROW)  # what Postgres returns on the fast path
+        fetch = AsyncMock(return_value=record)
+
+        orm = await bench_fast_path._sqlalchemy_request(conn)
+        with patch.object(bench_fast_path, "fetch_random_puzzle_raw", fetch):
+            raw = await bench_fast_path._asyncpg_request(pool)
+
+        assert orm == raw
+        assert raw.moves == ["e2e4", "e7e5"]
+
+    async def test_sqlalchemy_path_falls_back_to_seek(self):
+        conn = AsyncMock()
+        conn.execute.side_effect = [_result(None), _result(_ROW)]
+
+        response = await bench_fast_path._sqlalchemy_request(conn)
+
+        assert response.id == "00sHx"
+        assert conn.execute.await_args.args[0] is puzzle_service.RANDOM_SEEK_SQL
+
+
+class TestMeasure:
+    async def test_warmup_is_not_timed(self):
+        request = AsyncMock()
+        summary = await bench_fast_path.measure(request, iterations=4, warmup=2)
+
+        assert request.await_count == 6
+        assert summary["cpu"]["count"] == 4 and summary["wall"]["count"] == 4
+
+    def test_compare(self):
+        results = {
+            "sqlalchemy": {"cpu": {"mean_ms": 0.2}},
+            "asyncpg": {"cpu": {"mean_ms": 0.05}},
+        }
+        assert bench_fast_path.compare(results) == {
+            "cpu_saved_per_request_ms": 0.15,
+            "cpu_ratio": 0.25,
+        }
+        assert bench_fast_path.compare({"asyncpg": results["asyncpg"]}) == {}
+
+
+class TestArgs:
+    def test_defaults(self):
+        args = bench_fast_path.build_arg_parser().parse_args([])
+        assert args.path == ["sqlalchemy", "asyncpg"]
+        assert args.iterations == 2000 and args.warmup == 100
+
+    def test_unknown_path_rejected(self):
+        with pytest.raises(SystemExit):
+            bench_fast_path.build_arg_parser().parse_args(["--path", "psycopg"])
+
+    def test_iterations_must_be_positive(self):
+        with pytest.raises(SystemExit):
+            bench_fast_path.main(["--iterations", "0"])
@@ -0,0 +1,102 @@
+"""Tests for backend/scripts/bench_import.py
+
+Covers:
+- Synthetic dataset generation (valid, unique, deterministic rows)
+- Stage pipelines agree on row counts
+- End-to-end JSON report shape (dry-run only, no database)
+- CLI argument validation
+"""
+
+import argparse
+import csv
+import io
+
+import pytest
+import zstandard
+
+from scripts import bench_import
+from scripts.import_puzzles import make_row_parser
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("bench") / "puzzles.csv.zst")
+    bench_import.generate_dataset(path, rows=500, seed=7)
+    return path
+
+
+def _read_records(path):
+    with open(path, "rb") as fh:
+        data = zstandard.ZstdDecompressor().stream_reader(fh).read()
+    return list(csv.reader(io.StringIO(data.decode("utf-8"))))
+
+
+class TestGenerateDataset:
+    def test_rows_pass_validation(self, dataset):
+        header, *records = _read_records(dataset)
+        parse = make_row_parser(header)
+        rows = [parse(fields) for fields in records]
+
+        assert len(rows) == 500
+        assert all(row is not None for row in rows)
+        assert len({row[0] for row in rows}) == 500
+
+    def test_same_seed_same_data(self, dataset, tmp_path):
+        again = str(tmp_path / "again.csv.zst")
+        bench_import.generate_dataset(again, rows=500, seed=7)
+        assert _read_records(again) == _read_records(dataset)
+
+    def test_ensure_dataset_reuses_existing_file(self, dataset, monkeypatch):
+        monkeypatch.setattr(bench_import, "generate_dataset", pytest.fail)
+        assert bench_import.ensure_dataset(500, 7, dataset) == dataset
+
+
+class TestPipelines:
+    def test_row_stages_agree(self, dataset):
+        counts = {
+            stage: bench_import.PIPELINES[stage](dataset, False, 64)
+            for stage in ("csv", "validate", "batch")
+        }
+        assert counts == {"csv": 500, "validate": 500, "batch": 500}
+
+    def test_decompress_counts_bytes(self, dataset):
+        records = _read_records(dataset)
+        assert bench_import.pipeline_decompress(dataset, False, 64) > 500 * len(records[1][1])
+
+
+class TestRunBenchmark:
+    def test_report_shape(self, dataset):
+        args = argparse.Namespace(
+            rows=500, seed=7, dataset=dataset, batch_size=[100], mode=["insert"],
+            workers=1, strict=False, repeat=1, database_url=None, reset=False,
+        )
+        report = bench_import.run_benchmark(args)
+
+        assert list(report["stages"]) == list(bench_import.PARSE_STAGES)
+        assert report["stages"]["validate"]["rows"] == 500
+        assert report["dataset"]["decompressed_bytes"] > report["dataset"]["compressed_bytes"]
+        for result in report["stages"].values():
+            assert result["seconds"] > 0
+            assert result["peak_rss_mb"] > 0
+            assert "_seconds" not in result
+
+        (variant,) = report["imports"]
+        assert variant["dry_run"]["rows"] == 500
+        assert "database" not in variant
+
+
+class TestBenchArgs:
+    def test_defaults(self):
+        args = bench_import.build_arg_parser().parse_args([])
+        assert args.rows == 100_000
+        assert args.batch_size == [1000]
+        assert args.mode == ["insert"]
+
+    @pytest.mark.parametrize("rows", ["9999", "3500001"])
+    def test_row_count_bounds(self, rows):
+        with pytest.raises(SystemExit):
+            bench_import.build_arg_parser().parse_args(["--rows", rows])
+
+    def test_reset_requires_database_url(self):
+        with pytest.raises(SystemExit):
+            bench_import.main(["--reset"])
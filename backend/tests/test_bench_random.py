@@ -0,0 +1,69 @@
+"""Tests for backend/scripts/bench_random.py
+
+Covers:
+- Percentile summary of latency samples
+- Per-strategy measurement against a fake session (no database)
+- CLI argument validation
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from scripts import bench_random
+
+
+class TestSummarise:
+    def test_nearest_rank_percentiles(self):
+        summary = bench_random.summarise([float(ms) for ms in range(100, 0, -1)])
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == 50.0
+        assert summary["p95_ms"] == 95.0
+        assert summary["p99_ms"] == 99.0
+        assert summary["max_ms"] == 100.0
+        assert summary["mean_ms"] == 50.5
+
+    def test_empty(self):
+        assert bench_random.summarise([]) == {"count": 0}
+
+
+class TestMeasure:
+    @pytest.mark.asyncio
+    async def test_warmup_is_not_timed(self):
+        db = AsyncMock()
+        summary = await bench_random.measure(db, "seek", iterations=5, warmup=3)
+
+        assert summary["count"] == 5
+        assert db.execute.await_count == 8
+        assert db.execute.await_args.args[0] is bench_random.RANDOM_SEEK_SQL
+
+    @pytest.mark.asyncio
+    async def test_wraparound_seeks_past_every_key(self):
+        db = AsyncMock()
+        await bench_random.measure(db, "seek_wraparound", iterations=1, warmup=0)
+        assert db.execute.await_args.args[1] == {"key": 1.0}
+
+    @pytest.mark.asyncio
+    async def test_offset_worst_reads_last_row(self):
+        count = MagicMock()
+        count.scalar_one.return_value = 3_500_000
+        db = AsyncMock()
+        db.execute.side_effect = [count, MagicMock()]
+
+        await bench_random.measure(db, "offset_worst", iterations=1, warmup=0)
+        assert db.execute.await_args.args[1] == {"offset": 3_499_999}
+
+
+class TestBenchArgs:
+    def test_defaults(self):
+        args = bench_random.build_arg_parser().parse_args([])
+        assert args.strategy == bench_random.DEFAULT_STRATEGIES
+        assert args.iterations == 200
+
+    def test_unknown_strategy_rejected(self):
+        with pytest.raises(SystemExit):
+            bench_random.build_arg_parser().parse_args(["--strategy", "order_by_random"])
+
+    def test_iterations_must_be_positive(self):
+        with pytest.raises(SystemExit):
+            bench_random.main(["--iterations", "0"])
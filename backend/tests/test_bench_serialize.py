@@ -0,0 +1,65 @@
+"""
+Tests for scripts/bench_serialize.py — the response-building benchmark.
+
+Covers:
+- Both handlers serve the same body for a puzzle
+- Measurement and the speedup in the report
+- CLI argument parsing
+"""
+import json
+from argparse import Namespace
+
+import pytest
+
+from scripts import bench_serialize
+
+
+def _pool(n=1):
+    return bench_serialize._StandInPool(bench_serialize.synthetic_puzzles(n))
+
+
+class TestApps:
+    async def test_variants_serve_the_same_body(self):
+        pool = _pool()
+
+        model = await bench_serialize.request(bench_serialize.model_app(pool))
+        cached = await bench_serialize.request(bench_serialize.cached_app(pool))
+
+        assert json.loads(model) == json.loads(cached)
+        assert json.loads(cached)["id"] == "00000"
+
+    def test_synthetic_puzzles_are_deterministic(self):
+        assert bench_serialize.synthetic_puzzles(5) == bench_serialize.synthetic_puzzles(5)
+
+
+class TestMeasure:
+    async def test_summary(self):
+        summary = await bench_serialize.measure(
+            bench_serialize.cached_app(_pool()), requests=3, warmup=1
+        )
+
+        assert summary["requests"] == 3
+        assert summary["requests_per_sec"] > 0 and summary["mean_us"] > 0
+
+    async def test_report_has_speedup_only_with_both_variants(self):
+        args = Namespace(variant=["model", "cached"], requests=2, warmup=0, puzzles=3)
+        report = await bench_serialize.run_benchmark(args)
+        assert set(report["variants"]) == {"model", "cached"} and report["speedup"] > 0
+
+        args.variant = ["cached"]
+        assert "speedup" not in await bench_serialize.run_benchmark(args)
+
+
+class TestArgs:
+    def test_defaults(self):
+        args = bench_serialize.build_arg_parser().parse_args([])
+        assert args.variant == ["model", "cached"]
+        assert args.requests == 10000 and args.warmup == 2000 and args.puzzles == 1000
+
+    def test_unknown_variant_rejected(self):
+        with pytest.raises(SystemExit):
+            bench_serialize.build_arg_parser().parse_args(["--variant", "ujson"])
+
+    def test_requests_must_be_positive(self):
+        with pytest.raises(SystemExit):
+            bench_serialize.main(["--requests", "0"])
@@ -0,0 +1,327 @@
+"""
+Tests for engine configuration, pool metrics and read-replica routing in
+app/db/session.py.
+
+The pool is exercised with a mock DBAPI creator, and the primary and replica
+are stand-in engines; no database is needed.
+"""
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.config import Settings, get_settings
+from app.db import asyncpg_pool
+from app.db import session as db_session
+from app.db.session import (
+    MeteredQueuePool,
+    PoolMetrics,
+    engine,
+    engine_options,
+    get_read_db,
+)
+from app.main import app, create_app
+
+
+def test_engine_options_from_settings():
+    options = engine_options(
+        Settings(
+            db_pool_size=20,
+            db_max_overflow=5,
+            db_pool_timeout_seconds=2.5,
+            db_pool_recycle_seconds=-1,
+            db_pool_pre_ping=False,
+            db_pool_use_lifo=True,
+            db_statement_cache_size=500,
+            db_prepared_statement_cache_size=250,
+        )
+    )
+
+    assert options["poolclass"] is MeteredQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (20, 5)
+    assert (options["pool_timeout"], options["pool_recycle"]) == (2.5, -1)
+    assert options["pool_pre_ping"] is False and options["pool_use_lifo"] is True
+    assert options["echo"] is False
+    assert options["connect_args"] == {
+        "statement_cache_size": 500,
+        "prepared_statement_cache_size": 250,
+    }
+
+
+def test_engine_options_pgbouncer_disables_statement_caches():
+    options = engine_options(Settings(db_pgbouncer=True, db_statement_cache_size=500))
+    connect_args = options["connect_args"]
+
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    names = {connect_args["prepared_statement_name_func"]() for _ in range(3)}
+    assert len(names) == 3  # unique per statement: no clash on a shared server connection
+
+
+def test_engine_uses_metered_pool():
+    assert isinstance(engine.pool, MeteredQueuePool)
+
+
+def test_pool_metrics_buckets_and_snapshot():
+    metrics = PoolMetrics()
+    metrics.record(0.5)
+    metrics.record(30.0)
+    metrics.record(9000.0, timed_out=True)
+
+    snapshot = metrics.snapshot()
+    assert (snapshot["checkouts"], snapshot["timeouts"]) == (2, 1)
+    assert snapshot["wait_max_ms"] == 9000.0
+    assert snapshot["wait_mean_ms"] == pytest.approx((0.5 + 30 + 9000) / 3, abs=1e-3)
+    buckets = snapshot["wait_buckets_ms"]
+    assert buckets["le_1"] == 1 and buckets["le_50"] == 1 and buckets["le_inf"] == 1
+    assert sum(buckets.values()) == 3
+
+
+@pytest.mark.asyncio
+async def test_metered_pool_counts_checkouts_and_timeouts():
+    pool = MeteredQueuePool(MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+
+    def _exhaust():
+        held = pool.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+        held.close()
+        pool.connect().close()
+
+    await greenlet_spawn(_exhaust)
+
+    snapshot = pool.metrics.snapshot()
+    assert (snapshot["checkouts"], snapshot["timeouts"]) == (2, 1)
+    assert snapshot["wait_max_ms"] >= 10  # the timed-out checkout waited the full timeout
+
+
+def _app_with(**overrides):
+    with patch("app.main.get_settings", return_value=Settings(**overrides)):
+        return create_app()
+
+
+@pytest.mark.asyncio
+async def test_health_pool_disabled_by_default():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/health/pool")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_health_pool_reports_status():
+    transport = ASGITransport(app=_app_with(health_pool_enabled=True))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/health/pool")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["primary"]["size"] == engine.pool.size()
+    assert {"checked_out", "overflow", "checkouts", "timeouts", "wait_buckets_ms"} <= set(
+        body["primary"]
+    )
+    assert body["replica"] is None  # DATABASE_READ_URL unset
+
+
+# ---------------------------------------------------------------------------
+# Read replica routing
+# ---------------------------------------------------------------------------
+
+
+class _Engine:
+    """Stand-in engine; connect() fails while the database is down."""
+
+    def __init__(self, name):
+        self.name = name
+        self.up = True
+        self.connections = []
+
+    async def connect(self):
+        if not self.up:
+            raise ConnectionRefusedError(self.name)
+        connection = MagicMock(name=self.name)
+        connection.execution_options = AsyncMock(return_value=connection)
+        connection.close = AsyncMock()
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def engines():
+    """Primary and replica stand-ins, with the replica configured."""
+    primary, replica = _Engine("primary"), _Engine("replica")
+    with (
+        patch.object(db_session, "engine", primary),
+        patch.object(db_session, "read_engine", replica),
+        patch.object(db_session, "_replica_retry_at", 0.0),
+    ):
+        yield primary, replica
+
+
+async def _read_connection():
+    """Run the real get_read_db to completion; return the connection it yielded."""
+    dependency = db_session.get_read_db()
+    connection = await anext(dependency)
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_read_db_uses_primary_without_replica(engines):
+    primary, _ = engines
+    with patch.object(db_session, "read_engine", None):
+        connection = await _read_connection()
+
+    assert connection is primary.connections[0]
+
+
+@pytest.mark.asyncio
+async def test_read_db_is_autocommit_connection_without_session(engines):
+    _, replica = engines
+
+    connection = await _read_connection()
+
+    assert connection is replica.connections[0]
+    connection.execution_options.assert_awaited_once_with(isolation_level="AUTOCOMMIT")
+    connection.close.assert_awaited_once()
+    connection.commit.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_read_db_falls_back_and_backs_off(engines):
+    primary, replica = engines
+    replica.up = False
+
+    first = await _read_connection()
+    replica.up = True
+    second = await _read_connection()  # within DATABASE_READ_RETRY_SECONDS
+
+    assert [first, second] == primary.connections
+    assert replica.connections == []
+
+    with patch.object(db_session, "_replica_retry_at", 0.0):
+        third = await _read_connection()
+    assert third is replica.connections[0]
+
+
+@pytest.mark.asyncio
+async def test_read_only_routes_use_read_db():
+    read_session = AsyncMock()
+    settings = get_settings()
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    claims = {"sub": str(uuid.UUID(int=42)), "exp": expires}
+    token = jwt.encode(claims, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def _read_db():
+        yield read_session
+
+    @asynccontextmanager
+    async def _read_connection():
+        yield read_session
+
+    overridden = app.dependency_overrides[get_read_db]
+    app.dependency_overrides[get_read_db] = _read_db
+    random_mock = AsyncMock(return_value=None)
+    stats_mock = AsyncMock(return_value=None)
+    try:
+        with (
+            patch("app.api.v1.puzzles.read_connection", _read_connection),
+            patch("app.api.v1.puzzles.get_random_puzzle", random_mock),
+            patch("app.api.v1.users.get_user_stats", stats_mock),
+        ):
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/api/v1/puzzles/random")
+                await client.get("/api/v1/users/me/stats", headers=headers)
+    finally:
+        app.dependency_overrides[get_read_db] = overridden
+
+    assert random_mock.await_args.args[0] is read_session
+    assert stats_mock.await_args.args[0] is read_session
+
+
+# ---------------------------------------------------------------------------
+# Raw asyncpg pool
+# ---------------------------------------------------------------------------
+
+
+def test_asyncpg_dsn_drops_driver():
+    dsn = asyncpg_pool.asyncpg_dsn("postgresql+asyncpg://night:s3cret@db:5432/nightchess")
+    assert dsn == "postgresql://night:s3cret@db:5432/nightchess"
+
+
+@pytest.mark.asyncio
+async def test_asyncpg_pool_disabled():
+    create = AsyncMock()
+    with patch("app.db.asyncpg_pool.asyncpg.create_pool", create):
+        assert await asyncpg_pool.start_asyncpg_pool(Settings(fast_path_enabled=False)) is None
+    create.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_asyncpg_pool_prefers_replica_and_falls_back_to_primary():
+    pool = MagicMock(close=AsyncMock())
+    create = AsyncMock(side_effect=[ConnectionRefusedError("replica"), pool])
+    settings = Settings(
+        database_url="postgresql+asyncpg://u:p@primary/db",
+        database_read_url="postgresql+asyncpg://u:p@replica/db",
+        db_pgbouncer=True,
+    )
+    with patch("app.db.asyncpg_pool.asyncpg.create_pool", create):
+        assert await asyncpg_pool.start_asyncpg_pool(settings) is pool
+        await asyncpg_pool.stop_asyncpg_pool()
+
+    assert [c.args[0] for c in create.await_args_list] == [
+        "postgresql://u:p@replica/db",
+        "postgresql://u:p@primary/db",
+    ]
+    assert create.await_args.kwargs["statement_cache_size"] == 0
+    pool.close.assert_awaited_once()
+    assert asyncpg_pool.get_asyncpg_pool() is None
+
+
+@pytest.mark.asyncio
+async def test_asyncpg_pool_reopened_after_retry_window():
+    pool = MagicMock(close=AsyncMock())
+    create = AsyncMock(side_effect=[ConnectionRefusedError("down"), pool])
+    settings = Settings(database_read_url="", database_read_retry_seconds=30)
+    with patch("app.db.asyncpg_pool.asyncpg.create_pool", create):
+        assert await asyncpg_pool.start_asyncpg_pool(settings) is None
+        # Within the window: no reconnect attempt
+        assert asyncpg_pool.get_asyncpg_pool() is None
+        assert create.await_count == 1
+
+        with patch.object(asyncpg_pool, "_retry_at", 0.0):
+            assert asyncpg_pool.get_asyncpg_pool() is None  # opens in the background
+            await asyncpg_pool._open_task
+        assert asyncpg_pool.get_asyncpg_pool() is pool
+        await asyncpg_pool.stop_asyncpg_pool()
+
+    assert create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_discarded_asyncpg_pool_waits_out_retry_window():
+    pool = MagicMock(close=AsyncMock())
+    create = AsyncMock(return_value=pool)
+    with patch("app.db.asyncpg_pool.asyncpg.create_pool", create):
+        await asyncpg_pool.start_asyncpg_pool(
+            Settings(database_read_url="", database_read_retry_seconds=30)
+        )
+        asyncpg_pool.discard_asyncpg_pool(MagicMock(), OSError("stale pool"))
+        assert asyncpg_pool.get_asyncpg_pool() is pool
+
+        asyncpg_pool.discard_asyncpg_pool(pool, OSError("replica down"))
+        assert asyncpg_pool.get_asyncpg_pool() is None
+        await asyncpg_pool.stop_asyncpg_pool()
+
+    pool.terminate.assert_called_once_with()
+    assert create.await_count == 1
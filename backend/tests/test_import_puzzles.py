@@ -10,11 +10,25 @@ Covers:
 - CLI argument defaults
 - Dry-run mode (no DB calls)
 - KeyboardInterrupt partial-stats output
+- COPY bulk-load mode (mocked psycopg2)
+- Multi-process parse/validate pipeline (--workers)
+- Fast validator vs --strict Pydantic path equivalence
+- Checkpointing and --resume
+- Delta sync against a hash manifest (--sync)
+- Resumable / ranged / conditional downloads against a local HTTP server
+- Streaming download-and-import (--stream)
+- Bulk mode: deferred secondary indexes and post-load ANALYZE (--bulk)
+- Stage timers, ETA and batch latency metrics (--metrics-file)
 """
 
 import csv
+import hashlib
 import io
+import json
+import os
+import threading
 import zstandard
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Optional
 from unittest.mock import MagicMock, patch, call
 
@@ -64,6 +78,23 @@ def make_row(**overrides):
     return row
 
 
+def make_zst_csv(rows: list[dict]) -> bytes:
+    """Create a real zstandard-compressed Lichess CSV in memory."""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDNAMES)
+    writer.writeheader()
+    writer.writerows(rows)
+    return zstandard.ZstdCompressor().compress(buf.getvalue().encode())
+
+
+def make_mock_connection(rowcount: int = 0) -> MagicMock:
+    """Return a psycopg2 connection mock whose cursor reports *rowcount*."""
+    conn = MagicMock()
+    conn.cursor.return_value.rowcount = rowcount
+    conn.cursor.return_value.fetchall.return_value = []
+    return conn
+
+
 # ---------------------------------------------------------------------------
 # PuzzleRow validation tests
 # ---------------------------------------------------------------------------
@@ -505,3 +536,1316 @@ class TestCLIArgs:
         args = parser.parse_args(["--file", "/tmp/test.zst"])
         # Should be None when not specified (will fall back to env var in main)
         assert args.database_url is None
+
+
+# ---------------------------------------------------------------------------
+# COPY mode tests
+# ---------------------------------------------------------------------------
+
+class TestFormatCopyRow:
+    def test_tab_separated_with_trailing_newline(self):
+        from scripts.import_puzzles import format_copy_row
+        assert format_copy_row(("abc", 1500, "fork")) == "abc\t1500\tfork\n"
+
+    def test_none_becomes_null_marker(self):
+        from scripts.import_puzzles import format_copy_row
+        assert format_copy_row(("abc", None)) == "abc\t\\N\n"
+
+    def test_special_characters_escaped(self):
+        from scripts.import_puzzles import format_copy_row
+        line = format_copy_row(("a\tb", "c\nd", "e\\f"))
+        assert line == "a\\tb\tc\\nd\te\\\\f\n"
+
+
+class TestRunImportCopyMode:
+    def _run(self, rows: list[dict], conn: MagicMock, **kwargs):
+        from scripts.import_puzzles import run_import
+
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn):
+            return run_import(
+                fileobj=io.BytesIO(make_zst_csv(rows)),
+                filename="test.zst",
+                database_url="postgresql://test",
+                limit=None,
+                batch_size=2,
+                dry_run=False,
+                mode="copy",
+                **kwargs,
+            )
+
+    def test_rows_streamed_with_copy(self):
+        from scripts.import_puzzles import COPY_SQL
+
+        conn = make_mock_connection(rowcount=3)
+        rows = [make_row(PuzzleId=f"id{i:04d}") for i in range(3)]
+        self._run(rows, conn)
+
+        cursor = conn.cursor.return_value
+        assert cursor.copy_expert.call_count == 2  # batches of 2 + 1
+        copied = "".join(c.args[1].getvalue() for c in cursor.copy_expert.call_args_list)
+        assert copied.count("\n") == 3
+        assert all(c.args[0] == COPY_SQL for c in cursor.copy_expert.call_args_list)
+
+    def test_merge_counts_reported_in_stats(self):
+        from scripts.import_puzzles import MERGE_SQL
+
+        conn = make_mock_connection(rowcount=2)  # 1 of 3 already existed
+        rows = [make_row(PuzzleId=f"id{i:04d}") for i in range(3)]
+        stats = self._run(rows, conn)
+
+        executed = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+        assert MERGE_SQL in executed
+        assert stats.rows_valid == 3
+        assert stats.rows_inserted == 2
+        assert stats.rows_already_exist == 1
+
+    def test_execute_values_not_used(self):
+        conn = make_mock_connection(rowcount=1)
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values") as ev:
+            self._run([VALID_ROW], conn)
+        ev.assert_not_called()
+
+    def test_mode_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "/tmp/t.zst"]).mode == "insert"
+        assert parser.parse_args(["--file", "/tmp/t.zst", "--mode", "copy"]).mode == "copy"
+
+
+# ---------------------------------------------------------------------------
+# Multi-process pipeline tests
+# ---------------------------------------------------------------------------
+
+class TestLineChunks:
+    def test_chunks_end_on_line_boundaries(self):
+        from scripts.import_puzzles import iter_line_chunks
+
+        data = b"".join(f"line{i}\n".encode() for i in range(100))
+        chunks = list(iter_line_chunks(io.BytesIO(data), chunk_size=16))
+        assert b"".join(chunks) == data
+        assert all(chunk.endswith(b"\n") for chunk in chunks)
+
+    def test_trailing_line_without_newline_kept(self):
+        from scripts.import_puzzles import iter_line_chunks
+
+        chunks = list(iter_line_chunks(io.BytesIO(b"a\nbb\nccc"), chunk_size=4))
+        assert b"".join(chunks) == b"a\nbb\nccc"
+        assert chunks[-1] == b"ccc"
+
+
+class TestParallelImport:
+    ROWS = [
+        make_row(PuzzleId=f"id{i:04d}") if i % 7 else make_row(PuzzleId=f"id{i:04d}", Rating="x")
+        for i in range(200)
+    ]
+
+    def _run(self, rows: list[dict], workers: int, limit: Optional[int] = None):
+        from scripts.import_puzzles import run_import
+
+        with patch("scripts.import_puzzles.CHUNK_SIZE", 1024):
+            return run_import(
+                fileobj=io.BytesIO(make_zst_csv(rows)),
+                filename="test.zst",
+                database_url="",
+                limit=limit,
+                batch_size=50,
+                dry_run=True,
+                workers=workers,
+            )
+
+    def test_parse_chunk_returns_tuples_and_raw_rejects(self):
+        from scripts.import_puzzles import parse_chunk
+
+        buf = io.StringIO()
+        csv.DictWriter(buf, fieldnames=FIELDNAMES).writerows([VALID_ROW, make_row(FEN="")])
+        results = parse_chunk(FIELDNAMES, buf.getvalue().encode())
+
+        assert results[0][0][0] == "00sHx"
+        assert results[0][1] is None
+        assert results[1][0] is None
+        assert results[1][1]["FEN"] == ""
+
+    def test_same_stats_as_serial(self):
+        serial = self._run(self.ROWS, workers=1)
+        parallel = self._run(self.ROWS, workers=2)
+        assert parallel == serial
+        assert parallel.rows_skipped == 29
+
+    def test_limit_respected(self):
+        stats = self._run(self.ROWS, workers=2, limit=10)
+        assert stats.rows_valid == 10
+
+    def test_rows_arrive_in_file_order(self):
+        from scripts.import_puzzles import iter_parallel_results
+
+        raw = zstandard.ZstdDecompressor().decompress(make_zst_csv(self.ROWS))
+        results = list(iter_parallel_results(io.BytesIO(raw), workers=3, chunk_size=512))
+        ids = [row[0] for row, _ in results if row is not None]
+        assert ids == sorted(ids)
+        assert len(results) == len(self.ROWS)
+
+    def test_workers_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "/tmp/t.zst"]).workers == 1
+        assert parser.parse_args(["--file", "/tmp/t.zst", "--workers", "4"]).workers == 4
+
+
+# ---------------------------------------------------------------------------
+# Fast validator tests
+# ---------------------------------------------------------------------------
+
+def _fields(row: dict, fieldnames=FIELDNAMES) -> list[str]:
+    return [row[name] for name in fieldnames]
+
+
+# Rows covering every accept/reject rule; each is a csv.reader field list
+EDGE_CASE_FIELDS = [
+    _fields(VALID_ROW),
+    _fields(make_row(PuzzleId="")),
+    _fields(make_row(PuzzleId="   ")),
+    _fields(make_row(PuzzleId=" 00sHx ")),
+    _fields(make_row(PuzzleId="1234567890")),
+    _fields(make_row(PuzzleId="12345678901")),
+    _fields(make_row(FEN="")),
+    _fields(make_row(FEN=" ")),
+    _fields(make_row(Moves="")),
+    _fields(make_row(Rating="0")),
+    _fields(make_row(Rating="4000")),
+    _fields(make_row(Rating="-1")),
+    _fields(make_row(Rating="4001")),
+    _fields(make_row(Rating=" 1500 ")),
+    _fields(make_row(Rating="+1500")),
+    _fields(make_row(Rating="1_500")),
+    _fields(make_row(Rating="1500.0")),
+    _fields(make_row(Rating="")),
+    _fields(make_row(RatingDeviation="abc")),
+    _fields(make_row(Popularity="-100")),
+    _fields(make_row(NbPlays="")),
+    _fields(make_row(Themes="", GameUrl="", OpeningTags="")),
+    _fields(make_row(Themes="  fork  ")),
+    _fields(VALID_ROW)[:7],  # optional columns missing
+    _fields(VALID_ROW)[:5],  # required columns missing
+    _fields(VALID_ROW) + ["extra"],
+    ["00sHx"],
+]
+
+
+class TestFastValidator:
+    def test_valid_row_yields_insert_tuple(self):
+        from scripts.import_puzzles import compile_row_validator, puzzle_to_tuple
+
+        validate = compile_row_validator(FIELDNAMES)
+        assert validate(_fields(VALID_ROW)) == puzzle_to_tuple(parse_csv_row(VALID_ROW))
+
+    def test_empty_optionals_become_none(self):
+        from scripts.import_puzzles import compile_row_validator
+
+        row = compile_row_validator(FIELDNAMES)(
+            _fields(make_row(Themes="", GameUrl="", OpeningTags=""))
+        )
+        assert row[7:] == (None, None, None)
+
+    @pytest.mark.parametrize("fields", EDGE_CASE_FIELDS)
+    def test_fast_and_strict_paths_agree(self, fields):
+        from scripts.import_puzzles import make_row_parser
+
+        fast = make_row_parser(FIELDNAMES, strict=False)
+        strict = make_row_parser(FIELDNAMES, strict=True)
+        assert fast(fields) == strict(fields)
+
+    def test_paths_agree_with_reordered_header(self):
+        from scripts.import_puzzles import make_row_parser
+
+        header = list(reversed(FIELDNAMES))
+        fast = make_row_parser(header, strict=False)
+        strict = make_row_parser(header, strict=True)
+        for fields in EDGE_CASE_FIELDS[:23]:
+            reordered = list(reversed(fields))
+            assert fast(reordered) == strict(reordered)
+
+    def test_missing_required_column_rejects_everything(self):
+        from scripts.import_puzzles import compile_row_validator
+
+        header = [name for name in FIELDNAMES if name != "Rating"]
+        validate = compile_row_validator(header)
+        assert validate(_fields(VALID_ROW, header)) is None
+
+    def test_strict_import_matches_fast_import(self):
+        from scripts.import_puzzles import run_import
+
+        rows = [make_row(PuzzleId=f"id{i:04d}", Rating=str(i * 30)) for i in range(200)]
+        zst_bytes = make_zst_csv(rows)
+        common = dict(filename="t.zst", database_url="", limit=None, batch_size=50, dry_run=True)
+        fast = run_import(fileobj=io.BytesIO(zst_bytes), **common)
+        strict = run_import(fileobj=io.BytesIO(zst_bytes), strict=True, **common)
+        assert fast == strict
+        assert fast.rows_skipped == 66  # ratings above 4000
+
+    def test_strict_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "/tmp/t.zst"]).strict is False
+        assert parser.parse_args(["--file", "/tmp/t.zst", "--strict"]).strict is True
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint / resume tests
+# ---------------------------------------------------------------------------
+
+class TestCheckpointResume:
+    ROWS = [make_row(PuzzleId=f"id{i:04d}") for i in range(10)]
+
+    def _run(self, conn: MagicMock, **kwargs):
+        from scripts.import_puzzles import run_import
+
+        params = dict(
+            filename="test.zst",
+            database_url="postgresql://test",
+            limit=None,
+            batch_size=4,
+            dry_run=False,
+        )
+        params.update(kwargs)
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn), \
+                patch("scripts.import_puzzles.psycopg2.extras.execute_values") as ev:
+            # run_import reuses its batch list, so snapshot each call's rows
+            ev.batches = []
+            ev.side_effect = lambda cur, sql, batch, **kw: ev.batches.append(list(batch))
+            stats = run_import(fileobj=io.BytesIO(make_zst_csv(self.ROWS)), **params)
+        return stats, ev
+
+    def _saved_checkpoints(self, conn: MagicMock) -> list[dict]:
+        from scripts.import_puzzles import SAVE_CHECKPOINT_SQL
+
+        return [
+            c.args[1] for c in conn.cursor.return_value.execute.call_args_list
+            if c.args[0] == SAVE_CHECKPOINT_SQL
+        ]
+
+    def test_checkpoint_saved_before_each_batch_commit(self):
+        from scripts.import_puzzles import SAVE_CHECKPOINT_SQL
+
+        conn = make_mock_connection(rowcount=4)
+        self._run(conn)
+
+        saved = self._saved_checkpoints(conn)
+        assert [cp["rows_read"] for cp in saved] == [4, 8, 10]
+        assert all(cp["source"] == "test.zst" for cp in saved)
+
+        # Each checkpoint write is followed by the commit of its batch
+        calls = [c[0] for c in conn.mock_calls]
+        for i, name in enumerate(calls):
+            if name == "cursor().execute" and conn.mock_calls[i].args[0] == SAVE_CHECKPOINT_SQL:
+                assert calls[i + 1] == "commit"
+
+    def test_checkpoint_cleared_after_successful_run(self):
+        from scripts.import_puzzles import CLEAR_CHECKPOINT_SQL
+
+        conn = make_mock_connection(rowcount=4)
+        self._run(conn)
+
+        last_execute = conn.cursor.return_value.execute.call_args_list[-1]
+        assert last_execute.args == (CLEAR_CHECKPOINT_SQL, ("test.zst",))
+
+    def test_resume_skips_committed_rows_and_restores_stats(self):
+        conn = make_mock_connection(rowcount=2)
+        # mode, rows_read, rows_valid, rows_skipped, rows_inserted, rows_already_exist, staged
+        conn.cursor.return_value.fetchone.return_value = ("insert", 8, 8, 0, 7, 1, 0)
+        stats, ev = self._run(conn, resume=True)
+
+        ev.assert_called_once()
+        inserted_ids = [row[0] for row in ev.batches[0]]
+        assert inserted_ids == ["id0008", "id0009"]
+        assert stats.rows_read == 10
+        assert stats.rows_valid == 10
+        assert stats.rows_inserted == 9
+        assert stats.rows_already_exist == 1
+
+    def test_resume_without_checkpoint_starts_from_beginning(self):
+        conn = make_mock_connection(rowcount=4)
+        conn.cursor.return_value.fetchone.return_value = None
+        stats, ev = self._run(conn, resume=True)
+
+        assert ev.call_count == 3
+        assert stats.rows_read == 10
+
+    def test_resume_with_different_mode_rejected(self):
+        conn = make_mock_connection()
+        conn.cursor.return_value.fetchone.return_value = ("copy", 8, 8, 0, 0, 0, 8)
+        with pytest.raises(ValueError, match="--mode copy"):
+            self._run(conn, resume=True, mode="insert")
+
+    def test_parallel_resume_skips_same_rows(self):
+        from scripts.import_puzzles import iter_parallel_results, iter_serial_results
+
+        raw = zstandard.ZstdDecompressor().decompress(make_zst_csv(self.ROWS))
+        serial = list(iter_serial_results(io.BytesIO(raw), skip=6))
+        parallel = list(
+            iter_parallel_results(io.BytesIO(raw), workers=2, chunk_size=256, skip=6)
+        )
+        assert parallel == serial
+        assert [row[0] for row, _ in serial] == ["id0006", "id0007", "id0008", "id0009"]
+
+    def test_skip_lines_across_chunks(self):
+        from scripts.import_puzzles import skip_lines
+
+        chunks = [b"a\nb\n", b"c\nd\n", b"e\n"]
+        assert b"".join(skip_lines(chunks, 3)) == b"d\ne\n"
+        assert b"".join(skip_lines(chunks, 0)) == b"a\nb\nc\nd\ne\n"
+
+    def test_skip_lines_does_not_count_blank_lines(self):
+        from scripts.import_puzzles import skip_lines
+
+        chunks = [b"a\n\nb\n", b"\r\nc\nd\n"]
+        assert b"".join(skip_lines(chunks, 3)) == b"d\n"
+
+    def test_parallel_resume_matches_serial_across_blank_lines(self):
+        from scripts.import_puzzles import iter_parallel_results, iter_serial_results
+
+        raw = b"\n".join(
+            [",".join(FIELDNAMES).encode()]
+            + [",".join(_fields(make_row(PuzzleId=f"id{i}"))).encode() for i in range(2)]
+            + [b""]
+            + [",".join(_fields(make_row(PuzzleId=f"id{i}"))).encode() for i in range(2, 5)]
+        ) + b"\n"
+        serial = list(iter_serial_results(io.BytesIO(raw), skip=3))
+        parallel = list(
+            iter_parallel_results(io.BytesIO(raw), workers=2, chunk_size=64, skip=3)
+        )
+        assert [row[0] for row, _ in serial] == ["id3", "id4"]
+        assert parallel == serial
+
+    def test_copy_resume_restarts_when_staging_was_emptied(self):
+        from scripts.import_puzzles import CLEAR_CHECKPOINT_SQL, TRUNCATE_STAGING_SQL
+
+        conn = make_mock_connection(rowcount=10)
+        # Checkpoint after 8 staged rows, but crash recovery emptied the table
+        conn.cursor.return_value.fetchone.side_effect = [
+            ("copy", 8, 8, 0, 0, 0, 8),
+            (0,),
+        ]
+        stats, _ = self._run(conn, resume=True, mode="copy")
+
+        executed = [c.args for c in conn.cursor.return_value.execute.call_args_list]
+        assert (CLEAR_CHECKPOINT_SQL, ("test.zst",)) in executed
+        assert (TRUNCATE_STAGING_SQL,) in executed
+        copied = "".join(
+            c.args[1].getvalue() for c in conn.cursor.return_value.copy_expert.call_args_list
+        )
+        assert copied.count("\n") == 10
+        assert stats.rows_read == 10
+        assert stats.rows_inserted == 10 and stats.rows_already_exist == 0
+
+    def test_copy_resume_continues_when_staging_matches(self):
+        conn = make_mock_connection(rowcount=10)
+        conn.cursor.return_value.fetchone.side_effect = [
+            ("copy", 8, 8, 0, 0, 0, 8),
+            (8,),
+        ]
+        stats, _ = self._run(conn, resume=True, mode="copy")
+
+        copied = "".join(
+            c.args[1].getvalue() for c in conn.cursor.return_value.copy_expert.call_args_list
+        )
+        assert copied.count("\n") == 2
+        assert stats.rows_read == 10
+
+    def test_resume_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "/tmp/t.zst"]).resume is False
+        assert parser.parse_args(["--file", "/tmp/t.zst", "--resume"]).resume is True
+
+
+# ---------------------------------------------------------------------------
+# Sync (delta import) tests
+# ---------------------------------------------------------------------------
+
+class TestSyncManifest:
+    def test_digest_changes_with_content(self):
+        from scripts.import_puzzles import row_digest
+
+        row = ("abc", "fen", "e2e4", 1500, 75, 80, 10, None, None, None)
+        changed = ("abc", "fen", "e2e4", 1500, 75, 80, 11, None, None, None)
+        assert row_digest(row) == row_digest(tuple(row))
+        assert row_digest(row) != row_digest(changed)
+        assert len(row_digest(row)) == 8
+
+    def test_manifest_round_trip(self, tmp_path):
+        from scripts.import_puzzles import ManifestWriter, load_manifest
+
+        path = str(tmp_path / "m.zst")
+        writer = ManifestWriter(path)
+        writer.add("00sHx", b"\x01" * 8)
+        writer.add("1234567890", b"\x02" * 8)
+        writer.commit()
+
+        assert load_manifest(path) == {"00sHx": b"\x01" * 8, "1234567890": b"\x02" * 8}
+
+    def test_missing_manifest_is_empty(self, tmp_path):
+        from scripts.import_puzzles import load_manifest
+        assert load_manifest(str(tmp_path / "none.zst")) == {}
+
+    def test_discard_leaves_previous_manifest(self, tmp_path):
+        from scripts.import_puzzles import ManifestWriter, load_manifest
+
+        path = str(tmp_path / "m.zst")
+        first = ManifestWriter(path)
+        first.add("keep", b"\x00" * 8)
+        first.commit()
+
+        second = ManifestWriter(path)
+        second.add("other", b"\x00" * 8)
+        second.discard()
+
+        assert load_manifest(path) == {"keep": b"\x00" * 8}
+        assert not (tmp_path / "m.zst.tmp").exists()
+
+
+class TestSyncImport:
+    def _run(self, rows, manifest_path, conn=None, **kwargs):
+        from scripts.import_puzzles import run_import
+
+        params = dict(
+            filename="test.zst",
+            database_url="postgresql://test",
+            limit=None,
+            batch_size=100,
+            dry_run=conn is None,
+            sync=True,
+            manifest_path=manifest_path,
+        )
+        params.update(kwargs)
+        fileobj = io.BytesIO(make_zst_csv(rows))
+        if conn is None:
+            return run_import(fileobj=fileobj, **params)
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn):
+            return run_import(fileobj=fileobj, **params)
+
+    def _seed_manifest(self, path, rows):
+        from scripts.import_puzzles import (
+            ManifestWriter,
+            compile_row_validator,
+            row_digest,
+        )
+
+        validate = compile_row_validator(FIELDNAMES)
+        writer = ManifestWriter(path)
+        for raw in rows:
+            row = validate(_fields(raw))
+            writer.add(row[0], row_digest(row))
+        writer.commit()
+
+    def test_only_new_and_changed_rows_upserted(self, tmp_path):
+        from scripts.import_puzzles import UPSERT_SQL
+
+        path = str(tmp_path / "m.zst")
+        old = [make_row(PuzzleId=f"id{i}") for i in range(5)]
+        self._seed_manifest(path, old)
+
+        new = old[:3] + [make_row(PuzzleId="id3", NbPlays="99999"), make_row(PuzzleId="id9")]
+        conn = make_mock_connection()
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values") as ev:
+            ev.return_value = [("id3", False), ("id9", True)]
+            stats = self._run(new, path, conn=conn)
+
+        assert ev.call_args.args[1] == UPSERT_SQL
+        assert [row[0] for row in ev.call_args.args[2]] == ["id3", "id9"]
+        assert stats.rows_inserted == 1
+        assert stats.rows_updated == 1
+        assert stats.rows_unchanged == 3
+        assert stats.rows_removed == 1  # id4 is gone, reported but not deleted
+
+    def test_tags_resplit_only_for_written_rows(self, tmp_path):
+        from scripts.import_puzzles import DELETE_OPENINGS_SQL, DELETE_THEMES_SQL
+
+        path = str(tmp_path / "m.zst")  # no manifest: every row looks new
+        rows = [make_row(PuzzleId=f"id{i}") for i in range(4)]
+        conn = make_mock_connection()
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values") as ev:
+            ev.return_value = [("id2", True)]  # the other three were identical
+            stats = self._run(rows, path, conn=conn)
+
+        executed = conn.cursor.return_value.execute.call_args_list
+        deletes = [
+            c.args[1] for c in executed if c.args[0] in (DELETE_THEMES_SQL, DELETE_OPENINGS_SQL)
+        ]
+        assert deletes == [(["id2"],), (["id2"],)]
+        assert (stats.rows_inserted, stats.rows_unchanged) == (1, 3)
+
+    def test_no_tag_statements_when_nothing_written(self, tmp_path):
+        from scripts.import_puzzles import DELETE_THEMES_SQL, INSERT_THEMES_SQL
+
+        conn = make_mock_connection()
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values", return_value=[]):
+            self._run([make_row(PuzzleId="a")], str(tmp_path / "m.zst"), conn=conn)
+
+        executed = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+        assert DELETE_THEMES_SQL not in executed and INSERT_THEMES_SQL not in executed
+
+    def test_manifest_rewritten_after_successful_sync(self, tmp_path):
+        from scripts.import_puzzles import load_manifest
+
+        path = str(tmp_path / "m.zst")
+        self._seed_manifest(path, [make_row(PuzzleId="gone")])
+        conn = make_mock_connection()
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values", return_value=[]):
+            self._run([make_row(PuzzleId="a"), make_row(PuzzleId="b")], path, conn=conn)
+
+        assert set(load_manifest(path)) == {"a", "b"}
+
+    def test_delete_missing_deletes_removed_ids(self, tmp_path):
+        from scripts.import_puzzles import DELETE_MISSING_SQL
+
+        path = str(tmp_path / "m.zst")
+        self._seed_manifest(path, [make_row(PuzzleId=p) for p in ("a", "x", "y")])
+        conn = make_mock_connection(rowcount=1)  # one of two kept (has progress)
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values", return_value=[]):
+            stats = self._run([make_row(PuzzleId="a")], path, conn=conn, delete_missing=True)
+
+        deletes = [
+            c.args[1][0] for c in conn.cursor.return_value.execute.call_args_list
+            if c.args[0] == DELETE_MISSING_SQL
+        ]
+        assert [sorted(ids) for ids in deletes] == [["x", "y"]]
+        assert stats.rows_removed == 1
+
+    def test_limit_keeps_previous_manifest(self, tmp_path):
+        from scripts.import_puzzles import load_manifest
+
+        path = str(tmp_path / "m.zst")
+        old = [make_row(PuzzleId=p) for p in ("a", "b", "c")]
+        self._seed_manifest(path, old)
+        before = load_manifest(path)
+        conn = make_mock_connection()
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values", return_value=[]):
+            self._run(old + [make_row(PuzzleId="d")], path, conn=conn, limit=2)
+
+        assert load_manifest(path) == before
+        assert not (tmp_path / "m.zst.tmp").exists()
+
+    def test_dry_run_classifies_against_manifest(self, tmp_path):
+        path = str(tmp_path / "m.zst")
+        old = [make_row(PuzzleId="a"), make_row(PuzzleId="b")]
+        self._seed_manifest(path, old)
+
+        stats = self._run(
+            [old[0], make_row(PuzzleId="b", Rating="1600"), make_row(PuzzleId="c")], path
+        )
+
+        assert (stats.rows_inserted, stats.rows_updated, stats.rows_unchanged) == (1, 1, 1)
+        assert not (tmp_path / "m.zst.tmp").exists()
+
+    def test_summary_reports_delta_counts(self):
+        stats = ImportStats(rows_inserted=12, rows_updated=34, rows_unchanged=56, rows_removed=7)
+        summary = format_summary(stats, 1.0, 100, "f.zst", sync=True)
+        assert "added: 12" in summary
+        assert "updated: 34" in summary
+        assert "unchanged: 56" in summary
+        assert "removed upstream: 7" in summary
+
+    def test_sync_flags_parsed(self):
+        from scripts.import_puzzles import DEFAULT_MANIFEST, build_arg_parser
+        parser = build_arg_parser()
+        args = parser.parse_args(["--file", "/tmp/t.zst"])
+        assert args.sync is False and args.delete_missing is False
+        assert args.manifest == DEFAULT_MANIFEST
+        args = parser.parse_args(["--file", "/tmp/t.zst", "--sync", "--delete-missing"])
+        assert args.sync is True and args.delete_missing is True
+
+
+# ---------------------------------------------------------------------------
+# download_file tests (local HTTP server stand-in)
+# ---------------------------------------------------------------------------
+
+
+class _FileServer:
+    """Serves one in-memory file with ETag, Last-Modified and Range support."""
+
+    def __init__(self, body: bytes, ranges: bool = True):
+        self.body = body
+        self.etag = '"v1"'
+        self.ranges = ranges
+        self.requests: list[tuple[str, dict]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _headers(self, status, length):
+                self.send_response(status)
+                self.send_header("Content-Length", str(length))
+                self.send_header("ETag", server.etag)
+                self.send_header("Last-Modified", "Mon, 01 Jan 2026 00:00:00 GMT")
+                if server.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+
+            def do_HEAD(self):
+                server.requests.append(("HEAD", dict(self.headers)))
+                if self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self._headers(200, len(server.body))
+
+            def do_GET(self):
+                server.requests.append(("GET", dict(self.headers)))
+                rng = self.headers.get("Range")
+                if_range = self.headers.get("If-Range")
+                if server.ranges and rng and (if_range is None or if_range == server.etag):
+                    start, end = rng.split("=")[1].split("-")
+                    chunk = server.body[int(start):int(end) + 1]
+                    self._headers(206, len(chunk))
+                    self.wfile.write(chunk)
+                    return
+                self._headers(200, len(server.body))
+                self.wfile.write(server.body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/puzzles.csv.zst"
+        threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def gets(self) -> list[dict]:
+        return [headers for method, headers in self.requests if method == "GET"]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def file_server():
+    servers = []
+
+    def start(body: bytes, **kwargs) -> _FileServer:
+        server = _FileServer(body, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+class TestDownloadFile:
+    BODY = bytes(range(256)) * 4096  # 1 MiB
+
+    def test_fresh_download_writes_file_and_meta(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+
+        assert download_file(server.url, dest) is True
+        assert open(dest, "rb").read() == self.BODY
+        meta = json.load(open(dest + ".meta.json"))
+        assert meta["etag"] == '"v1"'
+        assert meta["sha256"] == hashlib.sha256(self.BODY).hexdigest()
+        assert not os.path.exists(dest + ".part")
+
+    def test_unchanged_remote_skipped_with_if_none_match(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+        download_file(server.url, dest)
+        server.requests.clear()
+
+        assert download_file(server.url, dest) is False
+        assert server.requests[0][1]["If-None-Match"] == '"v1"'
+        assert server.gets() == []
+
+    def test_changed_remote_redownloaded(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+        download_file(server.url, dest)
+        server.body, server.etag = b"new contents", '"v2"'
+
+        assert download_file(server.url, dest) is True
+        assert open(dest, "rb").read() == b"new contents"
+
+    def _write_partial(self, dest: str, data: bytes, validator: str, segments: int = 1):
+        with open(dest + ".part", "wb") as fh:
+            fh.write(data)
+        with open(dest + ".part.json", "w") as fh:
+            json.dump({"url": self.url, "validator": validator, "segments": segments}, fh)
+
+    def test_partial_file_resumed_with_range(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        self.url = server.url
+        dest = str(tmp_path / "p.zst")
+        self._write_partial(dest, self.BODY[:300_000], '"v1"')
+
+        download_file(server.url, dest)
+
+        get = server.gets()[0]
+        assert get["Range"] == f"bytes=300000-{len(self.BODY) - 1}"
+        assert get["If-Range"] == '"v1"'
+        assert open(dest, "rb").read() == self.BODY
+        assert not os.path.exists(dest + ".part.json")
+
+    def test_partial_of_older_version_discarded(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        self.url = server.url
+        dest = str(tmp_path / "p.zst")
+        self._write_partial(dest, b"x" * 1000, '"v0"')
+
+        download_file(server.url, dest)
+
+        assert server.gets()[0]["Range"] == f"bytes=0-{len(self.BODY) - 1}"
+        assert open(dest, "rb").read() == self.BODY
+
+    def test_remote_change_between_head_and_get_restarts(self, file_server, tmp_path):
+        from scripts.import_puzzles import _DownloadProgress, _fetch_range
+
+        server = file_server(self.BODY)
+        path = str(tmp_path / "p.part")
+        with open(path, "wb") as fh:
+            fh.write(b"x" * 1000)
+
+        import requests
+        _fetch_range(
+            requests, server.url, path, 0, len(self.BODY) - 1, '"stale"',
+            _DownloadProgress(len(self.BODY), 1000), allow_restart=True,
+        )
+        assert open(path, "rb").read() == self.BODY
+
+    def test_parallel_segments(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+        with patch("scripts.import_puzzles.MIN_SEGMENT_SIZE", 64 * 1024):
+            download_file(server.url, dest, connections=4)
+
+        ranges = sorted(headers["Range"] for headers in server.gets())
+        assert len(ranges) == 4
+        assert open(dest, "rb").read() == self.BODY
+        assert not list(tmp_path.glob("p.zst.part*"))
+
+    def test_server_without_ranges(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY, ranges=False)
+        dest = str(tmp_path / "p.zst")
+        download_file(server.url, dest, connections=4)
+
+        assert len(server.gets()) == 1
+        assert "Range" not in server.gets()[0]
+        assert open(dest, "rb").read() == self.BODY
+
+    def test_checksum_mismatch_rejected(self, file_server, tmp_path):
+        from scripts.import_puzzles import DownloadError, download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+        with pytest.raises(DownloadError, match="SHA-256 mismatch"):
+            download_file(server.url, dest, sha256="0" * 64)
+        assert not os.path.exists(dest)
+
+    def test_checksum_match_accepted(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file
+
+        server = file_server(self.BODY)
+        dest = str(tmp_path / "p.zst")
+        assert download_file(server.url, dest, sha256=hashlib.sha256(self.BODY).hexdigest())
+
+
+# ---------------------------------------------------------------------------
+# Streaming download-and-import tests
+# ---------------------------------------------------------------------------
+
+class TestPrefetchReader:
+    def test_reads_all_chunks_in_order(self):
+        from scripts.import_puzzles import PrefetchReader
+
+        chunks = [bytes([i]) * 1000 for i in range(50)]
+        reader = PrefetchReader(iter(chunks), max_chunks=4)
+        assert reader.read() == b"".join(chunks)
+        assert reader.completed is True
+        reader.close()
+
+    def test_tee_receives_every_chunk(self):
+        from scripts.import_puzzles import PrefetchReader
+
+        tee = io.BytesIO()
+        reader = PrefetchReader(iter([b"abc", b"", b"def"]), tee=tee)
+        assert reader.read() == b"abcdef"
+        reader.close()
+        assert tee.getvalue() == b"abcdef"
+
+    def test_source_error_raised_in_reader(self):
+        from scripts.import_puzzles import PrefetchReader
+
+        def broken():
+            yield b"partial"
+            raise ConnectionError("connection reset")
+
+        reader = PrefetchReader(broken())
+        assert reader.read(7) == b"partial"
+        with pytest.raises(ConnectionError):
+            reader.read(1)
+        assert reader.completed is False
+        reader.close()
+
+    def test_early_close_stops_background_thread(self):
+        from scripts.import_puzzles import PrefetchReader
+
+        reader = PrefetchReader((b"x" * 100 for _ in range(10_000)), max_chunks=2)
+        reader.read(10)
+        reader.close()
+        assert reader.completed is False
+        assert not reader._thread.is_alive()
+
+
+class TestStreamImport:
+    ROWS = [make_row(PuzzleId=f"id{i:04d}") for i in range(500)]
+
+    def _import(self, source, limit=None):
+        from scripts.import_puzzles import run_import
+
+        return run_import(
+            fileobj=source,
+            filename="stream.zst",
+            database_url="",
+            limit=limit,
+            batch_size=100,
+            dry_run=True,
+        )
+
+    def test_import_from_http_stream(self, file_server):
+        from scripts.import_puzzles import stream_url
+
+        server = file_server(make_zst_csv(self.ROWS))
+        with stream_url(server.url) as source:
+            stats = self._import(source)
+        assert stats.rows_valid == 500
+
+    def test_tee_kept_after_full_stream(self, file_server, tmp_path):
+        from scripts.import_puzzles import download_file, stream_url
+
+        body = make_zst_csv(self.ROWS)
+        server = file_server(body)
+        tee = str(tmp_path / "cache.zst")
+        with stream_url(server.url, tee_path=tee) as source:
+            self._import(source)
+
+        assert open(tee, "rb").read() == body
+        meta = json.load(open(tee + ".meta.json"))
+        assert meta["sha256"] == hashlib.sha256(body).hexdigest()
+        # The cached copy is recognised as current by a later download
+        assert download_file(server.url, tee) is False
+
+    def test_tee_discarded_when_stream_not_finished(self, file_server, tmp_path):
+        from scripts.import_puzzles import stream_url
+
+        rows = [make_row(PuzzleId=f"id{i:06d}") for i in range(50_000)]
+        server = file_server(make_zst_csv(rows))
+        tee = str(tmp_path / "cache.zst")
+        with patch("scripts.import_puzzles.DOWNLOAD_CHUNK", 1024):
+            with stream_url(server.url, tee_path=tee, buffer_chunks=1) as source:
+                stats = self._import(source, limit=10)
+
+        assert stats.rows_valid == 10
+        assert not os.path.exists(tee)
+        assert not os.path.exists(tee + ".part")
+
+    def test_stream_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        args = parser.parse_args(["--url", "https://example.com/f.zst", "--stream"])
+        assert args.stream is True
+        assert parser.parse_args(["--url", "https://example.com/f.zst"]).stream is False
+
+
+# ---------------------------------------------------------------------------
+# Bulk mode tests
+# ---------------------------------------------------------------------------
+
+class _CatalogCursor:
+    """Minimal cursor that answers the catalog/bookkeeping queries of --bulk."""
+
+    def __init__(self, existing_rows: int, indexes: list[tuple[str, str]],
+                 deferred: Optional[list[tuple[str, str]]] = None):
+        self.existing_rows = existing_rows
+        self.indexes = indexes
+        self.deferred = list(deferred or [])
+        self.statements: list[str] = []
+        self.rowcount = 0
+        self._result: list = []
+
+    def execute(self, sql, params=None):
+        from scripts import import_puzzles as ip
+
+        self.statements.append(sql)
+        self._result = []
+        if sql == ip.NEAR_EMPTY_SQL:
+            self._result = [(min(self.existing_rows, params[0]),)]
+        elif sql == ip.SECONDARY_INDEXES_SQL:
+            self._result = list(self.indexes)
+        elif sql == ip.LOAD_DEFERRED_INDEXES_SQL:
+            self._result = list(self.deferred)
+        elif sql == ip.SAVE_DEFERRED_INDEX_SQL:
+            self.deferred.append(params)
+        elif sql == ip.CLEAR_DEFERRED_INDEXES_SQL:
+            self.deferred.clear()
+        elif sql == ip.LOAD_CHECKPOINT_SQL:
+            self._result = []
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+    def close(self):
+        pass
+
+
+class TestBulkMode:
+    RATING_INDEX = (
+        "idx_puzzles_rating",
+        "CREATE INDEX idx_puzzles_rating ON public.puzzles USING btree (rating)",
+    )
+
+    def _run(self, cursor: _CatalogCursor, bulk: bool = True, fail: bool = False):
+        from scripts.import_puzzles import run_import
+
+        conn = MagicMock()
+        conn.cursor.return_value = cursor
+        rows = [make_row(PuzzleId=f"id{i:04d}") for i in range(5)]
+        side_effect = RuntimeError("db down") if fail else None
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn), \
+                patch("scripts.import_puzzles.psycopg2.extras.execute_values",
+                      side_effect=side_effect):
+            return run_import(
+                fileobj=io.BytesIO(make_zst_csv(rows)),
+                filename="t.zst",
+                database_url="postgresql://test",
+                limit=None,
+                batch_size=2,
+                dry_run=False,
+                bulk=bulk,
+                maintenance_work_mem="2GB",
+            )
+
+    def test_empty_table_drops_then_rebuilds_indexes(self):
+        cursor = _CatalogCursor(existing_rows=0, indexes=[self.RATING_INDEX])
+        self._run(cursor)
+
+        stmts = cursor.statements
+        drop = stmts.index('DROP INDEX IF EXISTS "idx_puzzles_rating"')
+        create = stmts.index(self.RATING_INDEX[1])
+        analyze = stmts.index("ANALYZE puzzles")
+        assert drop < create < analyze
+        assert "SET LOCAL maintenance_work_mem = %s" in stmts[drop:create]
+        assert cursor.deferred == []
+
+    def test_populated_table_keeps_indexes_but_analyzes(self):
+        cursor = _CatalogCursor(existing_rows=3_500_000, indexes=[self.RATING_INDEX])
+        self._run(cursor)
+
+        assert not any(stmt.startswith("DROP INDEX") for stmt in cursor.statements)
+        assert cursor.statements[-1] == "ANALYZE puzzles"
+
+    def test_failed_bulk_run_leaves_index_recorded(self):
+        cursor = _CatalogCursor(existing_rows=0, indexes=[self.RATING_INDEX])
+        with pytest.raises(RuntimeError):
+            self._run(cursor, fail=True)
+
+        assert cursor.deferred == [self.RATING_INDEX]
+        assert self.RATING_INDEX[1] not in cursor.statements
+
+    def test_non_bulk_run_restores_deferred_indexes_first(self):
+        from scripts.import_puzzles import INSERT_SQL
+
+        cursor = _CatalogCursor(existing_rows=100, indexes=[], deferred=[self.RATING_INDEX])
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values") as ev:
+            ev.side_effect = lambda cur, sql, *a, **kw: cur.statements.append(sql)
+            conn = MagicMock()
+            conn.cursor.return_value = cursor
+            from scripts.import_puzzles import run_import
+            with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn):
+                run_import(
+                    fileobj=io.BytesIO(make_zst_csv([VALID_ROW])),
+                    filename="t.zst",
+                    database_url="postgresql://test",
+                    limit=None,
+                    batch_size=2,
+                    dry_run=False,
+                )
+
+        assert cursor.statements.index(self.RATING_INDEX[1]) < cursor.statements.index(INSERT_SQL)
+        assert "ANALYZE puzzles" not in cursor.statements
+        assert cursor.deferred == []
+
+    def test_bulk_flags_parsed(self):
+        from scripts.import_puzzles import BULK_MAINTENANCE_WORK_MEM, build_arg_parser
+        parser = build_arg_parser()
+        args = parser.parse_args(["--file", "/tmp/t.zst"])
+        assert args.bulk is False
+        assert args.maintenance_work_mem == BULK_MAINTENANCE_WORK_MEM
+        args = parser.parse_args(
+            ["--file", "/tmp/t.zst", "--bulk", "--maintenance-work-mem", "4GB"]
+        )
+        assert args.bulk is True and args.maintenance_work_mem == "4GB"
+
+
+# ---------------------------------------------------------------------------
+# Metrics tests
+# ---------------------------------------------------------------------------
+
+class TestLatencyHistogram:
+    def test_buckets_and_quantiles(self):
+        from scripts.import_puzzles import LatencyHistogram
+
+        hist = LatencyHistogram(bounds_ms=(10, 100, 1000))
+        for seconds in (0.004, 0.006, 0.008, 0.05, 2.5):
+            hist.observe(seconds)
+
+        snap = hist.snapshot()
+        assert snap["count"] == 5
+        assert snap["buckets"] == {"le_10ms": 3, "le_100ms": 1, "le_1000ms": 0, "gt_1000ms": 1}
+        assert snap["p50_ms"] == 10.0
+        assert snap["p95_ms"] == snap["max_ms"] == 2500.0
+
+    def test_empty(self):
+        from scripts.import_puzzles import LatencyHistogram
+
+        snap = LatencyHistogram().snapshot()
+        assert snap["count"] == 0 and snap["p99_ms"] == 0.0
+
+
+class TestMetricsHelpers:
+    def test_metered_reader_counts_bytes(self):
+        from scripts.import_puzzles import MeteredReader
+
+        reader = MeteredReader(io.BytesIO(b"x" * 1000))
+        assert len(reader.read(300)) == 300
+        buf = bytearray(1000)
+        assert reader.readinto(buf) == 700
+        assert reader.read() == b""
+        assert reader.bytes_read == 1000
+
+    def test_source_size(self, tmp_path):
+        from scripts.import_puzzles import source_size
+
+        path = tmp_path / "f.zst"
+        path.write_bytes(b"a" * 42)
+        with open(path, "rb") as fh:
+            assert source_size(fh) == 42
+
+        stream = io.BytesIO(b"b" * 10)
+        stream.read(3)
+        assert source_size(stream) == 10
+        assert stream.tell() == 3
+
+        unsized = MagicMock(spec=["read"])
+        assert source_size(unsized) is None
+
+    def test_progress_line_eta_from_compressed_bytes(self):
+        from scripts.import_puzzles import ImportMetrics
+
+        metrics = ImportMetrics(total_bytes=1000, compressed_bytes=250)
+        line = metrics.progress_line(rows_read=50_000, elapsed=10.0)
+        assert "5,000 rows/s" in line
+        assert "25.0% of input" in line
+        assert "ETA 30s" in line
+
+    def test_progress_line_without_total(self):
+        from scripts.import_puzzles import ImportMetrics
+
+        line = ImportMetrics().progress_line(rows_read=10, elapsed=1.0)
+        assert "ETA" not in line and "10 rows/s" in line
+
+
+class TestRunImportMetrics:
+    def _run(self, tmp_path, conn=None, dry_run=False, **kwargs):
+        from scripts.import_puzzles import run_import
+
+        data = make_zst_csv([make_row(PuzzleId=f"m{i:04d}") for i in range(10)])
+        metrics_file = str(tmp_path / "metrics.json")
+        conn = conn or make_mock_connection(rowcount=3)
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn):
+            run_import(
+                fileobj=io.BytesIO(data),
+                filename="t.zst",
+                database_url="postgresql://test",
+                limit=None,
+                batch_size=3,
+                dry_run=dry_run,
+                metrics_file=metrics_file,
+                **kwargs,
+            )
+        with open(metrics_file) as fh:
+            return json.load(fh), len(data)
+
+    def test_metrics_file_written(self, tmp_path):
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values"):
+            metrics, size = self._run(tmp_path)
+
+        assert metrics["status"] == "completed"
+        assert metrics["compressed_bytes"] == metrics["total_bytes"] == size
+        assert metrics["decompressed_bytes"] > 0
+        assert metrics["rows_read"] == 10
+        assert metrics["stats"]["rows_valid"] == 10
+        assert metrics["batch_latency"]["count"] == 4  # 3 + 3 + 3 + 1
+        assert set(metrics["stages"]) == {
+            "read", "decompress", "parse", "write", "commit", "finalise",
+        }
+        assert all(seconds >= 0 for seconds in metrics["stages"].values())
+
+    def test_dry_run_records_no_batches(self, tmp_path):
+        metrics, _ = self._run(tmp_path, dry_run=True)
+        assert metrics["status"] == "completed"
+        assert metrics["batch_latency"]["count"] == 0
+        assert metrics["stages"]["write"] == 0
+
+    def test_interrupted_run_still_writes_metrics(self, tmp_path):
+        with patch("scripts.import_puzzles.psycopg2.extras.execute_values",
+                   side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                self._run(tmp_path)
+
+        with open(tmp_path / "metrics.json") as fh:
+            assert json.load(fh)["status"] == "interrupted"
+
+    def test_progress_reports_rate_and_eta(self, tmp_path, capsys):
+        with patch("scripts.import_puzzles.PROGRESS_INTERVAL", 4):
+            self._run(tmp_path, dry_run=True)
+
+        out = capsys.readouterr().out
+        assert "Processed 4 rows" in out
+        assert "rows/s" in out and "ETA" in out
+
+    def test_json_logs_emit_parseable_events(self, tmp_path, capsys):
+        from scripts.import_puzzles import configure_logging
+
+        configure_logging("json")
+        try:
+            with patch("scripts.import_puzzles.PROGRESS_INTERVAL", 4):
+                self._run(tmp_path, dry_run=True)
+        finally:
+            configure_logging("console")
+
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        progress = [e for e in events if e["event"] == "Import progress"]
+        assert progress[0]["rows_read"] == 4 and "eta_seconds" in progress[0]
+        timings = next(e for e in events if e["event"] == "Import stage timings")
+        assert timings["level"] == "info" and "timestamp" in timings
+
+    def test_auto_log_format_follows_tty(self):
+        from scripts import import_puzzles
+
+        try:
+            with patch("scripts.import_puzzles.sys.stdout") as stdout:
+                stdout.isatty.return_value = False
+                import_puzzles.configure_logging("auto")
+                assert import_puzzles._json_logs is True
+                stdout.isatty.return_value = True
+                import_puzzles.configure_logging("auto")
+                assert import_puzzles._json_logs is False
+        finally:
+            import_puzzles.configure_logging("console")
+
+    def test_log_format_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "x"]).log_format == "auto"
+        assert parser.parse_args(["--file", "x", "--log-format", "json"]).log_format == "json"
+        with pytest.raises(SystemExit):
+            parser.parse_args(["--file", "x", "--log-format", "xml"])
+
+    def test_metrics_flag_parsed(self):
+        from scripts.import_puzzles import build_arg_parser
+        parser = build_arg_parser()
+        assert parser.parse_args(["--file", "x"]).metrics_file is None
+        args = parser.parse_args(["--file", "x", "--metrics-file", "/tmp/m.json"])
+        assert args.metrics_file == "/tmp/m.json"
+
+
+# ---------------------------------------------------------------------------
+# Rating counts refresh
+# ---------------------------------------------------------------------------
+
+class TestRatingCountsRefresh:
+    def _executed(self, dry_run):
+        from scripts.import_puzzles import run_import
+
+        conn = make_mock_connection(rowcount=1)
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn), \
+                patch("scripts.import_puzzles.psycopg2.extras.execute_values"):
+            run_import(
+                fileobj=io.BytesIO(make_zst_csv([VALID_ROW])),
+                filename="t.zst",
+                database_url="postgresql://test",
+                limit=None,
+                batch_size=10,
+                dry_run=dry_run,
+            )
+        return [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+
+    def test_completed_import_refreshes_counts(self):
+        from scripts.import_puzzles import CLEAR_CHECKPOINT_SQL, REFRESH_RATING_COUNTS_SQL
+
+        executed = self._executed(dry_run=False)
+        # Refreshed in the transaction that marks the import complete
+        assert executed.index(REFRESH_RATING_COUNTS_SQL) < len(executed) - 1
+        assert executed[executed.index(REFRESH_RATING_COUNTS_SQL) + 1] == CLEAR_CHECKPOINT_SQL
+
+    def test_dry_run_leaves_counts_alone(self):
+        assert self._executed(dry_run=True) == []
+
+
+# ---------------------------------------------------------------------------
+# Theme index
+# ---------------------------------------------------------------------------
+
+class TestThemeIndex:
+    def _calls(self):
+        from scripts.import_puzzles import run_import
+
+        conn = make_mock_connection(rowcount=1)
+        with patch("scripts.import_puzzles.psycopg2.connect", return_value=conn), \
+                patch("scripts.import_puzzles.psycopg2.extras.execute_values"):
+            run_import(
+                fileobj=io.BytesIO(make_zst_csv([VALID_ROW])),
+                filename="t.zst",
+                database_url="postgresql://test",
+                limit=None,
+                batch_size=10,
+                dry_run=False,
+            )
+        return conn.cursor.return_value.execute.call_args_list
+
+    def test_inserted_batch_is_split_into_themes(self):
+        from scripts.import_puzzles import INSERT_THEMES_SQL
+
+        themed = [c for c in self._calls() if c.args[0] == INSERT_THEMES_SQL]
+        assert [c.args[1] for c in themed] == [([VALID_ROW["PuzzleId"]],)]
+
+    def test_inserted_batch_is_split_into_openings(self):
+        from scripts.import_puzzles import INSERT_OPENINGS_SQL
+
+        tagged = [c for c in self._calls() if c.args[0] == INSERT_OPENINGS_SQL]
+        assert [c.args[1] for c in tagged] == [([VALID_ROW["PuzzleId"]],)]
+        assert "unnest(string_to_array(p.opening_tags, ' '))" in INSERT_OPENINGS_SQL
+
+    def test_completed_import_refreshes_theme_counts(self):
+        from scripts.import_puzzles import REFRESH_RATING_COUNTS_SQL, REFRESH_THEME_COUNTS_SQL
+
+        executed = [c.args[0] for c in self._calls()]
+        # Same transaction as the rating counts and the checkpoint clear
+        refresh = executed.index(REFRESH_THEME_COUNTS_SQL)
+        assert executed[refresh + 1] == REFRESH_RATING_COUNTS_SQL
@@ -0,0 +1,203 @@
+"""
+Tests for app/services/progress_service.py.
+
+Queries run against an AsyncMock session, so these run without Postgres.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import progress_service
+from app.services.progress_service import (
+    InvalidCursor,
+    StatsDelta,
+    Submission,
+    decode_cursor,
+    encode_cursor,
+    get_progress_page,
+    record_submissions,
+)
+
+_USER = uuid.UUID(int=1)
+_NOW = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def _entries(n):
+    return [
+        {"id": uuid.UUID(int=100 + i), "puzzle_id": f"p{i:04d}", "result": "solved",
+         "time_spent_ms": 1000, "solved_at": _NOW - timedelta(minutes=i)}
+        for i in range(n)
+    ]
+
+
+def _db(rows):
+    result = MagicMock()
+    result.mappings.return_value.all.return_value = rows
+    db = AsyncMock()
+    db.execute.return_value = result
+    return db
+
+
+def test_cursor_round_trip():
+    entry_id = uuid.uuid4()
+    cursor = encode_cursor(_NOW, entry_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (_NOW, entry_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not-a-cursor", encode_cursor(_NOW, uuid.UUID(int=1))[:-4],
+     "eyJ0IjoiMjAyNi0xMC0xNlQxMjowMDowMCIsImkiOiJ4In0"],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_first_page_reads_one_extra_row_for_next_cursor():
+    rows = _entries(4)
+    db = _db(rows)
+
+    page, next_cursor = await get_progress_page(db, _USER, limit=3)
+
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor) == (rows[2]["solved_at"], rows[2]["id"])
+    sql, params = db.execute.await_args.args
+    assert sql is progress_service.PAGE_SQL[False, False]
+    assert params == {"user_id": _USER, "limit": 4}
+
+
+@pytest.mark.asyncio
+async def test_later_page_seeks_from_cursor():
+    db = _db(_entries(2))
+    cursor = encode_cursor(_NOW, uuid.UUID(int=7))
+
+    page, next_cursor = await get_progress_page(db, _USER, limit=3, cursor=cursor,
+                                                include_puzzle=True)
+
+    assert len(page) == 2 and next_cursor is None
+    sql, params = db.execute.await_args.args
+    assert sql is progress_service.PAGE_SQL[True, True]
+    assert (params["solved_at"], params["id"]) == (_NOW, uuid.UUID(int=7))
+
+
+def test_page_sql_is_keyset_not_offset():
+    sql = str(progress_service.PAGE_SQL[True, True])
+    assert "OFFSET" not in sql
+    assert "up.solved_at <= :solved_at" in sql
+    assert "ORDER BY up.solved_at DESC, up.id DESC" in sql
+    assert "JOIN puzzles p" in sql
+    assert "JOIN" not in str(progress_service.PAGE_SQL[False, True])
+
+
+def test_insert_submissions_sql_skips_unknown_users_and_puzzles():
+    sql = str(progress_service.INSERT_SUBMISSIONS_SQL)
+    assert "JOIN puzzles p ON p.id = b.puzzle_id" in sql
+    assert "JOIN users u ON u.id = b.user_id" in sql
+
+
+# ---------------------------------------------------------------------------
+# Submissions and user_stats
+# ---------------------------------------------------------------------------
+
+
+def _submission(result, minute, user=_USER, puzzle_id=None, time_spent_ms=None):
+    return Submission(
+        user_id=user,
+        puzzle_id=puzzle_id or f"p{minute:04d}",
+        result=result,
+        time_spent_ms=time_spent_ms,
+        solved_at=_NOW + timedelta(minutes=minute),
+    )
+
+
+def _merge(stats, delta):
+    """Python mirror of UPSERT_USER_STATS_SQL's streak columns."""
+    if stats is None:
+        return {"current": delta.tail_streak, "best": delta.best_run}
+    return {
+        "current": delta.tail_streak if delta.failed else stats["current"] + delta.tail_streak,
+        "best": max(stats["best"], stats["current"] + delta.head_streak, delta.best_run),
+    }
+
+
+def _streaks(results):
+    current = best = 0
+    for result in results:
+        current = current + 1 if result == "solved" else 0
+        best = max(best, current)
+    return {"current": current, "best": best}
+
+
+def test_stats_delta_counts_times_and_themes():
+    delta = StatsDelta()
+    delta.add(_submission("solved", 0, time_spent_ms=4000), "fork short")
+    delta.add(_submission("failed", 1), "fork")
+    delta.add(_submission("solved", 2, time_spent_ms=2000), None)
+
+    assert (delta.solved, delta.failed) == (2, 1)
+    assert (delta.head_streak, delta.tail_streak, delta.best_run) == (1, 1, 1)
+    assert (delta.total_time_ms, delta.timed) == (6000, 2)
+    assert delta.themes == {"fork": [1, 1], "short": [1, 0]}
+    assert delta.last_solved_at == _NOW + timedelta(minutes=2)
+
+
+@pytest.mark.parametrize("split", [1, 3, 4, 7])
+def test_incremental_streaks_match_full_history(split):
+    history = ["solved", "solved", "failed", "solved", "solved", "solved", "failed",
+               "solved", "solved"]
+    stats = None
+    for start in range(0, len(history), split):
+        delta = StatsDelta()
+        for offset, result in enumerate(history[start:start + split]):
+            delta.add(_submission(result, start + offset), None)
+        stats = _merge(stats, delta)
+
+    assert stats == _streaks(history)
+
+
+def _insert_result(ids):
+    result = MagicMock()
+    result.all.return_value = [(row_id, "fork") for row_id in ids]
+    return result
+
+
+@pytest.mark.asyncio
+async def test_record_submissions_is_two_statements_per_batch():
+    other = uuid.UUID(int=2)
+    batch = [
+        _submission("solved", 1),
+        _submission("failed", 0),
+        _submission("solved", 2, user=other),
+        _submission("solved", 3, puzzle_id="dup"),  # already has a result
+    ]
+    db = AsyncMock()
+    db.execute.side_effect = [_insert_result([s.id for s in batch[:3]]), MagicMock()]
+
+    assert await record_submissions(db, batch) == 3
+
+    assert db.execute.await_count == 2
+    insert, upsert = db.execute.await_args_list
+    assert insert.args[0] is progress_service.INSERT_SUBMISSIONS_SQL
+    assert insert.args[1]["puzzle_ids"] == ["p0001", "p0000", "p0002", "dup"]
+    assert upsert.args[0] is progress_service.UPSERT_USER_STATS_SQL
+    by_user = {params["user_id"]: params for params in upsert.args[1]}
+    # failed at minute 0, then solved at minute 1: solve order, not batch order
+    assert by_user[_USER]["tail_streak"] == 1 and by_user[_USER]["head_streak"] == 0
+    assert by_user[_USER]["themes"] == '{"fork": [1, 1]}'
+    assert by_user[other]["solved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_record_submissions_skips_stats_when_nothing_inserted():
+    db = AsyncMock()
+    db.execute.return_value = _insert_result([])
+
+    assert await record_submissions(db, [_submission("solved", 0)]) == 0
+    assert db.execute.await_count == 1
+    assert await record_submissions(db, []) == 0
+    assert db.execute.await_count == 1
@@ -0,0 +1,786 @@
+"""
+Tests for app/services/puzzle_service.py.
+
+The database is replaced by fake sessions, AsyncMock results and a patched
+sample_puzzles, so these run without Postgres.
+"""
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.schemas.puzzle import PuzzleResponse
+from app.services import puzzle_service
+from app.services.puzzle_service import (
+    PuzzlePool,
+    RatingCounts,
+    SeenFilter,
+    get_random_puzzle,
+    get_random_puzzle_in_band,
+    get_random_puzzle_in_opening,
+    get_random_puzzle_with_themes,
+    get_random_puzzles,
+    get_random_unseen_puzzle,
+    get_random_unseen_puzzles,
+    get_seen_filter,
+    mark_puzzle_seen,
+    sample_puzzles,
+)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+class _FakeConnection:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def _rows(n, start=0):
+    return [
+        {"id": f"p{i:05d}", "fen": "8/8/8/8/8/8/8/8 w - - 0 1", "moves": "e2e4", "rating": 1500,
+         "themes": None}
+        for i in range(start, start + n)
+    ]
+
+
+def _sampler():
+    """sample_puzzles stand-in that hands out distinct rows on every call."""
+    served = 0
+
+    async def sample(db, n):
+        nonlocal served
+        rows = _rows(n, served)
+        served += n
+        return rows
+
+    return AsyncMock(side_effect=sample)
+
+
+def _pool(**overrides):
+    options = {"size": 10, "refill_batch": 4, "low_water": 3, "max_age": 60.0}
+    options.update(overrides)
+    return PuzzlePool(_FakeConnection, **options)
+
+
+# ---------------------------------------------------------------------------
+# Pool behaviour
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_refill_fills_pool_in_batches():
+    pool = _pool()
+    sampler = _sampler()
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        await pool.schedule_refill()
+
+    assert len(pool) == 10
+    assert [call.args[1] for call in sampler.await_args_list] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_take_serves_each_puzzle_once_and_refills_below_low_water():
+    pool = _pool()
+    sampler = _sampler()
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        await pool.schedule_refill()
+        served = [pool.take()["id"] for _ in range(8)]
+        assert len(set(served)) == 8
+        assert len(pool) == 2  # below low water: refill scheduled, not awaited
+
+        await pool.schedule_refill()
+    assert len(pool) == 10
+
+
+@pytest.mark.asyncio
+async def test_empty_pool_returns_none_and_starts_refill():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        assert pool.take() is None
+        await pool.schedule_refill()
+    assert pool.take() is not None
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_not_served():
+    pool = _pool(max_age=5.0)
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+        with patch("app.services.puzzle_service.time.monotonic", return_value=10**9):
+            assert pool.take() is None
+        await pool.schedule_refill()
+
+
+@pytest.mark.asyncio
+async def test_refill_stops_on_empty_table():
+    pool = _pool()
+    sampler = AsyncMock(return_value=[])
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        await pool.schedule_refill()
+    assert len(pool) == 0
+    assert sampler.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_refill_failure_is_swallowed():
+    pool = _pool()
+    sampler = AsyncMock(side_effect=RuntimeError("db down"))
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        await pool.schedule_refill()
+    assert len(pool) == 0
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_refill():
+    pool = _pool()
+    gate = asyncio.Event()
+
+    async def slow_sample(db, n):
+        await gate.wait()
+        return _rows(n)
+
+    with patch("app.services.puzzle_service.sample_puzzles", slow_sample):
+        task = pool.schedule_refill()
+        await asyncio.sleep(0)
+        await pool.close()
+    assert task.cancelled()
+
+
+# ---------------------------------------------------------------------------
+# Service integration
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_get_random_puzzle_uses_pool_without_db():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+
+    db = AsyncMock()
+    with patch.object(puzzle_service, "_pool", pool):
+        row = await get_random_puzzle(db)
+
+    assert row["id"].startswith("p")
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_sample_puzzles_sizes_sample_from_estimate():
+    estimate = MagicMock()
+    estimate.scalar_one.return_value = 3_500_000
+    sample = MagicMock()
+    sample.mappings.return_value = _rows(30)
+    db = AsyncMock()
+    db.execute.side_effect = [estimate, sample]
+
+    rows = await sample_puzzles(db, 20)
+
+    assert len(rows) == 20
+    params = db.execute.await_args_list[1].args[1]
+    assert params["percent"] == pytest.approx(20 * 2 / 3_500_000 * 100)
+
+
+@pytest.mark.asyncio
+async def test_sample_puzzles_empty_table():
+    estimate = MagicMock()
+    estimate.scalar_one.return_value = 0
+    db = AsyncMock()
+    db.execute.return_value = estimate
+
+    assert await sample_puzzles(db, 20) == []
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_start_puzzle_pool_respects_disabled_setting():
+    settings = MagicMock(puzzle_pool_enabled=False, puzzle_pool_size=100)
+    assert await puzzle_service.start_puzzle_pool(settings) is None
+    assert puzzle_service.get_puzzle_pool() is None
+
+
+@pytest.mark.asyncio
+async def test_start_puzzle_pool_refills_through_read_connection():
+    settings = MagicMock(
+        puzzle_pool_enabled=True,
+        puzzle_pool_size=4,
+        puzzle_pool_refill_batch=4,
+        puzzle_pool_low_water=1,
+        puzzle_pool_max_age_seconds=60.0,
+    )
+    connect = MagicMock(return_value=_FakeConnection())
+    with (
+        patch("app.db.session.read_connection", connect),
+        patch("app.services.puzzle_service.sample_puzzles", _sampler()) as sample,
+    ):
+        pool = await puzzle_service.start_puzzle_pool(settings)
+        try:
+            await pool.schedule_refill()
+        finally:
+            await puzzle_service.stop_puzzle_pool()
+
+    connect.assert_called_once_with()
+    assert isinstance(sample.await_args.args[0], _FakeConnection)
+
+
+# ---------------------------------------------------------------------------
+# Rating bands
+# ---------------------------------------------------------------------------
+
+
+def _result(rows=None, scalar=None):
+    result = MagicMock()
+    result.mappings.return_value.first.return_value = rows[0] if rows else None
+    result.all.return_value = rows or []
+    result.scalar_one.return_value = scalar
+    return result
+
+
+@pytest.fixture(autouse=True)
+def _reset_rating_counts():
+    puzzle_service._rating_counts = None
+    puzzle_service._theme_counts = None
+    yield
+    puzzle_service._rating_counts = None
+    puzzle_service._theme_counts = None
+
+
+def test_rating_counts_band_total():
+    counts = RatingCounts([(1500, 10), (1400, 5), (1600, 0), (1800, 20)])
+    assert counts.band_total(1400, 1500) == 15
+    assert counts.band_total(1450, 1700) == 10
+    assert counts.band_total(1501, 1799) == 0
+    assert counts.band_total(0, 4000) == 35
+
+
+def test_rating_counts_pick_is_weighted_and_in_band():
+    counts = RatingCounts([(1000, 1), (1200, 99), (2000, 1000)])
+    picks = [counts.pick(900, 1500) for _ in range(2000)]
+    assert set(picks) <= {1000, 1200}
+    assert picks.count(1200) > picks.count(1000) * 10
+    assert counts.pick(1300, 1900) is None
+
+
+@pytest.mark.asyncio
+async def test_band_pick_is_single_index_seek():
+    puzzle = _rows(1)[0]
+    db = AsyncMock()
+    db.execute.side_effect = [
+        _result([(1500, 3), (1510, 4)]),  # puzzle_rating_counts
+        _result([puzzle]),
+    ]
+
+    row = await get_random_puzzle_in_band(db, 1490, 1520)
+
+    assert row == puzzle
+    seek = db.execute.await_args_list[1]
+    assert seek.args[0] is puzzle_service.RATING_SEEK_SQL
+    assert seek.args[1]["rating"] in (1500, 1510)
+    assert 0.0 <= seek.args[1]["key"] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_rating_counts_are_cached():
+    db = AsyncMock()
+    db.execute.side_effect = [_result([(1500, 3)]), _result(_rows(1)), _result(_rows(1))]
+
+    await get_random_puzzle_in_band(db, 1400, 1600)
+    await get_random_puzzle_in_band(db, 1400, 1600)
+
+    assert db.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_counts_fall_back_to_band_scan():
+    puzzle = _rows(1)[0]
+    db = AsyncMock()
+    db.execute.side_effect = [
+        _result([(1500, 3)]),
+        *[_result() for _ in range(puzzle_service.RATING_PICK_ATTEMPTS)],
+        _result(),  # band scan from the random key finds nothing…
+        _result([puzzle]),  # …so it wraps around from 0
+    ]
+
+    row = await get_random_puzzle_in_band(db, 1400, 1600)
+
+    assert row == puzzle
+    assert db.execute.await_args_list[-1].args[0] is puzzle_service.BAND_SCAN_SQL
+    assert db.execute.await_args_list[-1].args[1]["key"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_empty_band_returns_none():
+    db = AsyncMock()
+    db.execute.side_effect = [_result([(1500, 3)]), _result(), _result()]
+    assert await get_random_puzzle_in_band(db, 2000, 2100) is None
+
+
+@pytest.mark.asyncio
+async def test_get_random_puzzle_band_bypasses_pool():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+
+    band = AsyncMock(return_value={"id": "band"})
+    with patch.object(puzzle_service, "_pool", pool), \
+            patch("app.services.puzzle_service.get_random_puzzle_in_band", band):
+        row = await get_random_puzzle(AsyncMock(), min_rating=1800)
+
+    assert row == {"id": "band"}
+    band.assert_awaited_once()
+    assert band.await_args.args[1:] == (1800, puzzle_service.MAX_RATING)
+    assert len(pool) == 10
+
+
+# ---------------------------------------------------------------------------
+# Themes
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_theme_seek_drives_on_rarest_theme():
+    puzzle = _rows(1)[0]
+    db = AsyncMock()
+    db.execute.side_effect = [
+        _result([("fork", 900_000), ("pin", 400_000), ("mateIn2", 12_000)]),
+        _result([puzzle]),
+    ]
+
+    row = await get_random_puzzle_with_themes(db, ["fork", "mateIn2", "pin"], 0, 4000)
+
+    assert row == puzzle
+    seek = db.execute.await_args_list[1]
+    assert seek.args[0] is puzzle_service.THEME_SEEK_SQL
+    assert seek.args[1]["theme"] == "mateIn2"
+    assert seek.args[1]["themes"] == ["fork", "pin"]
+    assert 0.0 <= seek.args[1]["key"] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_unknown_theme_is_seeked_and_cached():
+    db = AsyncMock()
+    db.execute.side_effect = [_result([("fork", 10)]), _result(), _result()]
+
+    assert await get_random_puzzle_with_themes(db, ["fork", "nope"], 0, 4000) is None
+    assert db.execute.await_args_list[1].args[1]["theme"] == "nope"
+    await get_random_puzzle_with_themes(db, ["fork"], 0, 4000)
+    assert db.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_get_random_puzzle_themes_bypass_pool_and_keep_band():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+
+    themed = AsyncMock(return_value={"id": "themed"})
+    with patch.object(puzzle_service, "_pool", pool), \
+            patch("app.services.puzzle_service.get_random_puzzle_with_themes", themed):
+        row = await get_random_puzzle(AsyncMock(), max_rating=1200, themes=["fork"])
+
+    assert row == {"id": "themed"}
+    assert themed.await_args.args[1:] == (["fork"], puzzle_service.MIN_RATING, 1200)
+    assert len(pool) == 10
+
+
+# ---------------------------------------------------------------------------
+# Openings
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_opening_is_single_index_seek():
+    puzzle = _rows(1)[0]
+    db = AsyncMock()
+    db.execute.return_value = _result([puzzle])
+
+    row = await get_random_puzzle_in_opening(db, "Sicilian_Defense", ["fork"], 1000, 2000)
+
+    assert row == puzzle
+    seek = db.execute.await_args
+    assert seek.args[0] is puzzle_service.OPENING_SEEK_SQL
+    assert seek.args[1]["opening"] == "Sicilian_Defense"
+    assert seek.args[1]["themes"] == ["fork"]
+    assert (seek.args[1]["min_rating"], seek.args[1]["max_rating"]) == (1000, 2000)
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_random_puzzle_opening_takes_precedence_over_themes():
+    opening = AsyncMock(return_value={"id": "opening"})
+    themed = AsyncMock()
+    with patch("app.services.puzzle_service.get_random_puzzle_in_opening", opening), \
+            patch("app.services.puzzle_service.get_random_puzzle_with_themes", themed):
+        row = await get_random_puzzle(AsyncMock(), themes=["pin"], opening="French_Defense")
+
+    assert row == {"id": "opening"}
+    assert opening.await_args.args[1:] == (
+        "French_Defense", ["pin"], puzzle_service.MIN_RATING, puzzle_service.MAX_RATING
+    )
+    themed.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# Unfiltered fallback
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_empty_tablesample_falls_back_to_key_seek():
+    puzzle = _rows(1)[0]
+    db = AsyncMock()
+    db.execute.side_effect = [_result(), _result([puzzle])]
+
+    row = await get_random_puzzle(db)
+
+    assert row == puzzle
+    assert db.execute.await_count == 2
+    seek = db.execute.await_args
+    assert seek.args[0] is puzzle_service.RANDOM_SEEK_SQL
+    assert 0.0 <= seek.args[1]["key"] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_empty_table_returns_none_without_count():
+    db = AsyncMock()
+    db.execute.side_effect = [_result(), _result()]
+
+    assert await get_random_puzzle(db) is None
+    assert db.execute.await_count == 2
+
+
+# ---------------------------------------------------------------------------
+# asyncpg fast path
+# ---------------------------------------------------------------------------
+
+
+def _raw_pool(*records):
+    """asyncpg pool stand-in whose connection returns *records* from fetchrow."""
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(side_effect=list(records))
+    acquired = MagicMock()
+    acquired.__aenter__ = AsyncMock(return_value=conn)
+    acquired.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.acquire.return_value = acquired
+    return pool, conn
+
+
+_RESPONSE = {
+    "id": "00sHx", "fen": "8/8/8/8/8/8/8/8 w - - 0 1", "moves": ["e2e4", "e7e5"],
+    "rating": 1500, "themes": ["fork"],
+}
+
+
+@pytest.mark.asyncio
+async def test_raw_fetch_returns_response_shape_from_tablesample():
+    pool, conn = _raw_pool(_RESPONSE)
+
+    assert await puzzle_service.fetch_random_puzzle_raw(pool) == _RESPONSE
+    conn.fetchrow.assert_awaited_once_with(puzzle_service.RAW_TABLESAMPLE_SQL)
+
+
+@pytest.mark.asyncio
+async def test_raw_fetch_falls_back_to_key_seek():
+    pool, conn = _raw_pool(None, _RESPONSE)
+
+    assert await puzzle_service.fetch_random_puzzle_raw(pool) == _RESPONSE
+    seek = conn.fetchrow.await_args
+    assert seek.args[0] == puzzle_service.RAW_SEEK_SQL
+    assert 0.0 <= seek.args[1] < 1.0
+
+
+@pytest.mark.asyncio
+async def test_raw_fetch_empty_table():
+    pool, _ = _raw_pool(None, None)
+
+    assert await puzzle_service.fetch_random_puzzle_raw(pool) is None
+
+
+def test_raw_queries_split_like_puzzle_response():
+    """Postgres does the split: moves always, themes NULL when empty."""
+    for sql in (puzzle_service.RAW_TABLESAMPLE_SQL, puzzle_service.RAW_SEEK_SQL):
+        assert "string_to_array(moves, ' ') AS moves" in sql
+        assert "string_to_array(NULLIF(themes, ''), ' ') AS themes" in sql
+    assert puzzle_service.puzzle_response({**_rows(1)[0], "themes": ""})["themes"] is None
+
+
+@pytest.mark.asyncio
+async def test_fast_path_prefers_in_memory_pool():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+    raw_pool, conn = _raw_pool(_RESPONSE)
+    with patch.object(puzzle_service, "_pool", pool), \
+            patch.object(puzzle_service, "get_asyncpg_pool", return_value=raw_pool):
+        body = await puzzle_service.get_random_puzzle_fast()
+
+    assert json.loads(body) == puzzle_service.puzzle_response(_rows(1)[0])
+    conn.fetchrow.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fast_path_uses_asyncpg_when_pool_is_empty():
+    raw_pool, _ = _raw_pool(_RESPONSE)
+    with patch.object(puzzle_service, "_pool", None), \
+            patch.object(puzzle_service, "get_asyncpg_pool", return_value=raw_pool):
+        assert json.loads(await puzzle_service.get_random_puzzle_fast()) == _RESPONSE
+
+
+@pytest.mark.asyncio
+async def test_fast_path_yields_none_without_pools_or_on_error():
+    with patch.object(puzzle_service, "_pool", None), \
+            patch.object(puzzle_service, "get_asyncpg_pool", return_value=None):
+        assert await puzzle_service.get_random_puzzle_fast() is None
+
+    error = ConnectionResetError()
+    raw_pool, _ = _raw_pool(error)
+    with patch.object(puzzle_service, "_pool", None), \
+            patch.object(puzzle_service, "get_asyncpg_pool", return_value=raw_pool), \
+            patch.object(puzzle_service, "discard_asyncpg_pool") as discard:
+        assert await puzzle_service.get_random_puzzle_fast() is None
+    discard.assert_called_once_with(raw_pool, error)
+
+
+# ---------------------------------------------------------------------------
+# Serialized responses
+# ---------------------------------------------------------------------------
+
+
+def test_puzzle_json_matches_response_model():
+    row = {**_rows(1)[0], "moves": "e2e4 e7e5", "themes": "fork mateIn1"}
+    body = puzzle_service.puzzle_json(row)
+
+    assert json.loads(body) == PuzzleResponse.model_validate(
+        puzzle_service.puzzle_response(row)
+    ).model_dump()
+
+
+def test_puzzle_json_is_serialized_once_per_puzzle():
+    row = _rows(1)[0]
+    first = puzzle_service.puzzle_json(row)
+    with patch("app.services.puzzle_service.orjson.dumps") as dumps:
+        again = puzzle_service.puzzle_json(row)
+
+    assert again is first
+    dumps.assert_not_called()
+
+
+def test_puzzle_json_cache_is_bounded_and_expires():
+    settings = MagicMock(puzzle_json_cache_size=2, puzzle_json_ttl_seconds=60.0)
+    rows = _rows(3)
+    with patch.object(puzzle_service, "get_settings", return_value=settings):
+        for row in rows:
+            puzzle_service.puzzle_json(row)
+        assert list(puzzle_service._puzzle_json) == ["p00001", "p00002"]
+
+        stale = {**rows[2], "rating": 1600}
+        later = time.monotonic() + 61
+        with patch("app.services.puzzle_service.time.monotonic", return_value=later):
+            assert json.loads(puzzle_service.puzzle_json(stale))["rating"] == 1600
+
+
+def test_puzzles_json_is_a_batch_body():
+    rows = _rows(2)
+    body = puzzle_service.puzzles_json(rows)
+
+    assert json.loads(body) == {"puzzles": [puzzle_service.puzzle_response(r) for r in rows]}
+    assert json.loads(puzzle_service.puzzles_json([])) == {"puzzles": []}
+
+
+@pytest.mark.asyncio
+async def test_refill_serializes_pooled_puzzles():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+
+    assert len(puzzle_service._puzzle_json) == len(pool)
+
+
+# ---------------------------------------------------------------------------
+# Batches
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_take_many_pops_up_to_n():
+    pool = _pool()
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+        rows = pool.take_many(4)
+        assert len({row["id"] for row in rows}) == 4
+        assert len(pool.take_many(20)) == 6
+        await pool.schedule_refill()
+
+
+@pytest.mark.asyncio
+async def test_batch_tops_up_pool_with_one_sample():
+    pool = _pool(size=3, refill_batch=3)
+    with patch("app.services.puzzle_service.sample_puzzles", _sampler()):
+        await pool.schedule_refill()
+
+    sampler = AsyncMock(return_value=_rows(5, start=100))
+    db = AsyncMock()
+    with patch.object(puzzle_service, "_pool", pool), \
+            patch("app.services.puzzle_service.sample_puzzles", sampler):
+        rows = await get_random_puzzles(db, 8)
+        await pool.schedule_refill()
+
+    assert len({row["id"] for row in rows}) == 8
+    assert sampler.await_args_list[0].args[1] == 5
+    db.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_filtered_batch_is_distinct_and_bounded():
+    draws = [{"id": "a"}, {"id": "a"}, {"id": "b"}, None]
+    single = AsyncMock(side_effect=draws)
+    with patch("app.services.puzzle_service.get_random_puzzle", single):
+        rows = await get_random_puzzles(AsyncMock(), 3, themes=["fork"])
+
+    assert [row["id"] for row in rows] == ["a", "b"]
+    assert single.await_count == 4
+    assert single.await_args.kwargs["themes"] == ["fork"]
+
+
+@pytest.mark.asyncio
+async def test_filtered_batch_stops_after_attempt_budget():
+    single = AsyncMock(return_value={"id": "only"})
+    with patch("app.services.puzzle_service.get_random_puzzle", single):
+        rows = await get_random_puzzles(AsyncMock(), 5, min_rating=2800)
+
+    assert rows == [{"id": "only"}]
+    assert single.await_count == 5 * puzzle_service.BATCH_TOP_UP_ATTEMPTS
+
+
+# ---------------------------------------------------------------------------
+# Unseen selection
+# ---------------------------------------------------------------------------
+
+
+_USER = uuid.UUID(int=1)
+
+
+@pytest.fixture(autouse=True)
+def _reset_seen_filters():
+    puzzle_service._seen_filters.clear()
+    yield
+    puzzle_service._seen_filters.clear()
+
+
+def _progress(puzzle_ids):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(puzzle_ids)
+    return result
+
+
+def test_seen_filter_has_no_false_negatives_and_few_false_positives():
+    seen = SeenFilter(5000)
+    ids = [f"s{i:05d}" for i in range(5000)]
+    for puzzle_id in ids:
+        seen.add(puzzle_id)
+
+    assert all(puzzle_id in seen for puzzle_id in ids)
+    false_positives = sum(f"u{i:05d}" in seen for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+    assert not seen.saturated
+    assert len(seen.bits) < 8 * 1024
+
+
+@pytest.mark.asyncio
+async def test_seen_filter_is_built_once_and_updated_in_place():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["p00000"])
+
+    seen = await get_seen_filter(db, _USER)
+    mark_puzzle_seen(_USER, "p00001")
+
+    assert await get_seen_filter(db, _USER) is seen
+    assert "p00000" in seen and "p00001" in seen
+    assert db.execute.await_count == 1
+    assert db.execute.await_args.args[1] == {"user_id": _USER}
+
+
+@pytest.mark.asyncio
+async def test_saturated_seen_filter_is_rebuilt():
+    db = AsyncMock()
+    db.execute.return_value = _progress([])
+    seen = await get_seen_filter(db, _USER)
+    for i in range(seen.capacity + 1):
+        mark_puzzle_seen(_USER, f"x{i}")
+
+    assert await get_seen_filter(db, _USER) is not seen
+    assert db.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_unseen_skips_seen_candidates_in_one_sample():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["p00000", "p00001"])
+    sampler = AsyncMock(return_value=_rows(5))
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        row = await get_random_unseen_puzzle(db, _USER)
+
+    assert row["id"] == "p00002"
+    assert sampler.await_count == 1
+    assert sampler.await_args.args[1] == puzzle_service.UNSEEN_SAMPLE_SIZE
+
+
+@pytest.mark.asyncio
+async def test_unseen_gives_up_after_max_attempts():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["p00000"])
+    sampler = AsyncMock(return_value=_rows(1))
+    with patch("app.services.puzzle_service.sample_puzzles", sampler):
+        assert await get_random_unseen_puzzle(db, _USER) is None
+
+    assert sampler.await_count == puzzle_service.get_settings().unseen_max_attempts
+
+
+@pytest.mark.asyncio
+async def test_filtered_unseen_uses_seeks_and_stops_on_empty_filter():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["a"])
+    single = AsyncMock(side_effect=[{"id": "a"}, {"id": "b"}])
+    with patch("app.services.puzzle_service.get_random_puzzle", single):
+        row = await get_random_unseen_puzzle(db, _USER, themes=["fork"])
+    assert row == {"id": "b"}
+    assert single.await_args.kwargs["themes"] == ["fork"]
+
+    single = AsyncMock(return_value=None)
+    with patch("app.services.puzzle_service.get_random_puzzle", single):
+        assert await get_random_unseen_puzzle(db, _USER, opening="Nope") is None
+    assert single.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_unseen_batch_filters_and_tops_up_with_unseen():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["p00000", "p00001", "p00005"])
+    batch = AsyncMock(side_effect=[_rows(4), _rows(2, 4), _rows(1, 6)])
+    with patch("app.services.puzzle_service.get_random_puzzles", batch):
+        rows = await get_random_unseen_puzzles(db, _USER, 4, themes=["fork"])
+
+    assert [row["id"] for row in rows] == ["p00002", "p00003", "p00004", "p00006"]
+    assert [c.args[1] for c in batch.await_args_list] == [4, 2, 1]
+    assert batch.await_args.kwargs["themes"] == ["fork"]
+
+
+@pytest.mark.asyncio
+async def test_unseen_batch_fills_with_seen_when_filters_run_dry():
+    db = AsyncMock()
+    db.execute.return_value = _progress(["p00000", "p00001"])
+    batch = AsyncMock(return_value=_rows(3))  # the filters match only three puzzles
+    with patch("app.services.puzzle_service.get_random_puzzles", batch):
+        rows = await get_random_unseen_puzzles(db, _USER, 5, opening="Rare")
+
+    assert [row["id"] for row in rows] == ["p00002", "p00000", "p00001"]
+    assert batch.await_count == 1
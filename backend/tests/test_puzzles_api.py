@@ -1,14 +1,20 @@
 """
-Tests for GET /api/v1/puzzles/random endpoint.
+Tests for GET /api/v1/puzzles/random and POST /api/v1/puzzles/{id}/submit.
 
-These are unit tests that mock get_random_puzzle to avoid a real DB.
+These are unit tests that mock the service layer to avoid a real DB.
 """
-from unittest.mock import AsyncMock, patch
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from jose import jwt
 
+from app.config import get_settings
 from app.main import app
+from app.services.submission_queue import SubmissionQueueFull
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -114,3 +120,405 @@ async def test_random_puzzle_503_when_no_puzzles():
 
     assert response.status_code == 503
     assert response.json()["detail"] == "No puzzles available"
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_passes_rating_band():
+    """min_rating / max_rating are forwarded to the service."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random", params={"min_rating": 1400, "max_rating": 1600}
+            )
+
+    assert response.status_code == 200
+    assert mock.await_args.kwargs == {
+        "min_rating": 1400, "max_rating": 1600, "themes": None, "opening": None
+    }
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_404_when_band_empty():
+    """An empty rating band is a 404, not a 503."""
+    with patch(
+        "app.api.v1.puzzles.get_random_puzzle",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"min_rating": 3900})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No puzzles in rating range"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params",
+    [{"min_rating": 1600, "max_rating": 1400}, {"min_rating": -1}, {"max_rating": 5000}],
+)
+async def test_random_puzzle_invalid_band_422(params):
+    """Inverted or out-of-range bands are rejected before any DB access."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params=params)
+
+    assert response.status_code == 422
+    mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_passes_themes():
+    """themes is split on commas, stripped and de-duplicated in order."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random", params={"themes": "fork, pin,,fork"}
+            )
+
+    assert response.status_code == 200
+    assert mock.await_args.kwargs["themes"] == ["fork", "pin"]
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_404_when_no_theme_match():
+    """No puzzle with the requested themes is a 404."""
+    with patch(
+        "app.api.v1.puzzles.get_random_puzzle",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"themes": "nope"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No puzzles match the requested themes"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("themes", [" , ", ",".join(f"t{i}" for i in range(9))])
+async def test_random_puzzle_invalid_themes_422(themes):
+    """Empty or over-long theme lists are rejected before any DB access."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"themes": themes})
+
+    assert response.status_code == 422
+    mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_passes_opening():
+    """opening is forwarded alongside the other filters."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random",
+                params={"opening": "Sicilian_Defense_Najdorf_Variation", "themes": "fork"},
+            )
+
+    assert response.status_code == 200
+    assert mock.await_args.kwargs["opening"] == "Sicilian_Defense_Najdorf_Variation"
+    assert mock.await_args.kwargs["themes"] == ["fork"]
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_404_when_no_opening_match():
+    """No puzzle from the requested opening is a 404."""
+    with patch(
+        "app.api.v1.puzzles.get_random_puzzle",
+        new_callable=AsyncMock,
+        return_value=None,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"opening": "Nope"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No puzzles match the requested opening"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("opening", ["", "x" * 129])
+async def test_random_puzzle_invalid_opening_422(opening):
+    """Empty or over-long opening tags are rejected before any DB access."""
+    mock = AsyncMock(return_value=_VALID_ROW)
+    with patch("app.api.v1.puzzles.get_random_puzzle", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"opening": opening})
+
+    assert response.status_code == 422
+    mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_batch_returns_list():
+    """count returns {"puzzles": [...]} built from get_random_puzzles."""
+    batch = AsyncMock(return_value=[_VALID_ROW, _VALID_ROW_NO_THEMES])
+    single = AsyncMock()
+    with patch("app.api.v1.puzzles.get_random_puzzles", batch), \
+            patch("app.api.v1.puzzles.get_random_puzzle", single):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random", params={"count": 5, "min_rating": 1000}
+            )
+
+    assert response.status_code == 200
+    puzzles = response.json()["puzzles"]
+    assert [p["id"] for p in puzzles] == ["00sHx", "abcde"]
+    assert puzzles[0]["moves"][0] == "f3e5"
+    assert puzzles[1]["themes"] is None
+    assert batch.await_args.args[1] == 5
+    assert batch.await_args.kwargs["min_rating"] == 1000
+    single.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_batch_503_when_empty():
+    """An empty batch is reported like an empty single fetch."""
+    with patch(
+        "app.api.v1.puzzles.get_random_puzzles",
+        new_callable=AsyncMock,
+        return_value=[],
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"count": 3})
+
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, 51])
+async def test_random_puzzle_batch_count_bounds_422(count):
+    """count outside 1..MAX_BATCH_COUNT is rejected before any DB access."""
+    mock = AsyncMock(return_value=[_VALID_ROW])
+    with patch("app.api.v1.puzzles.get_random_puzzles", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params={"count": count})
+
+    assert response.status_code == 422
+    mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_fast_path_skips_read_connection():
+    """An unfiltered puzzle from the fast path needs no SQLAlchemy connection."""
+    puzzle = {**_VALID_ROW, "moves": _VALID_ROW["moves"].split(), "themes": ["fork", "mateIn1"]}
+    body = json.dumps(puzzle).encode()
+    slow = AsyncMock()
+    with (
+        patch("app.api.v1.puzzles.get_random_puzzle_fast", AsyncMock(return_value=body)),
+        patch("app.api.v1.puzzles.get_random_puzzle", slow),
+        patch("app.api.v1.puzzles.read_connection", MagicMock()) as read_connection,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random")
+
+    assert response.status_code == 200
+    assert response.json() == puzzle
+    slow.assert_not_awaited()
+    read_connection.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "params", [{"min_rating": 1200}, {"themes": "fork"}, {"opening": "Sicilian"}, {"count": 2}]
+)
+async def test_random_puzzle_filters_bypass_fast_path(params):
+    fast = AsyncMock(return_value=None)
+    with (
+        patch("app.api.v1.puzzles.get_random_puzzle_fast", fast),
+        patch("app.api.v1.puzzles.get_random_puzzle", AsyncMock(return_value=_VALID_ROW)),
+        patch("app.api.v1.puzzles.get_random_puzzles", AsyncMock(return_value=[_VALID_ROW])),
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", params=params)
+
+    assert response.status_code == 200
+    fast.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_authenticated_serves_unseen():
+    unseen = AsyncMock(return_value=_VALID_ROW)
+    fast, slow = AsyncMock(), AsyncMock()
+    with (
+        patch("app.api.v1.puzzles.get_random_unseen_puzzle", unseen),
+        patch("app.api.v1.puzzles.get_random_puzzle_fast", fast),
+        patch("app.api.v1.puzzles.get_random_puzzle", slow),
+        patch("app.api.v1.puzzles.mark_puzzle_seen") as mark_seen,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random", params={"themes": "fork"}, headers=_auth_headers()
+            )
+
+    assert response.status_code == 200
+    assert response.json()["id"] == _VALID_ROW["id"]
+    assert unseen.await_args.args[1] == _USER
+    assert unseen.await_args.kwargs["themes"] == ["fork"]
+    fast.assert_not_awaited()
+    slow.assert_not_awaited()
+    mark_seen.assert_called_once_with(_USER, _VALID_ROW["id"])
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_authenticated_falls_back_when_nothing_unseen():
+    slow = AsyncMock(return_value=_VALID_ROW)
+    with (
+        patch("app.api.v1.puzzles.get_random_unseen_puzzle", AsyncMock(return_value=None)),
+        patch("app.api.v1.puzzles.get_random_puzzle", slow),
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random", headers=_auth_headers())
+
+    assert response.status_code == 200
+    slow.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_anonymous_skips_unseen_selection():
+    unseen = AsyncMock()
+    with (
+        patch("app.api.v1.puzzles.get_random_unseen_puzzle", unseen),
+        patch("app.api.v1.puzzles.get_random_puzzle_fast", AsyncMock(return_value=None)),
+        patch("app.api.v1.puzzles.get_random_puzzle", AsyncMock(return_value=_VALID_ROW)),
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/v1/puzzles/random")
+
+    assert response.status_code == 200
+    unseen.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_authenticated_batch_skips_seen():
+    rows = [_VALID_ROW, {**_VALID_ROW, "id": "00sHy"}]
+    unseen = AsyncMock(return_value=rows)
+    plain = AsyncMock()
+    with (
+        patch("app.api.v1.puzzles.get_random_unseen_puzzles", unseen),
+        patch("app.api.v1.puzzles.get_random_puzzles", plain),
+        patch("app.api.v1.puzzles.mark_puzzle_seen") as mark_seen,
+    ):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get(
+                "/api/v1/puzzles/random", params={"count": 2}, headers=_auth_headers()
+            )
+
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()["puzzles"]] == ["00sHx", "00sHy"]
+    assert unseen.await_args.args[1:] == (_USER, 2)
+    plain.assert_not_awaited()
+    assert [c.args for c in mark_seen.call_args_list] == [(_USER, "00sHx"), (_USER, "00sHy")]
+
+
+@pytest.mark.asyncio
+async def test_random_puzzle_invalid_token_401():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(
+            "/api/v1/puzzles/random", headers={"Authorization": "Bearer not-a-token"}
+        )
+
+    assert response.status_code == 401
+
+
+# ---------------------------------------------------------------------------
+# POST /puzzles/{id}/submit
+# ---------------------------------------------------------------------------
+
+_USER = uuid.UUID(int=42)
+
+
+def _auth_headers():
+    settings = get_settings()
+    claims = {"sub": str(_USER), "exp": datetime.now(timezone.utc) + timedelta(minutes=15)}
+    token = jwt.encode(claims, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _submit(body, headers=None, puzzle_id="00sHx"):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(
+            f"/api/v1/puzzles/{puzzle_id}/submit", json=body, headers=headers or {}
+        )
+
+
+@pytest.mark.asyncio
+async def test_submit_requires_token():
+    queue = MagicMock(enqueue=AsyncMock())
+    with patch("app.api.v1.puzzles.get_submission_queue", return_value=queue):
+        response = await _submit({"result": "solved"})
+
+    assert response.status_code == 401
+    queue.enqueue.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body",
+    [
+        {},
+        {"result": "skipped"},
+        {"result": "solved", "time_spent_ms": -1},
+        {"result": "solved", "time_spent_ms": 2**31},
+    ],
+)
+async def test_submit_invalid_body_422(body):
+    queue = MagicMock(enqueue=AsyncMock())
+    with patch("app.api.v1.puzzles.get_submission_queue", return_value=queue):
+        response = await _submit(body, _auth_headers())
+
+    assert response.status_code == 422
+    queue.enqueue.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_submit_enqueues_submission():
+    queue = MagicMock(enqueue=AsyncMock())
+    sessions = MagicMock()
+    with (
+        patch("app.api.v1.puzzles.get_submission_queue", return_value=queue),
+        patch("app.api.v1.puzzles.AsyncSessionLocal", sessions),
+    ):
+        response = await _submit({"result": "solved", "time_spent_ms": 5400}, _auth_headers())
+
+    assert response.status_code == 202
+    assert response.json() == {"puzzle_id": "00sHx", "result": "solved", "queued": True}
+    submission = queue.enqueue.await_args.args[0]
+    assert (submission.user_id, submission.puzzle_id) == (_USER, "00sHx")
+    assert (submission.result, submission.time_spent_ms) == ("solved", 5400)
+    # The queue writes it later; the request itself opens no session
+    sessions.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_submit_503_when_queue_full():
+    queue = MagicMock(enqueue=AsyncMock(side_effect=SubmissionQueueFull()))
+    with patch("app.api.v1.puzzles.get_submission_queue", return_value=queue):
+        response = await _submit({"result": "failed"}, _auth_headers())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_submit_writes_directly_without_queue():
+    db = AsyncMock()
+    record = AsyncMock(return_value=1)
+    with (
+        patch("app.api.v1.puzzles.get_submission_queue", return_value=None),
+        patch("app.api.v1.puzzles.AsyncSessionLocal", MagicMock(return_value=db)),
+        patch("app.api.v1.puzzles.record_submissions", record),
+    ):
+        response = await _submit({"result": "failed"}, _auth_headers())
+
+    assert response.status_code == 202
+    assert response.json()["queued"] is False
+    assert record.await_args.args[0] is db.__aenter__.return_value
+    assert record.await_args.args[1][0].result == "failed"
+    db.__aenter__.return_value.commit.assert_awaited_once()
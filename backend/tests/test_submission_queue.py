@@ -0,0 +1,201 @@
+"""
+Tests for the submission write-behind queue.
+
+record_submissions is mocked; the session factory yields AsyncMock sessions so
+commits can be counted.
+"""
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import exc
+
+from app.services.progress_service import Submission
+from app.services.submission_queue import SubmissionQueue, SubmissionQueueFull
+
+_USER = uuid.UUID(int=42)
+
+
+def _submission(n: int) -> Submission:
+    return Submission(user_id=_USER, puzzle_id=f"p{n:04d}", result="solved")
+
+
+class _Sessions:
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = AsyncMock()
+        self.sessions.append(session)
+        yield session
+
+
+def _queue(sessions, **overrides) -> SubmissionQueue:
+    options = {"max_size": 100, "batch_size": 10, "max_delay": 0.05, "enqueue_timeout": 0.05}
+    options.update(overrides)
+    return SubmissionQueue(sessions, **options)
+
+
+def _batches(record: AsyncMock) -> list[list[str]]:
+    return [[s.puzzle_id for s in call.args[1]] for call in record.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_delay():
+    sessions = _Sessions()
+    queue = _queue(sessions, batch_size=3, max_delay=10)
+    record = AsyncMock(return_value=3)
+    with patch("app.services.submission_queue.record_submissions", record):
+        queue.start()
+        for n in range(3):
+            await queue.enqueue(_submission(n))
+        for _ in range(20):
+            await asyncio.sleep(0)
+        await queue.drain()
+
+    assert _batches(record) == [["p0000", "p0001", "p0002"]]
+    sessions.sessions[0].commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_after_max_delay():
+    sessions = _Sessions()
+    queue = _queue(sessions, max_delay=0.01)
+    record = AsyncMock(return_value=2)
+    with patch("app.services.submission_queue.record_submissions", record):
+        queue.start()
+        await queue.enqueue(_submission(0))
+        await queue.enqueue(_submission(1))
+        await asyncio.sleep(0.1)
+        assert _batches(record) == [["p0000", "p0001"]]
+        assert len(queue) == 0
+        await queue.drain()
+
+    assert record.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_raises_when_queue_stays_full():
+    queue = _queue(_Sessions(), max_size=2)  # never started: nothing drains it
+    await queue.enqueue(_submission(0))
+    await queue.enqueue(_submission(1))
+
+    with pytest.raises(SubmissionQueueFull):
+        await queue.enqueue(_submission(2))
+    assert len(queue) == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_writes_remaining_submissions_in_batches():
+    sessions = _Sessions()
+    queue = _queue(sessions, batch_size=2)
+    record = AsyncMock(return_value=2)
+    for n in range(5):
+        await queue.enqueue(_submission(n))
+    with patch("app.services.submission_queue.record_submissions", record):
+        await queue.drain()
+
+    assert _batches(record) == [["p0000", "p0001"], ["p0002", "p0003"], ["p0004"]]
+    assert len(queue) == 0
+    with pytest.raises(SubmissionQueueFull):
+        await queue.enqueue(_submission(5))
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_batch_being_collected():
+    sessions = _Sessions()
+    queue = _queue(sessions, max_delay=10)
+    record = AsyncMock(return_value=1)
+    with patch("app.services.submission_queue.record_submissions", record):
+        queue.start()
+        await queue.enqueue(_submission(0))
+        await asyncio.sleep(0.01)  # the flusher has taken it and is waiting for more
+        await queue.drain()
+
+    assert _batches(record) == [["p0000"]]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_then_dropped():
+    sessions = _Sessions()
+    queue = _queue(sessions)
+    record = AsyncMock(side_effect=RuntimeError("db down"))
+    await queue.enqueue(_submission(0))
+    with (
+        patch("app.services.submission_queue.record_submissions", record),
+        patch("app.services.submission_queue.FLUSH_RETRY_DELAY", 0),
+    ):
+        await queue.drain()
+
+    assert record.await_count == 3
+    for session in sessions.sessions:
+        session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_flush_succeeds_on_retry():
+    sessions = _Sessions()
+    queue = _queue(sessions)
+    record = AsyncMock(side_effect=[RuntimeError("db down"), 1])
+    await queue.enqueue(_submission(0))
+    with (
+        patch("app.services.submission_queue.record_submissions", record),
+        patch("app.services.submission_queue.FLUSH_RETRY_DELAY", 0),
+    ):
+        await queue.drain()
+
+    assert record.await_count == 2
+    sessions.sessions[-1].commit.assert_awaited_once()
+
+
+def _reject(poison: set[str]):
+    """record_submissions that fails any batch containing a poison puzzle id."""
+
+    async def record(db, batch):
+        if poison & {s.puzzle_id for s in batch}:
+            raise exc.DBAPIError("INSERT", {}, Exception("value out of range for type integer"))
+        return len(batch)
+
+    return AsyncMock(side_effect=record)
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_is_split_so_only_bad_rows_are_lost():
+    sessions = _Sessions()
+    queue = _queue(sessions, batch_size=8)
+    record = _reject({"p0002", "p0005"})
+    for n in range(8):
+        await queue.enqueue(_submission(n))
+    with patch("app.services.submission_queue.record_submissions", record):
+        await queue.drain()
+
+    committed = [
+        puzzle_id
+        for call, session in zip(record.await_args_list, sessions.sessions)
+        if session.commit.await_count
+        for puzzle_id in (s.puzzle_id for s in call.args[1])
+    ]
+    assert sorted(committed) == ["p0000", "p0001", "p0003", "p0004", "p0006", "p0007"]
+    # Rejected rows are split out, never retried whole
+    assert _batches(record).count(["p0002"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_database_is_retried_not_split():
+    sessions = _Sessions()
+    queue = _queue(sessions)
+    lost = exc.DBAPIError("INSERT", {}, Exception("connection reset"), connection_invalidated=True)
+    record = AsyncMock(side_effect=[lost, 2])
+    await queue.enqueue(_submission(0))
+    await queue.enqueue(_submission(1))
+    with (
+        patch("app.services.submission_queue.record_submissions", record),
+        patch("app.services.submission_queue.FLUSH_RETRY_DELAY", 0),
+    ):
+        await queue.drain()
+
+    assert _batches(record) == [["p0000", "p0001"], ["p0000", "p0001"]]
+    sessions.sessions[1].commit.assert_awaited_once()
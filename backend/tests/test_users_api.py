@@ -0,0 +1,146 @@
+"""
+Tests for GET /api/v1/users/me/progress.
+
+get_progress_page is mocked; access tokens are signed with the configured
+secret, as the (future) login endpoint would.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+
+from app.config import get_settings
+from app.main import app
+from app.services.progress_service import InvalidCursor
+
+_USER = uuid.UUID(int=42)
+
+_ROW = {
+    "id": uuid.UUID(int=1),
+    "puzzle_id": "00sHx",
+    "result": "solved",
+    "time_spent_ms": 5400,
+    "solved_at": datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc),
+    "rating": 1500,
+    "themes": "fork mateIn1",
+}
+
+
+def _token(sub=str(_USER), expires_in=timedelta(minutes=15)):
+    settings = get_settings()
+    claims = {"sub": sub, "exp": datetime.now(timezone.utc) + expires_in}
+    return jwt.encode(claims, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+
+
+async def _get(params=None, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get("/api/v1/users/me/progress", params=params, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_progress_requires_token():
+    mock = AsyncMock()
+    with patch("app.api.v1.users.get_progress_page", mock):
+        response = await _get()
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    mock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "token",
+    ["garbage", _token(expires_in=timedelta(minutes=-1)), _token(sub="not-a-uuid")],
+)
+async def test_progress_rejects_bad_token(token):
+    with patch("app.api.v1.users.get_progress_page", AsyncMock()):
+        response = await _get(token=token)
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid access token"
+
+
+@pytest.mark.asyncio
+async def test_progress_page_for_current_user():
+    mock = AsyncMock(return_value=([_ROW], "next-token"))
+    with patch("app.api.v1.users.get_progress_page", mock):
+        response = await _get({"limit": 1, "cursor": "abc"}, token=_token())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["next_cursor"] == "next-token"
+    (item,) = body["items"]
+    assert item["puzzle_id"] == "00sHx"
+    assert item["puzzle"] is None
+    assert mock.await_args.args[1] == _USER
+    assert mock.await_args.kwargs == {"limit": 1, "cursor": "abc", "include_puzzle": False}
+
+
+@pytest.mark.asyncio
+async def test_progress_includes_puzzle_summary():
+    with patch("app.api.v1.users.get_progress_page",
+               AsyncMock(return_value=([_ROW], None))):
+        response = await _get({"include_puzzle": "true"}, token=_token())
+
+    body = response.json()
+    assert body["next_cursor"] is None
+    assert body["items"][0]["puzzle"] == {"rating": 1500, "themes": ["fork", "mateIn1"]}
+
+
+@pytest.mark.asyncio
+async def test_progress_invalid_cursor_422():
+    with patch("app.api.v1.users.get_progress_page",
+               AsyncMock(side_effect=InvalidCursor("x"))):
+        response = await _get({"cursor": "x"}, token=_token())
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [0, 101])
+async def test_progress_limit_bounds_422(limit):
+    response = await _get({"limit": limit}, token=_token())
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_stats_defaults_for_new_user():
+    with patch("app.api.v1.users.get_user_stats", AsyncMock(return_value=None)):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.get(
+                "/api/v1/users/me/stats", headers={"Authorization": f"Bearer {_token()}"}
+            )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["solved"] == 0 and body["accuracy"] is None and body["themes"] == []
+
+
+@pytest.mark.asyncio
+async def test_stats_from_single_row():
+    row = {
+        "solved_count": 30, "failed_count": 10, "current_streak": 4, "best_streak": 9,
+        "total_time_ms": 90_000, "timed_count": 20,
+        "theme_stats": {"pin": [1, 1], "fork": [9, 3], "mate": [2, 0]},
+        "last_solved_at": datetime(2026, 10, 16, tzinfo=timezone.utc),
+    }
+    mock = AsyncMock(return_value=row)
+    with patch("app.api.v1.users.get_user_stats", mock):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            response = await c.get(
+                "/api/v1/users/me/stats", headers={"Authorization": f"Bearer {_token()}"}
+            )
+
+    body = response.json()
+    assert body["accuracy"] == 0.75
+    assert body["average_time_ms"] == 4500
+    assert body["best_streak"] == 9
+    assert [t["theme"] for t in body["themes"]] == ["fork", "mate", "pin"]
+    assert body["themes"][0] == {"theme": "fork", "solved": 9, "failed": 3, "accuracy": 0.75}
+    assert mock.await_args.args[1] == _USER
@@ -4,10 +4,11 @@
  * Tests cover:
  * - fetchRandomPuzzle: successful fetch returns parsed Puzzle
  * - fetchRandomPuzzle: non-OK response throws with status code
+ * - fetchRandomPuzzles: batch fetch unwraps the puzzles list
  * - Puzzle interface shape validation
  */
 
-import { fetchRandomPuzzle, type Puzzle } from '@/lib/api'
+import { fetchRandomPuzzle, fetchRandomPuzzles, type Puzzle } from '@/lib/api'
 
 const MOCK_PUZZLE: Puzzle = {
   id: '00sHx',
@@ -83,3 +84,32 @@ describe('fetchRandomPuzzle', () => {
     process.env.NEXT_PUBLIC_API_URL = originalEnv
   })
 })
+
+describe('fetchRandomPuzzles', () => {
+  beforeEach(() => {
+    jest.resetAllMocks()
+  })
+
+  it('requests count puzzles and returns the list', async () => {
+    const second: Puzzle = { ...MOCK_PUZZLE, id: 'abcde', themes: null }
+    global.fetch = jest.fn().mockResolvedValue({
+      ok: true,
+      json: async () => ({ puzzles: [MOCK_PUZZLE, second] }),
+    })
+
+    const result = await fetchRandomPuzzles(10)
+
+    const calledUrl = (fetch as jest.Mock).mock.calls[0][0] as string
+    expect(calledUrl).toMatch(/\/api\/v1\/puzzles\/random\?count=10$/)
+    expect(result).toEqual([MOCK_PUZZLE, second])
+  })
+
+  it('throws an error when the response is not ok', async () => {
+    global.fetch = jest.fn().mockResolvedValue({
+      ok: false,
+      status: 422,
+    })
+
+    await expect(fetchRandomPuzzles(100)).rejects.toThrow('Failed to fetch puzzles: 422')
+  })
+})
@@ -13,3 +13,10 @@ export async function fetchRandomPuzzle(): Promise<Puzzle> {
   if (!res.ok) throw new Error(`Failed to fetch puzzle: ${res.status}`)
   return res.json()
 }
+
+export async function fetchRandomPuzzles(count: number): Promise<Puzzle[]> {
+  const res = await fetch(`${API_URL}/api/v1/puzzles/random?count=${count}`, { cache: 'no-store' })
+  if (!res.ok) throw new Error(`Failed to fetch puzzles: ${res.status}`)
+  const body: { puzzles: Puzzle[] } = await res.json()
+  return body.puzzles
+}